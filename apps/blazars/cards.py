@@ -12,14 +12,13 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-import io
 import dash_bootstrap_components as dbc
 import dash_mantine_components as dmc
-import pandas as pd
 from dash import Input, Output, dcc
 from dash_iconify import DashIconify
 
 from app import app
+from apps.bundle import load_object_frame
 from apps.cards import card_neighbourhood
 from apps.utils import create_button_for_external_conesearch
 
@@ -71,7 +70,7 @@ def card_explanation_blazar():
 )
 def card_blazar_button(object_data):
     """Add a card containing button to fit for variable stars"""
-    pdf = pd.read_json(io.StringIO(object_data))
+    pdf = load_object_frame(object_data, "data", columns=["i:ra", "i:dec"])
 
     ra0 = pdf["i:ra"].to_numpy()[0]
     dec0 = pdf["i:dec"].to_numpy()[0]
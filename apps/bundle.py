@@ -0,0 +1,581 @@
+# Copyright 2026 AstroLab Software
+# Author: Julien Peloton
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Object bundles: all the data needed by an object page, fetched once
+
+Opening `/ZTF...` builds the page layout (`display_page`) and fills the
+data stores (`store_query`) in two callbacks, that may run at the same
+time in two workers. Both read the same bundle, which is fetched by a
+single process and shared through the disk cache.
+
+Frames are kept in the cache in a compact Arrow IPC format (see
+`apps.frames`). The data stores
+of the page only hold the key of the bundle (the ZTF objectId), and each
+callback decodes the frames it needs with `load_object_frame`, instead
+of sending the alerts to the browser and parsing them back from JSON.
+Callbacks that declare the columns they use only decode these columns.
+SSO ephemerides and tracklet members, that are slow to fetch and only
+shown in their own tabs, are fetched the first time a tab reads them.
+
+Photometry derived from the alerts (dates, DC magnitudes, fluxes and
+colours) is computed once, when the bundle is built, so that plot
+callbacks only have to render it.
+
+If the API honours `startdate` on `/api/v1/objects` (set
+`API_OBJECTS_STARTDATE: true`), bundles are kept longer than they are
+fresh: when an object is visited again, only the alerts received since
+its last measurement are fetched and derived, and merged into the
+previous bundle. The whole history is fetched again after
+`BUNDLE_HISTORY_MAX_AGE`, so that reprocessed columns are updated.
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+from fink_utils.photometry.utils import is_source_behind
+
+from apps.cache import DEFAULT_LOCK_TIMEOUT, get_cache, get_or_compute
+from apps.frames import decode_frame, encode_frame
+from apps.photometry import apparent_flux, dc_mag, is_positive
+from apps.utils import (
+    convert_jd,
+    extract_color,
+    extract_configuration,
+    request_api,
+    retrieve_oid_from_metaname,
+)
+
+# Default value, that can be overwritten in config.yml
+DEFAULT_BUNDLE_TTL = 600  # seconds
+DEFAULT_BUNDLE_HISTORY_TTL = 7 * 86400  # seconds
+DEFAULT_BUNDLE_HISTORY_MAX_AGE = 86400  # seconds
+
+# Frames of a bundle
+ALERT_FRAMES = ["data", "upper", "uppervalid"]
+
+# Frames fetched on first use, when their tab is opened
+LAZY_FRAMES = ["sso", "tracklet"]
+
+# Frames of an object page, with a data store each
+BUNDLE_FRAMES = ALERT_FRAMES + LAZY_FRAMES
+
+# Frames computed from the others (see `derive_bundle`)
+DERIVED_FRAMES = ["color", "color_dc"]
+
+
+def get_bundle_cache(config=None):
+    """Return the cache of object bundles"""
+    return get_cache("bundles", config)
+
+
+def _get_or_compute(key, func, should_cache):
+    """Compute a value once for all workers, and keep it for `BUNDLE_TTL`"""
+    config = extract_configuration("config.yml")
+    return get_or_compute(
+        get_bundle_cache(config),
+        key,
+        func,
+        expire=float(config.get("BUNDLE_TTL", DEFAULT_BUNDLE_TTL)),
+        should_cache=should_cache,
+        lock_timeout=float(config.get("API_LOCK_TIMEOUT", DEFAULT_LOCK_TIMEOUT)),
+    )
+
+
+def resolve_object_name(name):
+    """ZTF objectId of an object page
+
+    Parameters
+    ----------
+    name: str
+        ZTF objectId, or name defined by a user (metaname)
+
+    Returns
+    -------
+    oid: str or None
+        None if the name is not known
+    """
+    if name.startswith("ZTF"):
+        return name
+
+    return _get_or_compute(
+        f"oid:{name}",
+        lambda: retrieve_oid_from_metaname(name),
+        should_cache=lambda oid: oid is not None,
+    )
+
+
+def fetch_alerts(oid, startdate=None):
+    """Fetch the alerts of an object, with its upper limits
+
+    Parameters
+    ----------
+    oid: str
+        ZTF objectId
+    startdate: float, optional
+        Julian Date. If set, only alerts strictly after it are
+        returned. Default is to return the whole history.
+
+    Returns
+    -------
+    frames: dict
+        DataFrame for each of `ALERT_FRAMES`: valid alerts,
+        upper limits and bad quality measurements.
+    """
+    frames = {frame: pd.DataFrame() for frame in ALERT_FRAMES}
+
+    payload = {
+        "objectId": oid,
+        "withupperlim": True,
+        "withcutouts": False,
+    }
+    if startdate is not None:
+        payload["startdate"] = startdate
+
+    pdf = request_api(
+        "/api/v1/objects",
+        json=payload,
+        dtype={"i:ssnamenr": str},  # Force reading this field as string
+    )
+    if startdate is not None and not pdf.empty:
+        # The API may ignore `startdate`, and send the whole history
+        pdf = pdf[pdf["i:jd"] > startdate]
+    if pdf.empty:
+        return frames
+
+    pdf["i:ssnamenr"] = pdf["i:ssnamenr"].replace(
+        "None", "null"
+    )  # For backwards compatibility
+
+    frames["data"] = pdf[pdf["d:tag"] == "valid"]
+    frames["upper"] = pdf[pdf["d:tag"] == "upperlim"]
+    frames["uppervalid"] = pdf[pdf["d:tag"] == "badquality"]
+
+    return frames
+
+
+def companion_call(pdfs, frame):
+    """API call returning the SSO or tracklet data of an object
+
+    Parameters
+    ----------
+    pdfs: pd.DataFrame
+        Valid alerts of the object
+    frame: str
+        One of `LAZY_FRAMES`
+
+    Returns
+    -------
+    call: dict or None
+        Arguments of `request_api`. None if the object is
+        not a SSO (resp. a tracklet).
+    """
+    if pdfs.empty:
+        return None
+
+    if frame == "sso":
+        payload = pdfs["i:ssnamenr"].to_numpy()[0]
+        is_sso = np.all([i == payload for i in pdfs["i:ssnamenr"].to_numpy()])
+        if str(payload) == "null" or not is_sso:
+            return None
+        return {
+            "endpoint": "/api/v1/sso",
+            "json": {"n_or_d": payload, "withEphem": True, "withResiduals": False},
+        }
+
+    payload = pdfs["d:tracklet"].to_numpy()[0]
+    if not str(payload).startswith("TRCK"):
+        return None
+    return {
+        "endpoint": "/api/v1/tracklet",
+        "json": {
+            "id": payload,
+        },
+    }
+
+
+def fetch_companion(pdfs, frame):
+    """Fetch the SSO or tracklet data of an object
+
+    Parameters
+    ----------
+    pdfs: pd.DataFrame
+        Valid alerts of the object
+    frame: str
+        One of `LAZY_FRAMES`
+
+    Returns
+    -------
+    pdf: pd.DataFrame
+        Empty if the object is not a SSO (resp. a tracklet),
+        or if the request failed.
+    """
+    call = companion_call(pdfs, frame)
+    if call is None:
+        return pd.DataFrame()
+
+    try:
+        return request_api(**call)
+    except Exception as e:
+        print("Request to {} failed: {!r}".format(call["endpoint"], e))
+        return pd.DataFrame()
+
+
+def fetch_bundle(oid):
+    """Fetch the alerts of an object
+
+    SSO and tracklet data are not fetched here, but on first
+    use (see `load_object_frame`).
+
+    Parameters
+    ----------
+    oid: str
+        ZTF objectId
+
+    Returns
+    -------
+    bundle: dict
+        `oid`, and a DataFrame for each of `ALERT_FRAMES`: valid
+        alerts, upper limits and bad quality measurements.
+    """
+    return {"oid": oid, **fetch_alerts(oid)}
+
+
+def add_derived_columns(pdf):
+    """Add the photometry derived from the valid alerts of an object
+
+    Parameters
+    ----------
+    pdf: pd.DataFrame
+        Valid alerts of an object
+
+    Returns
+    -------
+    out: pd.DataFrame
+        Copy of `pdf`, with the columns:
+        - `v:date`: ISO date (UTC) of `i:jd`
+        - `v:mag_dc`, `v:sigma_mag_dc`: DC magnitude
+        - `v:dc_valid`: True if the DC magnitude error is below 1 mag
+        - `v:flux`, `v:sigma_flux`: difference flux (Jy), with the sign
+          of `i:isdiffpos`
+        - `v:flux_dc`, `v:sigma_flux_dc`: DC flux (Jy)
+    """
+    pdf = pdf.copy()
+    pdf["v:date"] = convert_jd(pdf["i:jd"])
+
+    args = [pdf[c] for c in ["i:magpsf", "i:sigmapsf", "i:magnr", "i:sigmagnr"]]
+    isdiffpos = pdf["i:isdiffpos"]
+
+    pdf["v:mag_dc"], pdf["v:sigma_mag_dc"] = dc_mag(*args, isdiffpos)
+    pdf["v:dc_valid"] = pdf["v:sigma_mag_dc"] < 1
+    pdf["v:flux_dc"], pdf["v:sigma_flux_dc"] = apparent_flux(*args, isdiffpos)
+
+    # First convert the magnitude, then apply the proper sign
+    flux, sigma_flux = apparent_flux(args[0], args[1], 99.0, 0.0, "t")
+    pdf["v:flux"] = np.where(is_positive(isdiffpos), flux, -flux)
+    pdf["v:sigma_flux"] = sigma_flux
+
+    return pdf
+
+
+def derive_colors(pdf, pdf_upperv):
+    """Frames of g-r colours of an object
+
+    Parameters
+    ----------
+    pdf: pd.DataFrame
+        Valid alerts, with the columns of `add_derived_columns`
+    pdf_upperv: pd.DataFrame
+        Bad quality measurements
+
+    Returns
+    -------
+    colors: dict
+        Output of `apps.utils.extract_color`, with `v:date`, for each of
+        `DERIVED_FRAMES`: from the difference magnitudes of valid and bad
+        quality alerts, and from the DC magnitudes of valid alerts.
+    """
+    # Exclude lower-quality points overlapping higher-quality ones
+    pdf_upperv = pdf_upperv[~pdf_upperv["i:jd"].isin(pdf["i:jd"])]
+
+    cols = ["i:jd", "i:fid", "i:magpsf", "i:sigmapsf"]
+    colors = {"color": pd.concat([pdf[cols], pdf_upperv[cols]])}
+
+    if is_source_behind(pdf["i:distnr"].to_numpy()[0]):
+        pdf_dc = pdf[pdf["v:dc_valid"]]
+        colors["color_dc"] = pd.DataFrame(
+            {
+                "i:jd": pdf_dc["i:jd"],
+                "i:fid": pdf_dc["i:fid"],
+                "i:magpsf": pdf_dc["v:mag_dc"],
+                "i:sigmapsf": pdf_dc["v:sigma_mag_dc"],
+            },
+        )
+    else:
+        colors["color_dc"] = pdf[cols]
+
+    for frame, pdf_ in colors.items():
+        pdf_gr = extract_color(pdf_)
+        colors[frame] = pdf_gr.assign(**{"v:date": convert_jd(pdf_gr["i:jd"])})
+
+    return colors
+
+
+def derive_alerts(frames):
+    """Add derived columns to the alert frames of a bundle
+
+    Parameters
+    ----------
+    frames: dict
+        DataFrame for each of `ALERT_FRAMES`, with valid alerts
+
+    Returns
+    -------
+    frames: dict
+        `frames`, with `v:date` in each frame and the derived
+        photometry in `data` (see `add_derived_columns`).
+    """
+    frames["data"] = add_derived_columns(frames["data"])
+    for frame in ["upper", "uppervalid"]:
+        frames[frame] = frames[frame].assign(
+            **{"v:date": convert_jd(frames[frame]["i:jd"])}
+        )
+
+    return frames
+
+
+def derive_bundle(bundle):
+    """Add derived columns and frames to a bundle
+
+    Parameters
+    ----------
+    bundle: dict
+        Output of `fetch_bundle`
+
+    Returns
+    -------
+    bundle: dict
+        `bundle`, with the derived columns of `derive_alerts`, and
+        the colour frames of `derive_colors`.
+    """
+    bundle.update({frame: pd.DataFrame() for frame in DERIVED_FRAMES})
+    if bundle["data"].empty:
+        return bundle
+
+    derive_alerts(bundle)
+    bundle.update(derive_colors(bundle["data"], bundle["uppervalid"]))
+
+    return bundle
+
+
+def last_jd(bundle):
+    """Julian Date of the most recent measurement of a bundle"""
+    return max(bundle[frame]["i:jd"].max() for frame in ALERT_FRAMES)
+
+
+def update_bundle(bundle, startdate):
+    """Add the alerts received since a bundle was fetched
+
+    Only the new alerts are fetched, and their derived columns computed.
+    Colours, that depend on the whole history, are computed again.
+
+    Parameters
+    ----------
+    bundle: dict
+        Output of `derive_bundle`, with valid alerts
+    startdate: float
+        Julian Date of the most recent measurement of `bundle`
+
+    Returns
+    -------
+    bundle: dict
+        As `derive_bundle`
+    """
+    tail = fetch_alerts(bundle["oid"], startdate=startdate)
+    if all(tail[frame].empty for frame in ALERT_FRAMES):
+        return bundle
+
+    derive_alerts(tail)
+    for frame in ALERT_FRAMES:
+        # Most recent first, as returned by the API
+        bundle[frame] = pd.concat([tail[frame], bundle[frame]], ignore_index=True)
+
+    bundle.update(derive_colors(bundle["data"], bundle["uppervalid"]))
+
+    return bundle
+
+
+def _get_encoded_bundle(oid):
+    """Bundle of an object, with its frames in the Arrow IPC format
+
+    Bundles are computed again after `BUNDLE_TTL`. If the API honours
+    `startdate` (`API_OBJECTS_STARTDATE`), bundles of known objects are
+    also kept for `BUNDLE_HISTORY_TTL`, with the date of their last
+    measurement, so that only newer alerts are fetched then (see
+    `update_bundle`). The whole history is fetched again once it is
+    older than `BUNDLE_HISTORY_MAX_AGE`.
+    """
+    config = extract_configuration("config.yml")
+    cache = get_bundle_cache(config)
+    compression = config.get("BUNDLE_COMPRESSION")
+    incremental = bool(config.get("API_OBJECTS_STARTDATE", False))
+    max_age = float(
+        config.get("BUNDLE_HISTORY_MAX_AGE", DEFAULT_BUNDLE_HISTORY_MAX_AGE)
+    )
+
+    def fetch():
+        history = cache.get(f"history:{oid}") if incremental else None
+        age = time.time() - history.get("fetched_at", 0) if history else None
+        if age is not None and age > max_age:
+            # Reprocessed columns (e.g. classifications) are updated too
+            history = None
+
+        if history is None:
+            bundle = derive_bundle(fetch_bundle(oid))
+            fetched_at = time.time()
+        else:
+            bundle = update_bundle(decode_bundle(history), history["last_jd"])
+            fetched_at = history["fetched_at"]
+
+        encoded = {
+            "oid": oid,
+            "empty": bundle["data"].empty,
+            **{
+                frame: encode_frame(bundle[frame], compression=compression)
+                for frame in ALERT_FRAMES + DERIVED_FRAMES
+            },
+        }
+        if incremental and not encoded["empty"]:
+            encoded["last_jd"] = float(last_jd(bundle))
+            # Date of the last fetch of the whole history
+            encoded["fetched_at"] = fetched_at
+            cache.set(
+                f"history:{oid}",
+                encoded,
+                expire=float(
+                    config.get("BUNDLE_HISTORY_TTL", DEFAULT_BUNDLE_HISTORY_TTL)
+                ),
+            )
+
+        return encoded
+
+    # Objects not found are not kept: they may be ingested tonight
+    return _get_or_compute(
+        f"bundle:{oid}",
+        fetch,
+        should_cache=lambda bundle: not bundle["empty"],
+    )
+
+
+def decode_bundle(encoded):
+    """Bundle from the output of `_get_encoded_bundle`"""
+    return {
+        "oid": encoded["oid"],
+        **{
+            frame: decode_frame(encoded[frame])
+            for frame in ALERT_FRAMES + DERIVED_FRAMES
+        },
+    }
+
+
+def get_object_bundle(name):
+    """Bundle of an object page, fetched once for all callbacks and workers
+
+    Parameters
+    ----------
+    name: str
+        ZTF objectId, or name defined by a user (metaname)
+
+    Returns
+    -------
+    bundle: dict or None
+        See `derive_bundle`. None if the name is not known.
+    """
+    oid = resolve_object_name(name)
+    if oid is None:
+        return None
+
+    return decode_bundle(_get_encoded_bundle(oid))
+
+
+def warm_object_bundle(oid):
+    """Fetch the bundle of an object into the cache
+
+    Parameters
+    ----------
+    oid: str
+        ZTF objectId
+
+    Returns
+    -------
+    kept: bool
+        True if the bundle is in the cache, False if
+        the object was not found.
+    """
+    return not _get_encoded_bundle(oid)["empty"]
+
+
+def _get_encoded_lazy_frame(oid, frame):
+    """SSO or tracklet data of an object, in the Arrow IPC format"""
+
+    def fetch():
+        pdfs = decode_frame(
+            _get_encoded_bundle(oid)["data"], columns=["i:ssnamenr", "d:tracklet"]
+        )
+        pdf = fetch_companion(pdfs, frame)
+        return {
+            # No data although the object is a SSO (resp. a tracklet)
+            "failed": pdf.empty and companion_call(pdfs, frame) is not None,
+            "data": encode_frame(
+                pdf,
+                compression=extract_configuration("config.yml").get(
+                    "BUNDLE_COMPRESSION"
+                ),
+            ),
+        }
+
+    # Failed requests are not kept: the service may be back soon
+    encoded = _get_or_compute(
+        f"lazy:{frame}:{oid}",
+        fetch,
+        should_cache=lambda encoded: not encoded["failed"],
+    )
+    return encoded["data"]
+
+
+def load_object_frame(key, frame, columns=None):
+    """Frame of an object page, from the key held by its data stores
+
+    The bundle is fetched again if it has left the cache since the
+    page was opened. SSO and tracklet data (`LAZY_FRAMES`) are fetched
+    the first time they are read, and kept for `BUNDLE_TTL`.
+
+    Parameters
+    ----------
+    key: str
+        Key of the bundle, as returned by `store_query`
+    frame: str
+        One of `BUNDLE_FRAMES` or `DERIVED_FRAMES`
+    columns: list of str, optional
+        Columns used by the callback. Only these columns are decoded,
+        with narrow dtypes (see `decode_frame`). Default is all columns.
+
+    Returns
+    -------
+    pdf: pd.DataFrame
+    """
+    if frame in LAZY_FRAMES:
+        return decode_frame(_get_encoded_lazy_frame(key, frame), columns=columns)
+
+    return decode_frame(_get_encoded_bundle(key)[frame], columns=columns)
@@ -0,0 +1,329 @@
+# Copyright 2026 AstroLab Software
+# Author: Julien Peloton
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Caches shared between the gunicorn workers of the portal
+
+Caches are stored on disk with `diskcache` (as for the background
+callbacks in `app.py`), so that all worker processes see the same entries.
+
+To invalidate API responses once the nightly data has been ingested, run:
+
+    python -m apps.cache --invalidate
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+
+import diskcache
+
+# Default values, that can be overwritten in config.yml
+DEFAULT_CACHE_DIR = "./cache"
+DEFAULT_API_CACHE_SIZE = 2**30  # bytes
+DEFAULT_LOCK_TIMEOUT = 60  # seconds
+LOCK_POLL_INTERVAL = 0.05  # seconds
+
+# Time-to-live of API responses, in seconds.
+# Endpoints not listed here are never cached.
+API_CACHE_TTL = {
+    "/api/v1/schema": 6 * 3600,
+    "/api/v1/statistics": 3600,
+    "/api/v1/objects": 600,
+    "/api/v1/sso": 3600,
+    "/api/v1/tracklet": 3600,
+    "/api/v1/resolver": 3600,
+    "/api/v1/metadata": 300,
+    "/api/v1/conesearch": 300,
+    "/api/v1/latests": 60,
+    "/api/v1/anomaly": 60,
+    "/api/v1/cutouts": 7 * 86400,
+}
+
+# Endpoints whose content does not change with new nights
+IMMUTABLE_ENDPOINTS = ["/api/v1/schema", "/api/v1/cutouts"]
+
+# Field of the payload that makes the responses of an endpoint immutable.
+# Without it, the response depends on the latest alerts and is not cached.
+IMMUTABLE_KEYS = {"/api/v1/cutouts": "candid"}
+
+_caches = {}
+_caches_pid = None
+_caches_lock = threading.Lock()
+
+
+def get_cache(name, config=None, **settings):
+    """Return a named cache shared between processes
+
+    Parameters
+    ----------
+    name: str
+        Name of the cache. Data is stored in `<CACHE_DIR>/<name>`.
+    config: dict, optional
+        User configuration (see `apps.utils.extract_configuration`).
+    **settings
+        Extra `diskcache.Cache` settings, used only when the
+        cache is opened for the first time in the process.
+
+    Returns
+    -------
+    cache: diskcache.Cache
+    """
+    global _caches_pid
+
+    if config is None:
+        config = {}
+
+    with _caches_lock:
+        # SQLite connections must not be shared after a fork
+        if _caches_pid != os.getpid():
+            _caches.clear()
+            _caches_pid = os.getpid()
+
+        if name not in _caches:
+            directory = os.path.join(config.get("CACHE_DIR", DEFAULT_CACHE_DIR), name)
+            _caches[name] = diskcache.Cache(directory, **settings)
+
+    return _caches[name]
+
+
+def get_api_cache(config=None):
+    """Return the cache of API responses
+
+    Entries are evicted in least-recently-used order once the
+    cache grows above `API_CACHE_SIZE` bytes.
+
+    Parameters
+    ----------
+    config: dict, optional
+        User configuration (see `apps.utils.extract_configuration`).
+
+    Returns
+    -------
+    cache: diskcache.Cache
+    """
+    if config is None:
+        config = {}
+
+    return get_cache(
+        "api",
+        config,
+        size_limit=int(config.get("API_CACHE_SIZE", DEFAULT_API_CACHE_SIZE)),
+        eviction_policy="least-recently-used",
+        statistics=True,
+        tag_index=True,
+    )
+
+
+def api_cache_ttl(endpoint, config=None, payload=None):
+    """Time-to-live of the responses of an endpoint
+
+    Parameters
+    ----------
+    endpoint: str
+        API route, e.g. `/api/v1/objects`
+    config: dict, optional
+        User configuration. `API_CACHE: false` disables the cache,
+        and `API_CACHE_TTL` overwrites the defaults per endpoint.
+    payload: dict, optional
+        Payload of the request. Cutouts are cached only for
+        a given alert (see `IMMUTABLE_KEYS`).
+
+    Returns
+    -------
+    ttl: float or None
+        Time-to-live in seconds. None if the responses
+        must not be cached.
+    """
+    if config is None:
+        config = {}
+
+    if not config.get("API_CACHE", True):
+        return None
+
+    if endpoint in IMMUTABLE_KEYS and IMMUTABLE_KEYS[endpoint] not in (payload or {}):
+        # e.g. cutouts of the last alert of an object
+        return None
+
+    ttl = {**API_CACHE_TTL, **config.get("API_CACHE_TTL", {})}.get(endpoint)
+    if not ttl:
+        return None
+
+    return ttl
+
+
+def make_api_key(apiurl, endpoint, method, payload):
+    """Cache key for an API call
+
+    The payload is canonicalised, so that the order of
+    its keys does not matter.
+
+    Parameters
+    ----------
+    apiurl: str
+        Base URL of the API
+    endpoint: str
+        API route, e.g. `/api/v1/objects`
+    method: str
+        HTTP method
+    payload: dict or None
+        Payload of the request
+
+    Returns
+    -------
+    key: str
+    """
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    digest = hashlib.sha1(canonical.encode()).hexdigest()
+    return f"{method}:{apiurl}{endpoint}:{digest}"
+
+
+def get_or_compute(
+    cache,
+    key,
+    func,
+    expire=None,
+    tag=None,
+    should_cache=None,
+    lock_timeout=DEFAULT_LOCK_TIMEOUT,
+):
+    """Get a value from the cache, or compute it once for all processes
+
+    On a miss, a lock entry is added to the cache so that only one
+    process calls `func`. The other processes wait for the value to
+    appear in the cache, and give up waiting after `lock_timeout` seconds.
+
+    Parameters
+    ----------
+    cache: diskcache.Cache
+        Shared cache
+    key: str
+        Cache key
+    func: callable
+        Function without arguments computing the value
+    expire: float, optional
+        Time-to-live of the value in seconds
+    tag: str, optional
+        Tag of the value (see `invalidate_api_cache`)
+    should_cache: callable, optional
+        Predicate on the value. If False, the value is
+        returned but not cached. Default is to cache everything.
+    lock_timeout: float, optional
+        Maximum time to wait for another process, in seconds.
+        It is also the lifetime of the lock.
+
+    Returns
+    -------
+    value: object
+    """
+    value = cache.get(key)
+    if value is not None:
+        return value
+
+    lock = f"lock:{key}"
+    deadline = time.monotonic() + lock_timeout
+    acquired = cache.add(lock, os.getpid(), expire=lock_timeout)
+    while not acquired and time.monotonic() < deadline:
+        time.sleep(LOCK_POLL_INTERVAL)
+        # membership test does not count as a miss in the statistics
+        if key in cache:
+            value = cache.get(key)
+            if value is not None:
+                return value
+        # the other process gave up (failed request)
+        acquired = cache.add(lock, os.getpid(), expire=lock_timeout)
+
+    try:
+        value = func()
+        if should_cache is None or should_cache(value):
+            cache.set(key, value, expire=expire, tag=tag)
+    finally:
+        if acquired:
+            cache.delete(lock)
+
+    return value
+
+
+def invalidate_api_cache(endpoints=None, config=None):
+    """Evict cached API responses
+
+    Parameters
+    ----------
+    endpoints: list of str, optional
+        Endpoints to invalidate. Default is all endpoints
+        whose content changes when a new night is ingested.
+    config: dict, optional
+        User configuration (see `apps.utils.extract_configuration`).
+
+    Returns
+    -------
+    count: int
+        Number of evicted entries
+    """
+    if endpoints is None:
+        endpoints = [i for i in API_CACHE_TTL if i not in IMMUTABLE_ENDPOINTS]
+
+    cache = get_api_cache(config)
+    return sum(cache.evict(endpoint) for endpoint in endpoints)
+
+
+def api_cache_stats(config=None):
+    """Hit/miss counters and size of the API cache (all workers)
+
+    Parameters
+    ----------
+    config: dict, optional
+        User configuration (see `apps.utils.extract_configuration`).
+
+    Returns
+    -------
+    out: dict
+    """
+    cache = get_api_cache(config)
+    hits, misses = cache.stats()
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+        "entries": len(cache),
+        "bytes": cache.volume(),
+    }
+
+
+if __name__ == "__main__":
+    import yaml
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--invalidate",
+        nargs="*",
+        metavar="ENDPOINT",
+        help="Evict cached API responses (default: all night-dependent endpoints)",
+    )
+    parser.add_argument(
+        "--stats", action="store_true", help="Print the API cache counters"
+    )
+    args = parser.parse_args()
+
+    with open("config.yml") as f:
+        config = yaml.load(f, yaml.Loader)
+
+    if args.invalidate is not None:
+        count = invalidate_api_cache(args.invalidate or None, config)
+        print(f"{count} entries evicted")
+
+    if args.stats:
+        print(api_cache_stats(config))
@@ -12,7 +12,6 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-import io
 import textwrap
 
 import dash_bootstrap_components as dbc
@@ -20,21 +19,23 @@ import dash_mantine_components as dmc
 import numpy as np
 import pandas as pd
 from astropy.coordinates import SkyCoord
-from astropy.time import Time
 from dash import Input, Output, State, clientside_callback, dcc, html
 from dash_iconify import DashIconify
 from fink_utils.photometry.utils import is_source_behind
 
 from app import app
+from apps.bundle import load_object_frame
 from apps.plotting import all_radio_options
 from apps.utils import (
     class_colors,
+    convert_jd,
     create_button_for_external_conesearch,
     get_first_value,
     get_multi_labels,
     help_popover,
     loading,
     request_api,
+    request_many,
     simbad_types,
 )
 
@@ -876,27 +877,48 @@ def make_badge(text="", color=None, outline=None, tooltip=None, **kwargs):
     return badge
 
 
-def generate_tns_badge(oid):
+def tns_resolver_call(oid):
+    """Arguments of `request_api` to resolve TNS names for a ZTF object ID"""
+    return {
+        "endpoint": "/api/v1/resolver",
+        "json": {
+            "resolver": "tns",
+            "name": oid,
+            "reverse": True,
+        },
+        "output": "json",
+    }
+
+
+def metadata_call(oid):
+    """Arguments of `request_api` to get user metadata for a ZTF object ID"""
+    return {
+        "endpoint": "/api/v1/metadata",
+        "json": {
+            "objectId": oid,
+        },
+        "method": "GET",
+        "output": "json",
+    }
+
+
+def generate_tns_badge(oid, r=None):
     """Generate TNS badge
 
     Parameters
     ----------
     oid: str
         ZTF object ID
+    r: list, optional
+        Output of the TNS resolver for `oid`.
+        Queried if not provided.
 
     Returns
     -------
     badge: dmc.Badge or None
     """
-    r = request_api(
-        "/api/v1/resolver",
-        json={
-            "resolver": "tns",
-            "name": oid,
-            "reverse": True,
-        },
-        output="json",
-    )
+    if r is None:
+        r = request_api(**tns_resolver_call(oid))
 
     if r != []:
         entries = [i["d:fullname"] for i in r]
@@ -1035,26 +1057,23 @@ def generate_generic_badges(row, variant="dot"):
     return badges
 
 
-def generate_metadata_name(oid):
+def generate_metadata_name(oid, r=None):
     """Generate name from metadata
 
     Parameters
     ----------
     oid: str
         ZTF object ID
+    r: list, optional
+        Output of the metadata endpoint for `oid`.
+        Queried if not provided.
 
     Returns
     -------
     name: str
     """
-    r = request_api(
-        "/api/v1/metadata",
-        json={
-            "objectId": oid,
-        },
-        method="GET",
-        output="json",
-    )
+    if r is None:
+        r = request_api(**metadata_call(oid))
 
     if r != []:
         name = r[0]["d:internal_name"]
@@ -1075,7 +1094,7 @@ def generate_metadata_name(oid):
 )
 def card_id1(object_data, object_uppervalid, object_upper):
     """Add a card containing basic alert data"""
-    pdf = pd.read_json(io.StringIO(object_data))
+    pdf = load_object_frame(object_data, "data")
 
     objectid = pdf["i:objectId"].to_numpy()[0]
     date_end = pdf["v:lastdate"].to_numpy()[0]
@@ -1083,14 +1102,16 @@ def card_id1(object_data, object_uppervalid, object_upper):
     jds = pdf["i:jd"].to_numpy()
     ndet = len(pdf)
 
-    pdf_upper_valid = pd.read_json(io.StringIO(object_uppervalid))
+    pdf_upper_valid = load_object_frame(
+        object_uppervalid, "uppervalid", columns=["i:jd"]
+    )
     if not pdf_upper_valid.empty:
         mask = pdf_upper_valid["i:jd"].apply(lambda x: x not in jds)
         nupper_valid = len(pdf_upper_valid[mask])
     else:
         nupper_valid = 0
 
-    pdf_upper = pd.read_json(io.StringIO(object_upper))
+    pdf_upper = load_object_frame(object_upper, "upper", columns=["i:jd"])
     if not pdf_upper.empty:
         nupper = len(pdf_upper)
     else:
@@ -1114,13 +1135,17 @@ def card_id1(object_data, object_uppervalid, object_upper):
             ),
         )
 
-    tns_badge = generate_tns_badge(get_first_value(pdf, "i:objectId"))
+    # TNS and metadata names are independent -- fetch them concurrently
+    oid = get_first_value(pdf, "i:objectId")
+    r_tns, r_meta = request_many([tns_resolver_call(oid), metadata_call(oid)])
+
+    tns_badge = generate_tns_badge(oid, r_tns)
     if tns_badge is not None:
         badges.append(tns_badge)
 
     badges += generate_generic_badges(pdf, variant="dot")
 
-    meta_name = generate_metadata_name(get_first_value(pdf, "i:objectId"))
+    meta_name = generate_metadata_name(oid, r_meta)
     if meta_name is not None:
         extra_div = dbc.Row(
             [
@@ -1235,7 +1260,7 @@ def card_search_result(row, i):
 
     jdend = row.get("i:jdendhist", row.get("i:jd"))
     jdstart = row.get("i:jdstarthist")
-    lastdate = row.get("i:lastdate", Time(jdend, format="jd").iso)
+    lastdate = row.get("i:lastdate", convert_jd(jdend))
 
     coords = SkyCoord(row["i:ra"], row["i:dec"], unit="deg")
 
@@ -1248,7 +1273,7 @@ def card_search_result(row, i):
     """.format(
         ndethist,
         jdend - jdstart,
-        Time(jdstart, format="jd").iso[:19],
+        convert_jd(jdstart)[:19],
         lastdate[:19],
         coords.ra.to_string(pad=True, unit="hour", precision=2, sep=" "),
         coords.dec.to_string(
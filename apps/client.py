@@ -0,0 +1,297 @@
+# Copyright 2026 AstroLab Software
+# Author: Julien Peloton
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Process-wide HTTP client for the Fink REST API
+
+All calls to the API go through a single `requests.Session` per worker
+process, so that TCP/TLS connections are kept alive and re-used across
+callbacks instead of being re-opened for every request.
+"""
+
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Default values, that can be overwritten in config.yml
+DEFAULT_CONNECT_TIMEOUT = 3.05
+DEFAULT_READ_TIMEOUT = None  # no limit: large searches can be slow
+DEFAULT_POOL_SIZE = 20
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF_FACTOR = 0.5
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_WIRE_FORMAT = "parquet"
+
+# Transient gateway errors worth a retry
+RETRY_STATUS_CODES = (429, 502, 503, 504)
+
+_session = None
+_session_pid = None
+_session_lock = threading.Lock()
+
+_executor = None
+_executor_pid = None
+
+# Endpoints able to send tabular data in a columnar format
+# (`output-format` in the payload), instead of JSON.
+COLUMNAR_ENDPOINTS = {
+    "/api/v1/objects",
+    "/api/v1/conesearch",
+    "/api/v1/latests",
+    "/api/v1/anomaly",
+    "/api/v1/sso",
+    "/api/v1/tracklet",
+}
+
+# Endpoints that rejected the columnar format during the lifetime of the process
+_json_only_endpoints = set()
+
+PARQUET_MAGIC = b"PAR1"
+
+# Calls in progress in the current process, by key
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+
+def make_session(
+    pool_size=DEFAULT_POOL_SIZE,
+    retries=DEFAULT_RETRIES,
+    backoff_factor=DEFAULT_BACKOFF_FACTOR,
+):
+    """Create a session with connection pooling and bounded retries
+
+    Parameters
+    ----------
+    pool_size: int, optional
+        Maximum number of connections kept alive per host.
+    retries: int, optional
+        Maximum number of retries for connection errors and
+        transient HTTP status codes. Requests that timed out
+        while reading are not sent again.
+    backoff_factor: float, optional
+        Exponential backoff factor between retries, in seconds.
+
+    Returns
+    -------
+    session: requests.Session
+    """
+    # POST is retried as well: all API endpoints are read-only queries.
+    # Read errors are not retried, not to run heavy queries several times.
+    retry = Retry(
+        total=retries,
+        connect=retries,
+        read=0,
+        status=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=frozenset(["GET", "POST"]),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry
+    )
+
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    return session
+
+
+def get_session(config=None):
+    """Return the session of the current process, creating it if needed
+
+    The session is re-created after a fork, as connections
+    cannot be shared between gunicorn workers.
+
+    Parameters
+    ----------
+    config: dict, optional
+        User configuration (see `apps.utils.extract_configuration`).
+        Only used when the session is created.
+
+    Returns
+    -------
+    session: requests.Session
+    """
+    global _session, _session_pid
+
+    if _session is not None and _session_pid == os.getpid():
+        return _session
+
+    if config is None:
+        config = {}
+
+    with _session_lock:
+        if _session is None or _session_pid != os.getpid():
+            _session = make_session(
+                pool_size=int(config.get("API_POOL_SIZE", DEFAULT_POOL_SIZE)),
+                retries=int(config.get("API_RETRIES", DEFAULT_RETRIES)),
+                backoff_factor=float(
+                    config.get("API_BACKOFF_FACTOR", DEFAULT_BACKOFF_FACTOR)
+                ),
+            )
+            _session_pid = os.getpid()
+
+    return _session
+
+
+def get_timeout(config=None):
+    """Return the (connect, read) timeouts in seconds
+
+    Parameters
+    ----------
+    config: dict, optional
+        User configuration (see `apps.utils.extract_configuration`).
+
+    Returns
+    -------
+    out: tuple of float
+        The read timeout is None (no limit) unless
+        `API_READ_TIMEOUT` is set.
+    """
+    if config is None:
+        config = {}
+
+    read_timeout = config.get("API_READ_TIMEOUT", DEFAULT_READ_TIMEOUT)
+    return (
+        float(config.get("API_CONNECT_TIMEOUT", DEFAULT_CONNECT_TIMEOUT)),
+        None if read_timeout is None else float(read_timeout),
+    )
+
+
+def get_executor(config=None):
+    """Return the thread pool of the current process used for concurrent calls
+
+    Parameters
+    ----------
+    config: dict, optional
+        User configuration (see `apps.utils.extract_configuration`).
+        Only used when the pool is created.
+
+    Returns
+    -------
+    executor: concurrent.futures.ThreadPoolExecutor
+    """
+    global _executor, _executor_pid
+
+    if _executor is not None and _executor_pid == os.getpid():
+        return _executor
+
+    if config is None:
+        config = {}
+
+    with _session_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ThreadPoolExecutor(
+                max_workers=int(config.get("API_MAX_WORKERS", DEFAULT_MAX_WORKERS)),
+                thread_name_prefix="fink-api",
+            )
+            _executor_pid = os.getpid()
+
+    return _executor
+
+
+def negotiate_wire_format(endpoint, payload, method="POST", config=None):
+    """Add the columnar wire format to the payload, if the endpoint supports it
+
+    Parameters
+    ----------
+    endpoint: str
+        API route, e.g. `/api/v1/objects`
+    payload: dict or None
+        Payload of the request. Not modified.
+    method: str, optional
+        HTTP method. Only POST requests are negotiated.
+    config: dict, optional
+        User configuration. `API_WIRE_FORMAT: json` disables
+        the columnar format.
+
+    Returns
+    -------
+    payload: dict or None
+        Payload to send. A copy with `output-format` is returned if
+        the columnar format is requested, the input payload otherwise.
+    columnar: bool
+        True if the columnar format is requested.
+    """
+    if config is None:
+        config = {}
+
+    wire_format = config.get("API_WIRE_FORMAT", DEFAULT_WIRE_FORMAT)
+    if (
+        wire_format == "json"
+        or method != "POST"
+        or not isinstance(payload, dict)
+        or "output-format" in payload
+        or endpoint not in COLUMNAR_ENDPOINTS
+        or endpoint in _json_only_endpoints
+    ):
+        return payload, False
+
+    return {**payload, "output-format": wire_format}, True
+
+
+def reject_wire_format(endpoint):
+    """Fall back to JSON for an endpoint that does not accept the columnar format"""
+    _json_only_endpoints.add(endpoint)
+
+
+def is_parquet(content):
+    """Check whether the response body is a Parquet file"""
+    return content[:4] == PARQUET_MAGIC
+
+
+def single_flight(key, func):
+    """Run `func` only once for concurrent callers with the same key
+
+    The first caller runs `func`, and the others wait for it
+    and get the same result (or exception).
+
+    Parameters
+    ----------
+    key: str
+        Identifier of the call, e.g. from `apps.cache.make_api_key`
+    func: callable
+        Function without arguments
+
+    Returns
+    -------
+    out: object
+        Output of `func`
+    """
+    with _inflight_lock:
+        future = _inflight.get(key)
+        leader = future is None
+        if leader:
+            future = Future()
+            _inflight[key] = future
+
+    if not leader:
+        return future.result()
+
+    try:
+        result = func()
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    else:
+        future.set_result(result)
+        return result
+    finally:
+        with _inflight_lock:
+            del _inflight[key]
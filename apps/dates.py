@@ -0,0 +1,109 @@
+# Copyright 2026 AstroLab Software
+# Author: Julien Peloton
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Conversion of Julian Dates into ISO dates (UTC), for display
+
+`astropy.time.Time` is exact, but slow to build, especially for scalars.
+Since the last leap second (end of 2016), all UTC days have 86400 seconds,
+and a Julian Date maps to a date with plain `datetime64` arithmetic.
+Dates before that, or other formats, go through astropy.
+
+The output matches `Time(jd, format=format).iso` (see
+`benchmarks/convert_jd.py`).
+"""
+
+import functools
+
+import numpy as np
+
+# Julian Date (UTC) of 2017-01-01, the day after the last leap second.
+# To be updated if the IERS announces a new leap second.
+LAST_LEAP_SECOND_JD = 2457754.5
+
+# Origin of each format, in the format itself
+UNIX_EPOCH = {"jd": 2440587.5, "mjd": 40587.0}
+
+MS_PER_DAY = 86400000
+
+
+def _astropy_iso(jd, format):
+    """Reference conversion, with astropy"""
+    from astropy.time import Time
+
+    return Time(jd, format=format).iso
+
+
+def jd_to_iso(jd, format="jd"):
+    """Convert Julian Dates into ISO dates (UTC), with millisecond precision
+
+    Parameters
+    ----------
+    jd: array-like
+        Julian Dates
+    format: str
+        `jd` or `mjd`
+
+    Returns
+    -------
+    out: np.array of str
+        Dates as `YYYY-MM-DD HH:MM:SS.sss`
+    """
+    jd = np.asarray(jd, dtype=float)
+    offset = UNIX_EPOCH[format]
+    if jd.size == 0:
+        return np.array([], dtype="<U23")
+
+    limit = LAST_LEAP_SECOND_JD - UNIX_EPOCH["jd"] + offset
+    if not np.all(np.isfinite(jd) & (jd >= limit)):
+        return _astropy_iso(jd, format)
+
+    # Days since 1970-01-01 (exact: both operands have close magnitudes),
+    # then the fraction of the day rounded to the millisecond
+    days = jd - offset
+    whole = np.floor(days)
+    ms = np.floor((days - whole) * MS_PER_DAY + 0.5)
+    total = whole.astype(np.int64) * MS_PER_DAY + ms.astype(np.int64)
+
+    out = np.datetime_as_string(total.astype("datetime64[ms]"), unit="ms")
+    out = np.atleast_1d(out).astype("<U23")
+
+    # `T` separator -> space, in place
+    out.view("<U1").reshape(-1, 23)[:, 10] = " "
+    return out.reshape(jd.shape)
+
+
+@functools.lru_cache(maxsize=4096)
+def _scalar_jd_to_iso(jd, format):
+    """Cached conversion of a single date"""
+    return str(jd_to_iso(jd, format))
+
+
+def convert_jd_fast(jd, format="jd"):
+    """Convert Julian Date(s) into ISO date(s) (UTC)
+
+    Parameters
+    ----------
+    jd: float or array-like
+        Julian Date(s)
+    format: str
+        `jd` or `mjd`
+
+    Returns
+    -------
+    out: str or np.array of str
+        Scalar for a scalar input, as `astropy.time.Time`
+    """
+    if np.ndim(jd) == 0:
+        return _scalar_jd_to_iso(float(jd), format)
+    return jd_to_iso(jd, format)
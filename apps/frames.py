@@ -0,0 +1,304 @@
+# Copyright 2026 AstroLab Software
+# Author: Julien Peloton
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Serialisation of the DataFrames kept in the caches
+
+Frames are stored in the Arrow IPC format, in a compact form: repeated
+strings (e.g. `i:objectId`, `d:tag`) are dictionary encoded, float64
+columns holding single precision values are stored as float32, and
+columns without any value take no space. Frames may also be compressed
+with zstd.
+
+Compaction is lossless: frames are read back with their original dtypes,
+or with the narrow dtypes of `NARROW_DTYPES` when only a few columns are
+read. The size of the frames of an object, before and after compaction,
+is reported by `benchmarks/bundle_size.py`.
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+# Dtypes of the columns read with `decode_frame(..., columns=...)`.
+# Magnitudes and quality figures are single precision in the ZTF alert
+# schema, so float32 does not lose information.
+NARROW_DTYPES = {
+    "i:magpsf": "float32",
+    "i:sigmapsf": "float32",
+    "i:diffmaglim": "float32",
+    "i:magnr": "float32",
+    "i:sigmagnr": "float32",
+    "i:magzpsci": "float32",
+    "i:distnr": "float32",
+    "i:classtar": "float32",
+    "i:fwhm": "float32",
+    "i:rb": "float32",
+    "i:drb": "float32",
+    "i:isdiffpos": "category",
+    "d:tag": "category",
+}
+
+# String columns are dictionary encoded if they have at most
+# this fraction of distinct values, and enough rows for the
+# dictionary to pay off
+MAX_DICTIONARY_RATIO = 0.5
+MIN_DICTIONARY_ROWS = 16
+
+# Frames with fewer rows are not compressed: the headers of
+# compressed buffers outweigh the gain
+MIN_COMPRESSED_ROWS = 10
+
+# Key of the schema metadata written by `compact_table`
+METADATA_KEY = b"fink"
+
+
+def _is_float32(column):
+    """True if the values of a float64 column are exactly float32"""
+    values = column.to_numpy()
+    return np.array_equal(
+        values.astype(np.float32).astype(np.float64), values, equal_nan=True
+    )
+
+
+def compact_table(table):
+    """Compact representation of a table built with `pa.Table.from_pandas`
+
+    The pandas metadata, that describes every column, is replaced by
+    the original dtypes of the columns changed here, and the index.
+
+    Parameters
+    ----------
+    table: pa.Table
+
+    Returns
+    -------
+    out: pa.Table
+        Same values, with dictionary encoded strings, float32 floats
+        where it is lossless, and null arrays for empty columns.
+    """
+    pandas_metadata = table.schema.pandas_metadata
+    original = {
+        c["field_name"]: "category"
+        if c["pandas_type"] == "categorical"
+        else c["numpy_type"]
+        for c in pandas_metadata["columns"]
+    }
+
+    dtypes = {}
+    for i, name in enumerate(table.column_names):
+        column = table.column(i)
+        if pa.types.is_dictionary(column.type):
+            # pandas categorical
+            dtypes[name] = original[name]
+            continue
+
+        if column.null_count == len(column) and len(column) > 0:
+            # No buffer at all
+            column = pa.nulls(len(column))
+        elif pa.types.is_string(column.type) or pa.types.is_large_string(column.type):
+            ndistinct = len(column.unique())
+            if len(
+                column
+            ) < MIN_DICTIONARY_ROWS or ndistinct > MAX_DICTIONARY_RATIO * len(column):
+                continue
+            column = column.dictionary_encode()
+        elif pa.types.is_float64(column.type):
+            # Narrowing float64 values is left to `decode_frame(..., columns=...)`
+            if not _is_float32(column):
+                continue
+            column = column.cast(pa.float32())
+        else:
+            continue
+        table = table.set_column(i, name, column)
+        dtypes[name] = original[name]
+
+    index = [i for i in pandas_metadata["index_columns"] if isinstance(i, str)]
+    metadata = {
+        "dtypes": dtypes,
+        "index": index,
+        "index_names": [
+            c["name"] for c in pandas_metadata["columns"] if c["field_name"] in index
+        ],
+    }
+    return table.replace_schema_metadata({METADATA_KEY: json.dumps(metadata)})
+
+
+def _restore_types(table, dtypes):
+    """Cast the columns of a table to the given dtypes
+
+    Parameters
+    ----------
+    table: pa.Table
+    dtypes: dict
+        pandas dtypes by column name. Other columns are not changed.
+    """
+    columns = []
+    for name, column in zip(table.column_names, table.columns):
+        dtype = dtypes.get(name)
+        if dtype == "category":
+            if not pa.types.is_dictionary(column.type):
+                column = column.dictionary_encode()
+        elif pa.types.is_dictionary(column.type):
+            column = column.cast(column.type.value_type)
+        elif dtype not in [None, "object"]:
+            arrow_type = pa.from_numpy_dtype(np.dtype(dtype))
+            if column.type != arrow_type:
+                column = column.cast(arrow_type)
+        columns.append(column)
+
+    return pa.Table.from_arrays(
+        columns, names=table.column_names, metadata=table.schema.metadata
+    )
+
+
+def encode_frame(pdf, compression=None):
+    """Serialise a DataFrame in the Arrow IPC format, in a compact form
+
+    Parameters
+    ----------
+    pdf: pd.DataFrame
+    compression: str, optional
+        `zstd` or `lz4`, for frames of at least `MIN_COMPRESSED_ROWS`
+        rows. Default is no compression.
+
+    Returns
+    -------
+    out: bytes or pd.DataFrame
+        The DataFrame itself if it has columns that Arrow cannot
+        represent (e.g. mixed types). It is then pickled by the cache.
+
+    Examples
+    --------
+    Magnitudes derived in double precision are kept as they are
+    >>> pdf = pd.DataFrame({"i:magpsf": [18.123456789012, 19.5], "i:fid": [1, 2]})
+    >>> decode_frame(encode_frame(pdf)).equals(pdf)
+    True
+    """
+    try:
+        table = pa.Table.from_pandas(pdf, preserve_index=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError) as e:
+        print(e)
+        return pdf
+
+    table = compact_table(table)
+    if len(pdf) < MIN_COMPRESSED_ROWS:
+        compression = None
+
+    sink = pa.BufferOutputStream()
+    options = pa.ipc.IpcWriteOptions(compression=compression)
+    with pa.ipc.new_stream(sink, table.schema, options=options) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def decode_frame(payload, columns=None):
+    """DataFrame from the output of `encode_frame`
+
+    Parameters
+    ----------
+    payload: bytes or pd.DataFrame
+        Output of `encode_frame`
+    columns: list of str, optional
+        Columns to read, with the dtypes of `NARROW_DTYPES`. Columns
+        absent from the frame are ignored. Default is to read all
+        columns, with their original dtypes.
+
+    Returns
+    -------
+    pdf: pd.DataFrame
+    """
+    if isinstance(payload, pd.DataFrame):
+        if columns is None:
+            return payload
+        pdf = payload[[c for c in columns if c in payload.columns]]
+        return pdf.astype(
+            {c: NARROW_DTYPES[c] for c in pdf.columns if c in NARROW_DTYPES}
+        )
+
+    with pa.ipc.open_stream(payload) as reader:
+        schema = reader.schema
+        if columns is None:
+            table = reader.read_all()
+
+    metadata = schema.metadata or {}
+    if METADATA_KEY in metadata:
+        metadata = json.loads(metadata[METADATA_KEY])
+        index = metadata["index"]
+    else:
+        # Not compact (written by a previous version): the pandas
+        # metadata restores the original dtypes and the index
+        metadata = {"dtypes": {}, "index": [], "index_names": []}
+        index = [
+            i for i in schema.pandas_metadata["index_columns"] if isinstance(i, str)
+        ]
+
+    if columns is not None:
+        # Only the requested columns, and the index, are read
+        fields = [schema.get_field_index(c) for c in columns if c in schema.names]
+        fields += [schema.get_field_index(i) for i in index]
+        options = pa.ipc.IpcReadOptions(included_fields=sorted(set(fields)))
+        with pa.ipc.open_stream(payload, options=options) as reader:
+            table = reader.read_all()
+        table = table.select([c for c in columns if c in schema.names] + index)
+        dtypes = {**metadata["dtypes"], **NARROW_DTYPES}
+    else:
+        dtypes = metadata["dtypes"]
+
+    if not metadata["index"]:
+        # Columns are copied, as callbacks modify the frames in place
+        return _restore_types(table, dtypes).to_pandas()
+
+    pdf = _restore_types(table.drop_columns(index), dtypes).to_pandas()
+    if len(index) == 1:
+        pdf.index = pd.Index(
+            table.column(index[0]).to_numpy(), name=metadata["index_names"][0]
+        )
+    else:
+        pdf.index = pd.MultiIndex.from_arrays(
+            [table.column(i).to_numpy() for i in index],
+            names=metadata["index_names"],
+        )
+
+    return pdf
+
+
+def frame_sizes(pdf, compression="zstd"):
+    """Size of a DataFrame in memory, and in the cache
+
+    Parameters
+    ----------
+    pdf: pd.DataFrame
+    compression: str, optional
+        Compression of the last size. Default is zstd.
+
+    Returns
+    -------
+    out: dict
+        Size in bytes of the DataFrame in memory (`pandas`), in the
+        Arrow IPC format as is (`arrow`), compact (`compact`), and
+        compact and compressed (`compressed`).
+    """
+    table = pa.Table.from_pandas(pdf, preserve_index=True)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+
+    return {
+        "pandas": int(pdf.memory_usage(deep=True).sum()),
+        "arrow": sink.getvalue().size,
+        "compact": len(encode_frame(pdf)),
+        "compressed": len(encode_frame(pdf, compression=compression)),
+    }
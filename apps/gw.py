@@ -15,6 +15,7 @@
 import gzip
 import io
 import time
+from urllib.error import HTTPError
 from urllib.request import URLError, urlopen
 
 import astropy.units as u
@@ -33,13 +34,13 @@ from dash_iconify import DashIconify
 from mocpy import MOC
 
 from app import app
+from apps.skymap import aladin_catalogs, alert_catalog_options, objectid_links
+from apps.upstream import UpstreamError, call_upstream
 from apps.utils import (
-    class_colors,
     convert_jd,
     extract_bayestar_query_url,
     markdownify_objectid,
     request_api,
-    simbad_types,
     extract_configuration,
 )
 
@@ -48,9 +49,40 @@ args = extract_configuration("config.yml")
 SITEURL = args["SITEURL"]
 
 
+def fetch_gracedb(fn):
+    """Download a file from GraceDB
+
+    Files are cached, and served from the cache when GraceDB is down.
+
+    Parameters
+    ----------
+    fn: str
+        URL of the file
+
+    Returns
+    -------
+    payload: bytes
+
+    Raises
+    ------
+    URLError
+        If GraceDB could not be reached
+    """
+    try:
+        return call_upstream(
+            "gracedb",
+            lambda timeout: urlopen(fn, timeout=timeout).read(),
+            key=fn,
+            config=args,
+            client_error=lambda e: isinstance(e, HTTPError) and e.code < 500,
+        )
+    except UpstreamError as e:
+        raise URLError(str(e)) from e
+
+
 def extract_moc(fn, credible_level):
     """ """
-    payload = urlopen(fn).read()
+    payload = fetch_gracedb(fn)
     with fits.open(io.BytesIO(payload)) as hdul:
         data = hdul[1].data
         max_order = hdul[1].header["MOCORDER"]
@@ -70,7 +102,7 @@ def extract_moc(fn, credible_level):
 
 def extract_skyfrac_degree(fn, credible_level):
     """ """
-    payload = urlopen(fn).read()
+    payload = fetch_gracedb(fn)
     with gzip.open(io.BytesIO(payload), "rb") as f:
         with fits.open(io.BytesIO(f.read())) as hdul:
             data = hdul[1].data
@@ -125,7 +157,7 @@ def query_bayestar(submit, credible_level, superevent_name, searchurl):
     # Query Fink
     fn = f"https://gracedb.ligo.org/api/superevents/{superevent_name}/files/bayestar.fits.gz"
     try:
-        data = urlopen(fn).read()
+        data = fetch_gracedb(fn)
     except URLError:
         return "error"
 
@@ -364,47 +396,21 @@ def display_skymap_gw_callback(
         );
         """
 
-        ras = pdf["i:ra"].to_numpy()
-        decs = pdf["i:dec"].to_numpy()
-        filts = pdf["i:fid"].to_numpy()
-        filts_dic = {1: "g", 2: "r"}
-        times = pdf["v:lastdate"].to_numpy()
-        link = '<a target="_blank" href="{}/{}">{}</a>'
-        titles = [
-            link.format(
-                SITEURL, i.split("]")[0].split("[")[1], i.split("]")[0].split("[")[1]
-            )
-            for i in pdf["i:objectId"].to_numpy()
-        ]
-        # mags = pdf['i:magpsf'].to_numpy()
-        classes = pdf["d:classification"].to_numpy()
-        n_alert_per_class = (
-            pdf.groupby("d:classification").count().to_dict()["i:objectId"]
+        # One catalog per class, built by the browser
+        pdf["v:link"] = objectid_links(pdf["i:objectId"], SITEURL)
+        pdf["v:filter"] = pdf["i:fid"].map({1: "g", 2: "r"})
+        catalogs = aladin_catalogs(
+            "a",
+            pdf,
+            by="d:classification",
+            fields={
+                "objectId": "v:link",
+                "filter": "v:filter",
+                "time": "v:lastdate",
+                "Classification": "d:classification",
+            },
+            options=alert_catalog_options,
         )
-        cats = []
-        for ra, dec, fid, time_, title, class_ in zip(
-            ras, decs, filts, times, titles, classes
-        ):
-            if class_ in simbad_types:
-                cat = f"cat_{simbad_types.index(class_)}"
-                color = class_colors["Simbad"]
-            elif class_ in class_colors.keys():
-                cat = "cat_{}".format(class_.replace(" ", "_"))
-                color = class_colors[class_]
-            else:
-                # Sometimes SIMBAD mess up names :-)
-                cat = f"cat_{class_}"
-                color = class_colors["Simbad"]
-
-            if cat not in cats:
-                img += """var {} = A.catalog({{name: '{}', sourceSize: 15, shape: 'circle', color: '{}', onClick: 'showPopup', limit: 1000}});""".format(
-                    cat, class_ + f" ({n_alert_per_class[class_]})", color
-                )
-                cats.append(cat)
-            img += f"""{cat}.addSources([A.source({ra}, {dec}, {{objectId: '{title}', filter: '{filts_dic[fid]}', time: '{time_}', Classification: '{class_}'}})]);"""
-
-        for cat in sorted(cats):
-            img += f"""a.addCatalog({cat});"""
 
         fn = f"https://gracedb.ligo.org/api/superevents/{superevent_name}/files/bayestar.multiorder.fits"
         mm = extract_moc(fn, credible_level)
@@ -414,6 +420,7 @@ def display_skymap_gw_callback(
         # img cannot be executed directly because of formatting
         # We split line-by-line and remove comments
         img_to_show = [i for i in img.split("\n") if "// " not in i]
+        img_to_show.append(catalogs)
 
         return " ".join(img_to_show), {"width": "100%", "height": "25pc"}, hide_progress
     else:
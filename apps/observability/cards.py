@@ -12,13 +12,12 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-import io
 import dash_mantine_components as dmc
-import pandas as pd
 from dash import Input, Output, dcc
 from dash_iconify import DashIconify
 
 from app import app
+from apps.bundle import load_object_frame
 from apps.cards import card_neighbourhood
 
 
@@ -69,7 +68,7 @@ def card_explanation_observability():
 )
 def card_observability_button(object_data):
     """Add a card containing button to fit for observability of the source"""
-    pdf = pd.read_json(io.StringIO(object_data))
+    pdf = load_object_frame(object_data, "data")
 
     card1 = dmc.Accordion(
         disableChevronRotation=True,
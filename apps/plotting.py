@@ -42,7 +42,6 @@ from dash import (
 )
 from dash.exceptions import PreventUpdate
 from dash_iconify import DashIconify
-from fink_utils.photometry.conversion import apparent_flux, dc_mag
 from fink_utils.photometry.utils import is_source_behind
 from fink_utils.sso.spins import (
     estimate_sso_params,
@@ -58,6 +57,16 @@ from plotly.subplots import make_subplots
 from scipy.optimize import curve_fit
 
 from app import app
+from apps.bundle import load_object_frame
+from apps.photometry import apparent_flux, dc_mag
+from apps.skymap import aladin_catalogs
+from apps.stamps import (
+    fetch_alert_stamps,
+    fetch_latest_stamps,
+    normalize_stamp,
+    orient_stamp,
+    stamp_thumbnail,
+)
 
 # from apps import __file__
 from apps.statistics import dic_names
@@ -67,7 +76,6 @@ from apps.utils import (
     convert_jd,
     extract_color,
     query_and_order_statistics,
-    readstamp,
     request_api,
     sine_fit,
     apparent_flux_dr,
@@ -614,7 +622,7 @@ def plot_observability(
     if summary_tab != "Observability":
         raise PreventUpdate
 
-    pdf = pd.read_json(io.StringIO(object_data))
+    pdf = load_object_frame(object_data, "data", columns=["i:ra", "i:dec"])
     ra0 = np.mean(pdf["i:ra"].to_numpy())
     dec0 = np.mean(pdf["i:dec"].to_numpy())
 
@@ -913,7 +921,6 @@ def plot_blazar(
 
     """TBD"""
     # Prepare the data
-    pdf_ = pd.read_json(io.StringIO(object_data))
     cols = [
         "i:jd",
         "i:magpsf",
@@ -925,8 +932,11 @@ def plot_blazar(
         "i:magzpsci",
         "i:isdiffpos",
         "i:objectId",
+        "v:date",
+        "v:flux_dc",
+        "v:sigma_flux_dc",
     ]
-    pdf = pdf_.loc[:, cols]
+    pdf = load_object_frame(object_data, "data", columns=cols)
     pdf = pdf.sort_values("i:jd", ascending=False)
 
     # Data release?..
@@ -955,33 +965,10 @@ def plot_blazar(
         )
         dates_release = np.array([])
 
-    pdf["mag"], pdf["magerr"] = np.transpose(
-        [
-            dc_mag(*args)
-            for args in zip(
-                pdf["i:magpsf"].astype(float).to_numpy(),
-                pdf["i:sigmapsf"].astype(float).to_numpy(),
-                pdf["i:magnr"].astype(float).to_numpy(),
-                pdf["i:sigmagnr"].astype(float).to_numpy(),
-                pdf["i:isdiffpos"].to_numpy(),
-            )
-        ],
-    )
-    pdf["flux_dc"], pdf["sigma_flux_dc"] = np.transpose(
-        [
-            apparent_flux(*args)
-            for args in zip(
-                pdf["i:magpsf"].astype(float).to_numpy(),
-                pdf["i:sigmapsf"].astype(float).to_numpy(),
-                pdf["i:magnr"].astype(float).to_numpy(),
-                pdf["i:sigmagnr"].astype(float).to_numpy(),
-                pdf["i:isdiffpos"].to_numpy(),
-            )
-        ],
-    )
+    pdf["flux_dc"] = pdf["v:flux_dc"]
+    pdf["sigma_flux_dc"] = pdf["v:sigma_flux_dc"]
 
-    jd = pdf["i:jd"].astype(float)
-    dates = convert_jd(jd)
+    dates = pdf["v:date"].to_numpy()
 
     # Normalise flux
     # Median is computed on historical data
@@ -1259,7 +1246,6 @@ def plot_variable_star(
         return None, "info"
 
     # Prepare the data
-    pdf_ = pd.read_json(io.StringIO(object_data))
     cols = [
         "i:jd",
         "i:magpsf",
@@ -1271,8 +1257,12 @@ def plot_variable_star(
         "i:magzpsci",
         "i:isdiffpos",
         "i:objectId",
+        "v:date",
+        "v:mag_dc",
+        "v:sigma_mag_dc",
+        "v:dc_valid",
     ]
-    pdf = pdf_.loc[:, cols]
+    pdf = load_object_frame(object_data, "data", columns=cols)
     pdf = pdf.sort_values("i:jd", ascending=False)
 
     # Data release?..
@@ -1287,26 +1277,14 @@ def plot_variable_star(
     is_dc_corrected = is_source_behind(pdf["i:distnr"].to_numpy()[0])
 
     if is_dc_corrected:
-        mag, err = np.transpose(
-            [
-                dc_mag(*args)
-                for args in zip(
-                    pdf["i:magpsf"].astype(float).to_numpy(),
-                    pdf["i:sigmapsf"].astype(float).to_numpy(),
-                    pdf["i:magnr"].astype(float).to_numpy(),
-                    pdf["i:sigmagnr"].astype(float).to_numpy(),
-                    pdf["i:isdiffpos"].to_numpy(),
-                )
-            ],
-        )
         # Keep only "good" measurements
-        idx = err < 1
-        pdf, mag, err = (_[idx] for _ in [pdf, mag, err])
+        pdf = pdf[pdf["v:dc_valid"]]
+        mag, err = pdf["v:mag_dc"].to_numpy(), pdf["v:sigma_mag_dc"].to_numpy()
     else:
         mag, err = pdf["i:magpsf"], pdf["i:sigmapsf"]
 
     jd = pdf["i:jd"].astype(float)
-    dates = convert_jd(jd)
+    dates = pdf["v:date"].to_numpy()
 
     fit_period = False if manual_period is not None else True
     model = LombScargleMultiband(
@@ -1602,16 +1580,18 @@ def plot_classbar(object_data):
 
     Parameters
     ----------
-    object_data: json data
-        cached alert data
+    object_data: str
+        key of the object bundle
     """
-    pdf = pd.read_json(io.StringIO(object_data))
+    pdf = load_object_frame(
+        object_data, "data", columns=["i:objectId", "v:date", "v:classification"]
+    )
     grouped = pdf.groupby("v:classification").count()
     alert_per_class = grouped["i:objectId"].to_dict()
 
     # descending date values
     top_labels = pdf["v:classification"].to_numpy()[::-1]
-    customdata = convert_jd(pdf["i:jd"])[::-1]
+    customdata = pdf["v:date"].to_numpy()[::-1]
     x_data = [[1] * len(top_labels)]
     y_data = top_labels
 
@@ -1729,7 +1709,6 @@ def draw_lightcurve(
     figure: dict
     """
     # Primary high-quality data points
-    pdf_ = pd.read_json(io.StringIO(object_data))
     cols = [
         "i:jd",
         "i:magpsf",
@@ -1741,19 +1720,33 @@ def draw_lightcurve(
         "i:magzpsci",
         "i:isdiffpos",
         "i:candid",
+        "v:date",
+        "v:mag_dc",
+        "v:sigma_mag_dc",
+        "v:dc_valid",
+        "v:flux",
+        "v:sigma_flux",
+        "v:flux_dc",
+        "v:sigma_flux_dc",
     ]
-    pdf = pdf_.loc[:, cols]
+    pdf = load_object_frame(object_data, "data", columns=cols)
 
     # Upper limits
-    pdf_upper = pd.read_json(io.StringIO(object_upper))
+    pdf_upper = load_object_frame(
+        object_upper, "upper", columns=["i:jd", "i:fid", "i:diffmaglim", "v:date"]
+    )
 
     # Lower-quality data points
-    pdf_upperv = pd.read_json(io.StringIO(object_uppervalid))
+    pdf_upperv = load_object_frame(
+        object_uppervalid,
+        "uppervalid",
+        columns=["i:jd", "i:fid", "i:magpsf", "i:sigmapsf", "v:date"],
+    )
 
     # type conversion
-    dates = convert_jd(pdf["i:jd"])
-    dates_upper = convert_jd(pdf_upper["i:jd"])
-    dates_upperv = convert_jd(pdf_upperv["i:jd"])
+    dates = pdf["v:date"].to_numpy()
+    dates_upper = pdf_upper["v:date"].to_numpy()
+    dates_upperv = pdf_upperv["v:date"].to_numpy()
 
     if object_release:
         # Data release photometry
@@ -1783,31 +1776,16 @@ def draw_lightcurve(
     elif switch == "DC magnitude":
         if is_dc_corrected:
             # inplace replacement for DC corrected flux
-            mag, err = np.transpose(
-                [
-                    dc_mag(*args)
-                    for args in zip(
-                        mag.astype(float).to_numpy(),
-                        err.astype(float).to_numpy(),
-                        pdf["i:magnr"].astype(float).to_numpy(),
-                        pdf["i:sigmagnr"].astype(float).to_numpy(),
-                        pdf["i:isdiffpos"].to_numpy(),
-                    )
-                ],
-            )
+            mag, err = pdf["v:mag_dc"], pdf["v:sigma_mag_dc"]
             # Keep only "good" measurements
-            idx = err < 1
+            idx = pdf["v:dc_valid"].to_numpy()
             pdf, dates, mag, err = (_[idx] for _ in [pdf, dates, mag, err])
 
         layout["yaxis"]["title"] = "Apparent DC magnitude"
         layout["yaxis"]["autorange"] = "reversed"
         scale = 1.0
     elif switch == "Difference flux":
-        # First convert the magnitude, then apply the proper sign
-        mag, err = apparent_flux(mag, err, 99.0, 0.0, "t")
-        mag = np.where(
-            (pdf["i:isdiffpos"] == "t") | (pdf["i:isdiffpos"] == "1"), mag, -mag
-        )
+        mag, err = pdf["v:flux"], pdf["v:sigma_flux"]
 
         # Data release photometry
         if not pdf_release.empty:
@@ -1819,21 +1797,11 @@ def draw_lightcurve(
         layout["yaxis"]["autorange"] = True
         scale = 1e3
     elif switch == "DC flux":
-        # inplace replacement
-        mag, err = np.transpose(
-            [
-                apparent_flux(*args)
-                for args in zip(
-                    mag.astype(float).to_numpy(),
-                    err.astype(float).to_numpy(),
-                    pdf["i:magnr"].astype(float).to_numpy()
-                    if is_dc_corrected
-                    else [99.0] * len(pdf.index),
-                    pdf["i:sigmagnr"].astype(float).to_numpy(),
-                    pdf["i:isdiffpos"].to_numpy(),
-                )
-            ],
-        )
+        # Without a source behind, the DC flux is the difference flux
+        if is_dc_corrected:
+            mag, err = pdf["v:flux_dc"], pdf["v:sigma_flux_dc"]
+        else:
+            mag, err = pdf["v:flux"], pdf["v:sigma_flux"]
 
         # Data release photometry
         if not pdf_release.empty:
@@ -2107,24 +2075,25 @@ def draw_lightcurve(
             """
         )
 
-        pdf_ = None
+        pdf_gr = None
 
         if switch == "Difference magnitude":
-            pdf_ = pd.concat([pdf, pdf_upperv])
+            pdf_gr = load_object_frame(object_data, "color")
+        elif switch == "DC magnitude" and pdf_release.empty:
+            pdf_gr = load_object_frame(object_data, "color_dc")
         elif switch == "DC magnitude":
-            pdf_ = pd.DataFrame(
-                {
-                    "i:jd": pdf["i:jd"],
-                    "i:fid": pdf["i:fid"],
-                    "i:magpsf": mag,
-                    "i:sigmapsf": err,
-                },
-            )
-
-            if not pdf_release.empty:
-                pdf_ = pd.concat(
+            # Colours with the data release photometry
+            pdf_gr = extract_color(
+                pd.concat(
                     [
-                        pdf_,
+                        pd.DataFrame(
+                            {
+                                "i:jd": pdf["i:jd"],
+                                "i:fid": pdf["i:fid"],
+                                "i:magpsf": mag,
+                                "i:sigmapsf": err,
+                            },
+                        ),
                         pd.DataFrame(
                             {
                                 "i:jd": pdf_release["mjd"] + 2400000.5,
@@ -2140,10 +2109,11 @@ def draw_lightcurve(
                         ),
                     ],
                 )
+            )
+            pdf_gr["v:date"] = convert_jd(pdf_gr["i:jd"])
 
-        if pdf_ is not None:
-            pdf_gr = extract_color(pdf_)
-            dates_gr = convert_jd(pdf_gr["i:jd"])
+        if pdf_gr is not None:
+            dates_gr = pdf_gr["v:date"].to_numpy()
             color = "#3C8DFF"
 
             figure["data"].append(
@@ -2216,7 +2186,6 @@ def draw_lightcurve_sn(object_data, object_upper, object_uppervalid) -> dict:
     -------
     figure: dict
     """
-    pdf_ = pd.read_json(io.StringIO(object_data))
     cols = [
         "i:jd",
         "i:magpsf",
@@ -2227,11 +2196,12 @@ def draw_lightcurve_sn(object_data, object_upper, object_uppervalid) -> dict:
         "i:magzpsci",
         "i:isdiffpos",
         "i:candid",
+        "v:date",
     ]
-    pdf = pdf_.loc[:, cols]
+    pdf = load_object_frame(object_data, "data", columns=cols)
 
     # type conversion
-    dates = convert_jd(pdf["i:jd"])
+    dates = pdf["v:date"].to_numpy()
 
     # shortcuts
     mag = pdf["i:magpsf"]
@@ -2274,33 +2244,66 @@ def draw_lightcurve_sn(object_data, object_upper, object_uppervalid) -> dict:
     return figure
 
 
-def draw_lightcurve_preview(name) -> dict:
-    """Draw object lightcurve with errorbars (SM view - DC mag fixed)
+# Columns of the alerts used by `draw_lightcurve_preview`
+PREVIEW_COLUMNS = [
+    "i:jd",
+    "i:magpsf",
+    "i:sigmapsf",
+    "i:fid",
+    "i:isdiffpos",
+    "i:distnr",
+    "i:magnr",
+    "i:sigmagnr",
+    "d:tag",
+]
+
+
+def fetch_lightcurve_previews(names):
+    """Alerts of the lightcurve previews of several objects, in one request
+
+    Parameters
+    ----------
+    names: list of str
+        ZTF objectIds
 
     Returns
     -------
-    figure: dict
+    pdfs: dict
+        DataFrame of `PREVIEW_COLUMNS` for each objectId,
+        empty if the object has no alerts.
     """
-    cols = [
-        "i:jd",
-        "i:magpsf",
-        "i:sigmapsf",
-        "i:fid",
-        "i:isdiffpos",
-        "i:distnr",
-        "i:magnr",
-        "i:sigmagnr",
-        "d:tag",
-    ]
     pdf = request_api(
         "/api/v1/objects",
         json={
-            "objectId": name,
+            "objectId": ",".join(names),
             "withupperlim": "True",
-            "columns": ",".join(cols),
-            "output-format": "json",
         },
+        columns=PREVIEW_COLUMNS + ["i:objectId"],
     )
+    if pdf.empty:
+        return {name: pd.DataFrame(columns=PREVIEW_COLUMNS) for name in names}
+
+    groups = dict(tuple(pdf.groupby("i:objectId", sort=False)))
+    return {name: groups.get(name, pdf.iloc[:0]) for name in names}
+
+
+def draw_lightcurve_preview(name, pdf=None) -> dict:
+    """Draw object lightcurve with errorbars (SM view - DC mag fixed)
+
+    Parameters
+    ----------
+    name: str
+        ZTF objectId
+    pdf: pd.DataFrame, optional
+        Alerts of the object, with `PREVIEW_COLUMNS` (see
+        `fetch_lightcurve_previews`). Default is to fetch them.
+
+    Returns
+    -------
+    figure: dict
+    """
+    if pdf is None:
+        pdf = fetch_lightcurve_previews([name])[name]
 
     # Mask upper-limits (but keep measurements with bad quality)
     mag_ = pdf["i:magpsf"]
@@ -2329,17 +2332,12 @@ def draw_lightcurve_preview(name) -> dict:
 
     if is_dc_corrected:
         # inplace replacement for DC corrected flux
-        mag, err = np.transpose(
-            [
-                dc_mag(*args)
-                for args in zip(
-                    mag.astype(float).to_numpy(),
-                    err.astype(float).to_numpy(),
-                    pdf["i:magnr"].astype(float).to_numpy(),
-                    pdf["i:sigmagnr"].astype(float).to_numpy(),
-                    pdf["i:isdiffpos"].to_numpy(),
-                )
-            ],
+        mag, err = dc_mag(
+            mag,
+            err,
+            pdf["i:magnr"],
+            pdf["i:sigmagnr"],
+            pdf["i:isdiffpos"],
         )
         # Keep only "good" measurements
         idx = err < 1
@@ -2444,10 +2442,17 @@ def draw_scores(object_data) -> dict:
 
     TODO: memoise me
     """
-    pdf = pd.read_json(io.StringIO(object_data))
+    cols = [
+        "i:jd",
+        "d:snn_snia_vs_nonia",
+        "d:snn_sn_vs_all",
+        "d:rf_snia_vs_nonia",
+        "v:date",
+    ]
+    pdf = load_object_frame(object_data, "data", columns=cols)
 
     # type conversion
-    dates = convert_jd(pdf["i:jd"])
+    dates = pdf["v:date"].to_numpy()
 
     hovertemplate = textwrap.dedent(
         """
@@ -2562,7 +2567,7 @@ def draw_t2(object_data) -> dict:
 
     TODO: memoise me
     """
-    pdf = pd.read_json(io.StringIO(object_data))
+    pdf = load_object_frame(object_data, "data")
 
     df = extract_max_t2(pdf)
 
@@ -2651,10 +2656,11 @@ def draw_color(object_data) -> dict:
     -------
     figure: dict
     """
-    pdf = pd.read_json(io.StringIO(object_data))
+    cols = ["i:jd", "i:fid", "v:g-r", "v:sigma(g-r)", "v:date"]
+    pdf = load_object_frame(object_data, "data", columns=cols)
 
     # type conversion
-    dates = convert_jd(pdf["i:jd"])
+    dates = pdf["v:date"].to_numpy()
 
     hovertemplate = textwrap.dedent(
         """
@@ -2713,10 +2719,19 @@ def draw_color_rate(object_data) -> dict:
 
     TODO: memoise me
     """
-    pdf = pd.read_json(io.StringIO(object_data))
+    cols = [
+        "i:jd",
+        "i:fid",
+        "v:rate(g-r)",
+        "v:sigma(rate(g-r))",
+        "v:rate",
+        "v:sigma(rate)",
+        "v:date",
+    ]
+    pdf = load_object_frame(object_data, "data", columns=cols)
 
     # type conversion
-    dates = convert_jd(pdf["i:jd"])
+    dates = pdf["v:date"].to_numpy()
 
     hovertemplate_rate = textwrap.dedent(
         """
@@ -2886,65 +2901,54 @@ clientside_callback(
 )
 
 
-def extract_cutout(object_data, time0, kind):
-    """Extract cutout data from the alert
+# Columns used by `extract_cutouts`
+CUTOUT_COLUMNS = ["i:objectId", "i:jd", "i:candid", "i:isdiffpos"]
+
+
+def extract_cutouts(pdf, time0, kinds=None):
+    """Extract cutouts data of an alert
 
     Parameters
     ----------
-    object_data: json
-        Jsonified pandas DataFrame
+    pdf: pd.DataFrame
+        Alerts of the object, with at least `i:objectId`
     time0: str
-        ISO time of the cutout to extract
-    kind: str
-        science, template, or difference
+        ISO time of the cutouts to extract. None for the last alert.
+    kinds: list of str, optional
+        Kinds of stamps among science, template, or difference.
+        Default is all kinds.
 
     Returns
     -------
-    data: np.array
-        2D array containing cutout data
+    data: dict or None
+        2D array containing cutout data for each kind, None if the
+        cutout could not be fetched. None if there is no alert at `time0`.
     """
-    pdf_ = pd.read_json(io.StringIO(object_data))
-
+    pdf = pdf.sort_values("i:jd", ascending=False) if "i:jd" in pdf.columns else pdf
     if time0 is None:
         position = 0
     else:
-        pdf_ = pdf_.sort_values("i:jd", ascending=False)
         # Round to avoid numerical precision issues
-        jds = pdf_["i:jd"].apply(lambda x: np.round(x, 3)).to_numpy()
+        jds = pdf["i:jd"].apply(lambda x: np.round(x, 3)).to_numpy()
         jd0 = np.round(Time(time0, format="iso").jd, 3)
         if jd0 in jds:
             position = np.where(jds == jd0)[0][0]
         else:
             return None
 
-    # Construct the query
-    payload = {
-        "objectId": pdf_["i:objectId"].to_numpy()[0],
-        "kind": kind.capitalize(),
-        "output-format": "FITS",
-    }
+    candid = None
+    if "i:candid" in pdf.columns:
+        candid = pdf["i:candid"].to_numpy()[position]
 
-    if position > 0 and "i:candid" in pdf_.columns:
-        payload["candid"] = str(pdf_["i:candid"].to_numpy()[position])
+    stamps = fetch_alert_stamps(pdf["i:objectId"].to_numpy()[0], candid, kinds)
 
-    # Extract the cutout data
-    r = request_api(
-        "/api/v1/cutouts",
-        json=payload,
-        output="raw",
+    # Negative event, let's invert the diff cutout
+    isdiffpos = (
+        pdf["i:isdiffpos"].to_numpy()[position] if "i:isdiffpos" in pdf.columns else "t"
     )
-
-    cutout = readstamp(r, gzipped=False)
-
-    if (
-        kind == "difference"
-        and "i:isdiffpos" in pdf_.columns
-        and pdf_["i:isdiffpos"].to_numpy()[position] == "f"
-    ):
-        # Negative event, let's invert the diff cutout
-        cutout *= -1
-
-    return cutout
+    return {
+        kind: orient_stamp(stamp, kind, isdiffpos) for kind, stamp in stamps.items()
+    }
 
 
 @app.callback(
@@ -2962,16 +2966,20 @@ def draw_cutouts(clickData, object_data):
     else:
         jd0 = None
 
+    pdf = load_object_frame(object_data, "data", columns=CUTOUT_COLUMNS)
+
+    # All kinds at once
+    cutouts = extract_cutouts(pdf, jd0)
+    if cutouts is None:
+        return no_update
+
     figs = []
-    for kind in ["science", "template", "difference"]:
-        try:
-            cutout = extract_cutout(object_data, jd0, kind=kind)
-            if cutout is None:
-                return no_update
-
-            data = draw_cutout(cutout, kind)
-        except OSError:
+    for kind, cutout in cutouts.items():
+        if cutout is None:
             data = dcc.Markdown("Load fail, refresh the page")
+        else:
+            # Interactive stamps are shown in the modal
+            data = draw_cutout_thumbnail(cutout, kind)
 
         figs.append(
             dbc.Col(
@@ -2998,15 +3006,19 @@ def draw_cutouts_modal(object_data, date_modal_select, is_open):
     if not is_open:
         raise PreventUpdate
 
+    pdf = load_object_frame(object_data, "data", columns=CUTOUT_COLUMNS)
+
+    # All kinds at once
+    cutouts = extract_cutouts(pdf, date_modal_select)
+    if cutouts is None:
+        return no_update
+
     figs = []
-    for kind in ["science", "template", "difference"]:
-        try:
-            cutout = extract_cutout(object_data, date_modal_select, kind=kind)
-            if cutout is None:
-                return no_update
-            data = draw_cutout(cutout, kind, id_type="stamp_modal")
-        except OSError:
+    for kind, cutout in cutouts.items():
+        if cutout is None:
             data = dcc.Markdown("Load fail, refresh the page")
+        else:
+            data = draw_cutout(cutout, kind, id_type="stamp_modal")
 
         figs.append(
             dbc.Col(
@@ -3022,20 +3034,30 @@ def draw_cutouts_modal(object_data, date_modal_select, is_open):
     return figs
 
 
-def draw_cutouts_quickview(name, kinds=None):
-    """Draw Science cutout data for the preview service"""
+def draw_cutouts_quickview(name, kinds=None, stamps=None):
+    """Draw Science cutout data for the preview service
+
+    Parameters
+    ----------
+    name: str
+        ZTF objectId
+    kinds: list of str, optional
+        Kinds of stamps. Default is science only.
+    stamps: dict, optional
+        2D array for each kind, for the last alert of the object
+        (see `fetch_latest_stamps`). Default is to fetch them.
+    """
     if kinds is None:
         kinds = ["science"]
+    if stamps is None:
+        stamps = fetch_latest_stamps([name], kinds)[name]
+
     figs = []
     for kind in kinds:
-        try:  # noqa: PERF203
-            # We may manually construct the payload to avoid extra API call
-            object_data = f'{{"i:objectId":{{"0": "{name}"}}}}'
-            data = extract_cutout(object_data, None, kind=kind)
-            figs.append(draw_cutout(data, kind, zoom=False))
-        except OSError:  # noqa: PERF203
-            data = dcc.Markdown("Load fail, refresh the page")
-            figs.append(data)
+        if stamps.get(kind) is None:
+            figs.append(dcc.Markdown("Load fail, refresh the page"))
+        else:
+            figs.append(draw_cutout_thumbnail(stamps[kind], kind))
     return figs
 
 
@@ -3111,43 +3133,12 @@ def legacy_normalizer(data: list, stretch="asinh", pmin=0.5, pmax=99.5) -> list:
     )
 
 
-def plain_normalizer(
-    img: list, vmin: float, vmax: float, stretch="linear", pmin=0.5, pmax=99.5
-) -> list:
-    """Image normalisation between vmin and vmax
-
-    Parameters
-    ----------
-    img: float array
-        a float array representing a non-normalized image
-
-    Returns
-    -------
-    out: float array where data are bounded between vmin and vmax
-    """
-    limits = np.percentile(img, [pmin, pmax])
-    data = _data_stretch(
-        img, vmin=limits[0], vmax=limits[1], stretch=stretch, vmid=0.1, exponent=2
-    )
-    data = (vmax - vmin) * data + vmin
-
-    return data
-
-
-def draw_cutout(data, title, lower_bound=0, upper_bound=1, zoom=True, id_type="stamp"):
-    """Draw a cutout data"""
+def draw_cutout(
+    data, title, lower_bound=0, upper_bound=1, zoom=True, id_type="stamp_modal"
+):
+    """Draw a cutout data as an interactive heatmap"""
     # Update graph data for stamps
-    data = np.nan_to_num(data)
-
-    # data = sigmoid_normalizer(data, lower_bound, upper_bound)
-    data = plain_normalizer(
-        data,
-        lower_bound,
-        upper_bound,
-        stretch="linear" if title in ["difference"] else "asinh",
-        pmin=0.5,
-        pmax=99.95,
-    )
+    data = normalize_stamp(data, title, lower_bound, upper_bound)
 
     data = data[::-1]
     # data = convolve(data, smooth=1, kernel='gauss')
@@ -3205,6 +3196,25 @@ def draw_cutout(data, title, lower_bound=0, upper_bound=1, zoom=True, id_type="s
     return graph
 
 
+def draw_cutout_thumbnail(data, title):
+    """Draw a cutout data as a PNG image, rendered on the server
+
+    Stamps look the same as with `draw_cutout`, without the interactive
+    zoom, for a fraction of the payload (see `apps.stamps.stamp_thumbnail`).
+    """
+    return html.Img(
+        src=stamp_thumbnail(data, title),
+        title=title.capitalize(),
+        style={
+            "display": "block",
+            "width": "100%",
+            "aspect-ratio": "1",
+            "margin": "1px",
+            "image-rendering": "pixelated",
+        },
+    )
+
+
 zoom_cutouts_js = """
 function zoom_cutouts(relayout_data, figure_states) {
     if (relayout_data.includes(undefined)) {
@@ -3241,19 +3251,6 @@ function zoom_cutouts(relayout_data, figure_states) {
 }
 """
 
-clientside_callback(
-    zoom_cutouts_js,
-    [
-        Output({"type": "stamp", "id": ALL}, "relayoutData"),
-        Output({"type": "stamp", "id": ALL}, "figure"),
-    ],
-    [
-        Input({"type": "stamp", "id": ALL}, "relayoutData"),
-    ],
-    State({"type": "stamp", "id": ALL}, "figure"),
-    prevent_initial_call=True,
-)
-
 clientside_callback(
     zoom_cutouts_js,
     [
@@ -3291,7 +3288,6 @@ def integrate_aladin_lite(object_data):
     alert_id: str
         ID of the alert
     """
-    pdf_ = pd.read_json(io.StringIO(object_data))
     cols = [
         "i:jd",
         "i:ra",
@@ -3302,7 +3298,7 @@ def integrate_aladin_lite(object_data):
         "i:sigmagnr",
         "i:fid",
     ]
-    pdf = pdf_.loc[:, cols]
+    pdf = load_object_frame(object_data, "data", columns=cols)
     pdf = pdf.sort_values("i:jd", ascending=False)
 
     # Coordinate of the current alert
@@ -3331,31 +3327,43 @@ def integrate_aladin_lite(object_data):
         np.isfinite(pdf["i:magnr"])
     ].drop_duplicates()
 
-    if len(pdfnr.index):
-        img += """
-        var catnr_zg = A.catalog({name: 'ZTF Reference nearest, zg', sourceSize: 6, shape: 'plus', color: 'green', onClick: 'showPopup', limit: 1000});
-        var catnr_zr = A.catalog({name: 'ZTF Reference nearest, zr', sourceSize: 6, shape: 'plus', color: 'red', onClick: 'showPopup', limit: 1000});
-        """
-
-        for _, row in pdfnr.iterrows():
-            img += """
-            catnr_{}.addSources([A.source({}, {}, {{ZTF: 'Reference', mag: {:.2f}, err: {:.2f}, filter: '{}'}})]);
-            """.format(
-                {1: "zg", 2: "zr", 3: "zi"}.get(row["i:fid"]),
-                row["i:ranr"],
-                row["i:decnr"],
-                row["i:magnr"],
-                row["i:sigmagnr"],
-                {1: "zg", 2: "zr", 3: "zi"}.get(row["i:fid"]),
-            )
-
-        img += """aladin.addCatalog(catnr_zg);"""
-        img += """aladin.addCatalog(catnr_zr);"""
-
     # img cannot be executed directly because of formatting
     # We split line-by-line and remove comments
     img_to_show = [i for i in img.split("\n") if "// " not in i]
 
+    if len(pdfnr.index):
+        # One catalog per filter, built by the browser
+        pdfnr = pdfnr.assign(
+            **{
+                "v:filter": pdfnr["i:fid"].map({1: "zg", 2: "zr", 3: "zi"}),
+                "v:ztf": "Reference",
+                "v:mag": pdfnr["i:magnr"].astype(float).round(2),
+                "v:err": pdfnr["i:sigmagnr"].astype(float).round(2),
+            }
+        )
+        img_to_show.append(
+            aladin_catalogs(
+                "aladin",
+                pdfnr,
+                by="v:filter",
+                fields={
+                    "ZTF": "v:ztf",
+                    "mag": "v:mag",
+                    "err": "v:err",
+                    "filter": "v:filter",
+                },
+                options=lambda band, count: {
+                    "name": f"ZTF Reference nearest, {band}",
+                    "sourceSize": 6,
+                    "shape": "plus",
+                    "color": {"zg": "green", "zr": "red"}.get(band, "orange"),
+                    "onClick": "showPopup",
+                },
+                ra="i:ranr",
+                dec="i:decnr",
+            )
+        )
+
     return " ".join(img_to_show)
 
 
@@ -3632,7 +3640,7 @@ def draw_sso_astrometry(pdf) -> dict:
         customdata=list(
             zip(
                 pdf["i:objectId"][pdf["i:fid"] == 1],
-                Time(pdf["i:jd"][pdf["i:fid"] == 1], format="jd").iso,
+                convert_jd(pdf["i:jd"][pdf["i:fid"] == 1]),
             ),
         ),
         hovertemplate=hovertemplate,
@@ -3646,7 +3654,7 @@ def draw_sso_astrometry(pdf) -> dict:
         customdata=list(
             zip(
                 pdf["i:objectId"][pdf["i:fid"] == 2],
-                Time(pdf["i:jd"][pdf["i:fid"] == 2], format="jd").iso,
+                convert_jd(pdf["i:jd"][pdf["i:fid"] == 2]),
             ),
         ),
         hovertemplate=hovertemplate,
@@ -3681,7 +3689,7 @@ def draw_sso_astrometry(pdf) -> dict:
 )
 def draw_sso_phasecurve(switch_func: str, object_sso) -> dict:
     """Draw SSO object phase curve"""
-    pdf = pd.read_json(io.StringIO(object_sso))
+    pdf = load_object_frame(object_sso, "sso")
     if pdf.empty:
         msg = """
         Object not referenced in the Minor Planet Center, or name not found in Fink.
@@ -3862,7 +3870,7 @@ def draw_sso_phasecurve(switch_func: str, object_sso) -> dict:
                 "customdata": list(
                     zip(
                         pdf.loc[cond, "i:objectId"],
-                        Time(pdf.loc[cond, "i:jd"], format="jd").iso,
+                        convert_jd(pdf.loc[cond, "i:jd"]),
                     ),
                 ),
                 "hovertemplate": hovertemplate,
@@ -4141,7 +4149,7 @@ def draw_tracklet_radec(pdf) -> dict:
     prevent_initial_call=True,
 )
 def alert_properties(object_data, clickData):
-    pdf_ = pd.read_json(io.StringIO(object_data))
+    pdf_ = load_object_frame(object_data, "data")
 
     if clickData is not None:
         time0 = clickData["points"][0]["x"]
@@ -4859,7 +4867,9 @@ def draw_alert_astrometry(object_data, kind) -> dict:
     -------
     figure: dict
     """
-    pdf = pd.read_json(io.StringIO(object_data))
+    pdf = load_object_frame(
+        object_data, "data", columns=["i:jd", "i:ra", "i:dec", "i:fid"]
+    )
 
     mean_ra = np.mean(pdf["i:ra"])
     mean_dec = np.mean(pdf["i:dec"])
@@ -4879,7 +4889,7 @@ def draw_alert_astrometry(object_data, kind) -> dict:
         1,
         deltaRAcosDEC[pdf["i:fid"] == 1],
         deltaDEC[pdf["i:fid"] == 1],
-        customdata=Time(pdf["i:jd"][pdf["i:fid"] == 1], format="jd").iso,
+        customdata=convert_jd(pdf["i:jd"][pdf["i:fid"] == 1]),
         hovertemplate=hovertemplate,
         marker={"size": 6},
     )
@@ -4888,7 +4898,7 @@ def draw_alert_astrometry(object_data, kind) -> dict:
         2,
         deltaRAcosDEC[pdf["i:fid"] == 2],
         deltaDEC[pdf["i:fid"] == 2],
-        customdata=Time(pdf["i:jd"][pdf["i:fid"] == 2], format="jd").iso,
+        customdata=convert_jd(pdf["i:jd"][pdf["i:fid"] == 2]),
         hovertemplate=hovertemplate,
         marker={"size": 6},
     )
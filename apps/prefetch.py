@@ -0,0 +1,221 @@
+# Copyright 2026 AstroLab Software
+# Author: Julien Peloton
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Prefetch of the object bundles of search results
+
+Once a search is displayed, the bundles (see `apps.bundle`) of its first
+`PREFETCH_TOP_N` objects are fetched in the background, so that the
+object page opened from the results is served from the cache.
+
+Prefetches run in a small thread pool per process. A new search cancels
+the prefetches of the previous search of the same browser tab that have
+not started yet. Counters
+are shared by all workers, and can be printed with:
+
+    python -m apps.prefetch --stats
+"""
+
+import argparse
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from apps.bundle import DEFAULT_BUNDLE_TTL, get_bundle_cache, warm_object_bundle
+
+# Default values, that can be overwritten in config.yml
+DEFAULT_TOP_N = 3  # set PREFETCH_TOP_N: 0 to disable
+DEFAULT_MAX_WORKERS = 2
+
+# submitted: prefetches queued
+# cancelled: prefetches superseded by a new search before they started
+# skipped: bundles already in the cache
+# fetched: bundles fetched by a prefetch
+# error: prefetches that failed, or objects not found
+# opened: object pages opened
+# used: object pages served from a prefetched bundle
+COUNTERS = ["submitted", "cancelled", "skipped", "fetched", "error", "opened", "used"]
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+# Prefetches submitted in the current process, by session
+_pending = {}
+
+
+def get_prefetch_executor(config=None):
+    """Thread pool running the prefetches of the current process
+
+    Prefetches run in their own pool, so that they never
+    delay the API calls of the callbacks.
+    """
+    global _executor, _executor_pid
+
+    if config is None:
+        config = {}
+
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ThreadPoolExecutor(
+                max_workers=int(
+                    config.get("PREFETCH_MAX_WORKERS", DEFAULT_MAX_WORKERS)
+                ),
+                thread_name_prefix="fink-prefetch",
+            )
+            _executor_pid = os.getpid()
+            _pending.clear()
+
+    return _executor
+
+
+def _prefetch(oid, config):
+    """Fetch the bundle of an object, and mark it as prefetched"""
+    cache = get_bundle_cache(config)
+
+    # Opened, or prefetched by another worker, in the meantime
+    if f"bundle:{oid}" in cache:
+        cache.incr("metrics:prefetch:skipped")
+        return
+
+    try:
+        kept = warm_object_bundle(oid)
+    except Exception as e:
+        print(f"Prefetch of {oid} failed: {e!r}")
+        kept = False
+
+    if not kept:
+        cache.incr("metrics:prefetch:error")
+        return
+
+    cache.incr("metrics:prefetch:fetched")
+    cache.set(
+        f"prefetched:{oid}",
+        os.getpid(),
+        expire=float(config.get("BUNDLE_TTL", DEFAULT_BUNDLE_TTL)),
+    )
+
+
+def prefetch_bundles(oids, config=None, session=None):
+    """Fetch the bundles of the first objects of a search in the background
+
+    Parameters
+    ----------
+    oids: list of str
+        ZTF objectIds, in the order of the results
+    config: dict, optional
+        User configuration (see `apps.utils.extract_configuration`).
+    session: str, optional
+        ID of the browser tab running the search. Prefetches of its
+        previous search that have not started yet are cancelled.
+
+    Returns
+    -------
+    futures: list of concurrent.futures.Future
+        Prefetches submitted
+    """
+    if config is None:
+        config = {}
+
+    topn = int(config.get("PREFETCH_TOP_N", DEFAULT_TOP_N))
+    cache = get_bundle_cache(config)
+    executor = get_prefetch_executor(config)
+
+    with _executor_lock:
+        # The previous search of this session is not looked at anymore
+        if session is not None:
+            for future in _pending.pop(session, []):
+                if future.cancel():
+                    cache.incr("metrics:prefetch:cancelled")
+
+        # Forget the sessions whose prefetches are over
+        for key in [k for k, v in _pending.items() if all(f.done() for f in v)]:
+            del _pending[key]
+
+        # Keep the order of the results, without duplicates
+        futures = []
+        for oid in list(dict.fromkeys(oids))[:topn]:
+            if f"bundle:{oid}" in cache:
+                cache.incr("metrics:prefetch:skipped")
+                continue
+            futures.append(executor.submit(_prefetch, oid, config))
+            cache.incr("metrics:prefetch:submitted")
+
+        if session is not None and futures:
+            _pending[session] = futures
+
+        return futures
+
+
+def record_object_page(oid, config=None):
+    """Count an object page, and whether its bundle was prefetched
+
+    Parameters
+    ----------
+    oid: str
+        ZTF objectId
+    config: dict, optional
+        User configuration (see `apps.utils.extract_configuration`).
+    """
+    cache = get_bundle_cache(config)
+    cache.incr("metrics:prefetch:opened")
+    if cache.pop(f"prefetched:{oid}") is not None:
+        cache.incr("metrics:prefetch:used")
+
+
+def prefetch_stats(config=None):
+    """Counters of the prefetches (all workers)
+
+    Parameters
+    ----------
+    config: dict, optional
+        User configuration (see `apps.utils.extract_configuration`).
+
+    Returns
+    -------
+    out: dict
+        `COUNTERS`, and
+        - wasted: prefetched bundles not opened (yet)
+        - hit_rate: fraction of object pages served from a prefetch
+        - precision: fraction of prefetched bundles that were opened
+    """
+    cache = get_bundle_cache(config)
+    out = {name: cache.get(f"metrics:prefetch:{name}", 0) for name in COUNTERS}
+    out["wasted"] = out["fetched"] - out["used"]
+    out["hit_rate"] = out["used"] / out["opened"] if out["opened"] else 0.0
+    out["precision"] = out["used"] / out["fetched"] if out["fetched"] else 0.0
+    return out
+
+
+if __name__ == "__main__":
+    import yaml
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--stats", action="store_true", help="Print the prefetch counters"
+    )
+    parser.add_argument(
+        "--reset", action="store_true", help="Reset the prefetch counters"
+    )
+    args = parser.parse_args()
+
+    with open("config.yml") as f:
+        config = yaml.load(f, yaml.Loader)
+
+    if args.reset:
+        cache = get_bundle_cache(config)
+        for name in COUNTERS:
+            cache.delete(f"metrics:prefetch:{name}")
+
+    if args.stats:
+        print(prefetch_stats(config))
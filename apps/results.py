@@ -0,0 +1,423 @@
+# Copyright 2026 AstroLab Software
+# Author: Julien Peloton
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Search results kept on the server, and served page by page
+
+The results of a search are stored in the disk cache under a random
+query ID, split into pages. The browser only holds the query ID: each
+page flip reads and decodes a single page, whatever the number of
+results, and only the rows of this page are sent to the browser.
+
+Results are evicted after `RESULTS_TTL`, or earlier in least-recently-used
+order once the cache grows above `RESULTS_CACHE_SIZE` bytes. The page
+then asks to run the search again.
+
+The columns shown on sky maps are also stored apart, as a single
+frame, so that the sky map reads them at once whatever the number
+of pages.
+
+Sorted, filtered or deduplicated views of the results (e.g. by the
+results table) are computed on the server and stored as results of
+their own, so that moving through the pages of a view reads a single
+page as well.
+"""
+
+import hashlib
+import json
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from apps.cache import get_cache
+from apps.frames import decode_frame, encode_frame
+
+# Default values, that can be overwritten in config.yml
+DEFAULT_RESULTS_TTL = 3600  # seconds
+DEFAULT_RESULTS_CACHE_SIZE = 2**28  # bytes
+DEFAULT_PAGE_SIZE = 10
+
+# Columns of the results shown on sky maps, stored as a single frame
+SKYMAP_COLUMNS = [
+    "i:objectId",
+    "i:ra",
+    "i:dec",
+    "i:fid",
+    "i:magpsf",
+    "i:jd",
+    "v:lastdate",
+    "v:classification",
+    "d:classification",
+]
+
+# Operators of the filter queries of `dash_table.DataTable`,
+# longest symbols first
+FILTER_OPERATORS = [
+    ("ge ", ">="),
+    ("le ", "<="),
+    ("lt ", "<"),
+    ("gt ", ">"),
+    ("ne ", "!="),
+    ("eq ", "="),
+    ("contains ",),
+    ("datestartswith ",),
+]
+
+# Columns identifying the rows kept by `results_view(..., unique=...)`,
+# with the value of rows that are always kept
+UNIQUE_COLUMNS = {
+    "i:objectId": None,
+    "i:ssnamenr": "null",
+    "d:tracklet": "",
+}
+
+
+def get_results_cache(config=None):
+    """Return the cache of search results"""
+    if config is None:
+        config = {}
+
+    return get_cache(
+        "results",
+        config,
+        size_limit=int(config.get("RESULTS_CACHE_SIZE", DEFAULT_RESULTS_CACHE_SIZE)),
+        eviction_policy="least-recently-used",
+    )
+
+
+def store_results(pdf, page_size=DEFAULT_PAGE_SIZE, config=None):
+    """Keep the results of a search on the server
+
+    Parameters
+    ----------
+    pdf: pd.DataFrame
+        Results, in the order of display
+    page_size: int, optional
+        Number of rows per page. Default is 10.
+    config: dict, optional
+        User configuration (see `apps.utils.extract_configuration`).
+
+    Returns
+    -------
+    qid: str
+        Query ID, to read the results back with `load_results_page`
+    """
+    if config is None:
+        config = {}
+
+    cache = get_results_cache(config)
+    expire = float(config.get("RESULTS_TTL", DEFAULT_RESULTS_TTL))
+    compression = config.get("BUNDLE_COMPRESSION")
+
+    qid = uuid.uuid4().hex
+    npages = int(np.ceil(len(pdf.index) / page_size))
+    with cache.transact():
+        for page in range(npages):
+            cache.set(
+                f"{qid}:{page + 1}",
+                encode_frame(
+                    pdf.iloc[page * page_size : (page + 1) * page_size],
+                    compression=compression,
+                ),
+                expire=expire,
+            )
+        cache.set(
+            f"{qid}:skymap_columns",
+            encode_frame(
+                pdf[[c for c in SKYMAP_COLUMNS if c in pdf.columns]],
+                compression=compression,
+            ),
+            expire=expire,
+        )
+        cache.set(
+            qid,
+            {"nrows": len(pdf.index), "page_size": page_size, "npages": npages},
+            expire=expire,
+        )
+
+    return qid
+
+
+def get_results_info(qid, config=None):
+    """Number of rows and pages of stored results
+
+    Returns
+    -------
+    info: dict or None
+        `nrows`, `page_size` and `npages`. None if the
+        results have left the cache.
+    """
+    return get_results_cache(config).get(qid)
+
+
+def load_results_page(qid, page, columns=None, config=None):
+    """One page of stored results
+
+    Parameters
+    ----------
+    qid: str
+        Query ID, as returned by `store_results`
+    page: int
+        Page number, starting at 1
+    columns: list of str, optional
+        Columns to read (see `decode_frame`). Default is all columns.
+    config: dict, optional
+        User configuration (see `apps.utils.extract_configuration`).
+
+    Returns
+    -------
+    pdf: pd.DataFrame or None
+        Rows of the page, with their index in the results. Empty if
+        the page is out of range, None if the results have left the cache.
+    """
+    cache = get_results_cache(config)
+    info = cache.get(qid)
+    if info is None:
+        return None
+
+    if not 1 <= page <= info["npages"]:
+        return pd.DataFrame()
+
+    payload = cache.get(f"{qid}:{page}")
+    if payload is None:
+        return None
+
+    return decode_frame(payload, columns=columns)
+
+
+def load_skymap_columns(qid, nrows=None, config=None):
+    """Columns of stored results shown on sky maps (`SKYMAP_COLUMNS`)
+
+    Parameters
+    ----------
+    qid: str
+        Query ID, as returned by `store_results`
+    nrows: int, optional
+        Maximum number of rows. Default is all rows.
+    config: dict, optional
+        User configuration (see `apps.utils.extract_configuration`).
+
+    Returns
+    -------
+    pdf: pd.DataFrame or None
+        None if the results have left the cache.
+    """
+    payload = get_results_cache(config).get(f"{qid}:skymap_columns")
+    if payload is None:
+        return None
+
+    return decode_frame(payload).iloc[:nrows]
+
+
+def load_results(qid, columns=None, nrows=None, config=None):
+    """First rows of stored results, read page by page
+
+    Parameters
+    ----------
+    qid: str
+        Query ID, as returned by `store_results`
+    columns: list of str, optional
+        Columns to read (see `decode_frame`). Default is all columns.
+    nrows: int, optional
+        Maximum number of rows. Default is all rows.
+    config: dict, optional
+        User configuration (see `apps.utils.extract_configuration`).
+
+    Returns
+    -------
+    pdf: pd.DataFrame or None
+        None if the results have left the cache.
+    """
+    info = get_results_info(qid, config)
+    if info is None:
+        return None
+
+    if nrows is None:
+        nrows = info["nrows"]
+    npages = min(info["npages"], int(np.ceil(nrows / info["page_size"])))
+
+    pages = []
+    for page in range(1, npages + 1):
+        pdf = load_results_page(qid, page, columns=columns, config=config)
+        if pdf is None:
+            return None
+        pages.append(pdf)
+
+    if not pages:
+        return pd.DataFrame()
+
+    return pd.concat(pages).iloc[:nrows]
+
+
+def split_filter_part(part):
+    """Column, operator and value of a part of a DataTable filter query
+
+    Parameters
+    ----------
+    part: str
+        e.g. `{i:magpsf} > 18`
+
+    Returns
+    -------
+    out: tuple
+        Column, operator (e.g. `gt`, `contains`) and value (a float
+        if it can be parsed as a number, except for `contains` and
+        `datestartswith`). All None if the part cannot be parsed.
+    """
+    for operators in FILTER_OPERATORS:
+        for operator in operators:
+            if operator not in part:
+                continue
+            name_part, value_part = part.split(operator, 1)
+            name = name_part[name_part.find("{") + 1 : name_part.rfind("}")]
+
+            value_part = value_part.strip()
+            quote = value_part[:1]
+            if quote and quote in "'\"`" and value_part[-1] == quote:
+                value = value_part[1:-1].replace("\\" + quote, quote)
+            elif operators[0].strip() in ("contains", "datestartswith"):
+                # `contains 1` must not search for `1.0`
+                value = value_part
+            else:
+                try:
+                    value = float(value_part)
+                except ValueError:
+                    value = value_part
+
+            # Operators are returned as words, e.g. `gt` for `>`
+            return name, operators[0].strip(), value
+
+    return None, None, None
+
+
+def filter_results(pdf, filter_query):
+    """Rows matching a DataTable filter query
+
+    Parameters
+    ----------
+    pdf: pd.DataFrame
+        Results
+    filter_query: str
+        e.g. `{i:magpsf} > 18 && {i:objectId} contains ZTF21`
+
+    Returns
+    -------
+    out: pd.DataFrame
+    """
+    mask = np.ones(len(pdf.index), dtype=bool)
+    for part in filter_query.split(" && "):
+        name, operator, value = split_filter_part(part)
+        if name not in pdf.columns:
+            continue
+
+        column = pdf[name]
+        if operator in ("contains", "datestartswith"):
+            strings = column.astype(str)
+            if operator == "contains":
+                mask &= strings.str.contains(str(value), regex=False).to_numpy()
+            else:
+                mask &= strings.str.startswith(str(value)).to_numpy()
+            continue
+
+        if isinstance(value, float) and not pd.api.types.is_numeric_dtype(column):
+            column = pd.to_numeric(column, errors="coerce")
+        elif not isinstance(value, float):
+            column = column.astype(str)
+
+        mask &= {
+            "ge": column >= value,
+            "le": column <= value,
+            "lt": column < value,
+            "gt": column > value,
+            "ne": column != value,
+            "eq": column == value,
+        }[operator].to_numpy()
+
+    return pdf[mask]
+
+
+def unique_results(pdf, column):
+    """First row of each value of `column`, see `UNIQUE_COLUMNS`"""
+    if column not in pdf.columns:
+        return pdf
+
+    keep = UNIQUE_COLUMNS[column]
+    if keep is None:
+        return pdf.drop_duplicates(subset=column, keep="first")
+
+    always = (pdf[column] == keep).to_numpy()
+    return pdf[~pdf.duplicated(subset=column).to_numpy() | always]
+
+
+def results_view(qid, sort_by=None, filter_query=None, unique=None, config=None):
+    """Sorted, filtered or deduplicated view of stored results
+
+    Views are stored as results of their own, under a query ID
+    that only depends on the original results and the view. They
+    are computed once, and evicted like other results.
+
+    Parameters
+    ----------
+    qid: str
+        Query ID, as returned by `store_results`
+    sort_by: list of dict, optional
+        Columns to sort on, as `{"column_id": ..., "direction": "asc"}`
+        (see the `sort_by` property of `dash_table.DataTable`)
+    filter_query: str, optional
+        Filter query of `dash_table.DataTable` (see `filter_results`)
+    unique: str, optional
+        Keep only the first row of each value of this column, one of
+        `UNIQUE_COLUMNS`. It is applied before filtering.
+    config: dict, optional
+        User configuration (see `apps.utils.extract_configuration`).
+
+    Returns
+    -------
+    qid: str or None
+        Query ID of the view, to read it with `load_results_page`.
+        None if the results have left the cache.
+    """
+    if not sort_by and not filter_query and not unique:
+        return qid if get_results_info(qid, config) is not None else None
+
+    cache = get_results_cache(config)
+    view = json.dumps([sort_by or [], filter_query or "", unique], sort_keys=True)
+    key = "{}:view:{}".format(qid, hashlib.md5(view.encode()).hexdigest())
+
+    vid = cache.get(key)
+    if vid is not None and get_results_info(vid, config) is not None:
+        return vid
+
+    info = get_results_info(qid, config)
+    pdf = load_results(qid, config=config)
+    if info is None or pdf is None:
+        return None
+
+    if unique:
+        pdf = unique_results(pdf, unique)
+    if filter_query:
+        pdf = filter_results(pdf, filter_query)
+    sort_by = [c for c in sort_by or [] if c["column_id"] in pdf.columns]
+    if sort_by:
+        pdf = pdf.sort_values(
+            [c["column_id"] for c in sort_by],
+            ascending=[c["direction"] == "asc" for c in sort_by],
+            kind="stable",
+        )
+
+    vid = store_results(pdf, page_size=info["page_size"], config=config)
+    expire = float((config or {}).get("RESULTS_TTL", DEFAULT_RESULTS_TTL))
+    cache.set(key, vid, expire=expire)
+
+    return vid
@@ -0,0 +1,390 @@
+# Copyright 2026 AstroLab Software
+# Author: Julien Peloton
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Catalogs of sources overlaid on Aladin Lite sky maps
+
+Sources are sent to the browser as one compact JSON document: a catalog
+per group of sources (e.g. per classification), with columns of values
+rather than one object per source, and values shared by all the sources
+of a catalog written once. The catalogs are built in the browser by
+`finkAddCatalogs` (`assets/aladin_catalogs.js`).
+
+The cost of building the catalogs, for 1k to 100k sources, is reported
+by `benchmarks/skymap.py`.
+
+Beyond `SKYMAP_MAX_SOURCES` sources, sky maps show the density of
+sources instead: the number of sources per HEALPix cell, as a few
+MOCs of increasing opacity. Positions are kept on the server, indexed
+by HEALPix cell, and the sources are sent only once the view is zoomed
+in below `SKYMAP_SOURCES_FOV` (see `finkAddDensity`).
+"""
+
+import json
+import uuid
+
+import healpy as hp
+import numpy as np
+from mocpy import MOC
+
+from apps.frames import decode_frame, encode_frame
+from apps.results import DEFAULT_RESULTS_TTL, get_results_cache
+from apps.utils import class_colors, simbad_types
+
+# Default values, that can be overwritten in config.yml
+DEFAULT_SKYMAP_MAX_SOURCES = 10000
+DEFAULT_SKYMAP_SOURCES_FOV = 2.0  # degrees
+
+# HEALPix order of the index of positions (~27 arcmin cells), and
+# maximum order of the density maps
+INDEX_ORDER = 7
+
+# Density levels, in number of sources per cell
+DENSITY_LEVELS = [1, 10, 100, 1000]
+DENSITY_COLOR = "orange"
+
+# Decimals of the positions, in degrees (~4 mas)
+POSITION_DECIMALS = 6
+
+# Options of the catalogs of alerts
+ALERT_CATALOG_OPTIONS = {"sourceSize": 15, "shape": "circle", "onClick": "showPopup"}
+
+
+def classification_color(classification):
+    """Colour of the sources of a classification"""
+    if classification in simbad_types:
+        return class_colors["Simbad"]
+    # Sometimes SIMBAD mess up names :-)
+    return class_colors.get(classification, class_colors["Simbad"])
+
+
+def make_catalogs(pdf, by, fields, options, ra="i:ra", dec="i:dec"):
+    """Compact catalogs of sources, one per group of sources
+
+    Parameters
+    ----------
+    pdf: pd.DataFrame
+        Sources
+    by: str
+        Column defining the catalogs, one per value
+    fields: dict
+        Column of each field shown in the popup of a source, in order
+    options: callable
+        Options of `A.catalog` (name, color, ...), from the
+        value of `by` and the number of sources of the catalog
+    ra: str, optional
+        Column of the right ascensions, in degrees. Default is `i:ra`.
+    dec: str, optional
+        Column of the declinations, in degrees. Default is `i:dec`.
+
+    Returns
+    -------
+    catalogs: list of dict
+        Catalogs sorted by name, with their `options`, `ra` and
+        `dec` arrays, and for each field either an array of values
+        (`columns`) or a value shared by all sources (`constants`).
+    """
+    ras = np.round(pdf[ra].to_numpy(dtype=float), POSITION_DECIMALS)
+    decs = np.round(pdf[dec].to_numpy(dtype=float), POSITION_DECIMALS)
+    values = {field: pdf[column].to_numpy() for field, column in fields.items()}
+
+    catalogs = []
+    for key, index in pdf.groupby(by, sort=False).indices.items():
+        catalog = {
+            "options": options(key, len(index)),
+            "fields": list(fields),
+            "ra": ras[index].tolist(),
+            "dec": decs[index].tolist(),
+            "columns": {},
+            "constants": {},
+        }
+        for field, array in values.items():
+            array = array[index]
+            if (array == array[0]).all():
+                catalog["constants"][field] = array[:1].tolist()[0]
+            else:
+                catalog["columns"][field] = array.tolist()
+        catalogs.append(catalog)
+
+    return sorted(catalogs, key=lambda catalog: catalog["options"]["name"])
+
+
+def aladin_catalogs(aladin, pdf, by, fields, options, ra="i:ra", dec="i:dec"):
+    """JavaScript overlaying catalogs of sources on an Aladin Lite view
+
+    Parameters
+    ----------
+    aladin: str
+        Name of the JavaScript variable holding the Aladin Lite view
+    pdf, by, fields, options, ra, dec
+        See `make_catalogs`
+
+    Returns
+    -------
+    js: str
+        A single line, calling `finkAddCatalogs`
+    """
+    catalogs = make_catalogs(pdf, by, fields, options, ra=ra, dec=dec)
+    # NaN is not JSON, but is a JavaScript literal
+    return "finkAddCatalogs({}, {});".format(
+        aladin, json.dumps(catalogs, separators=(",", ":"))
+    )
+
+
+def aladin_view_sources(view, pdf, by, fields, options, ra="i:ra", dec="i:dec"):
+    """JavaScript showing the sources of a zoomed-in view of a density map
+
+    Parameters
+    ----------
+    view: dict
+        View sent by `finkAddDensity`
+    pdf, by, fields, options, ra, dec
+        See `make_catalogs`
+
+    Returns
+    -------
+    js: str
+        A single line, calling `finkSetSources`
+    """
+    catalogs = make_catalogs(pdf, by, fields, options, ra=ra, dec=dec)
+    return "finkSetSources({}, {});".format(
+        json.dumps(catalogs, separators=(",", ":")), json.dumps(view)
+    )
+
+
+def alert_catalog_options(classification, count):
+    """Options of the catalog of alerts of a classification"""
+    return {
+        "name": f"{classification} ({count})",
+        "color": classification_color(classification),
+        **ALERT_CATALOG_OPTIONS,
+    }
+
+
+def objectid_links(objectids, siteurl):
+    """HTML links to the pages of objects, from their Markdown links
+
+    Parameters
+    ----------
+    objectids: pd.Series
+        objectIds, as `[ZTF...](/ZTF...)` (see `markdownify_objectid`)
+    siteurl: str
+        URL of the portal
+
+    Returns
+    -------
+    out: pd.Series
+    """
+    oids = objectids.str.extract(r"\[([^\]]*)\]", expand=False)
+    return '<a target="_blank" href="' + siteurl + "/" + oids + '">' + oids + "</a>"
+
+
+def healpix_index(ra, dec, order=INDEX_ORDER):
+    """HEALPix cells (nested scheme) of positions, in degrees"""
+    return hp.ang2pix(2**order, ra, dec, nest=True, lonlat=True)
+
+
+def store_skymap_sources(pdf, qid=None, config=None):
+    """Keep the sources of a sky map on the server, indexed by HEALPix cell
+
+    Parameters
+    ----------
+    pdf: pd.DataFrame
+        Sources, with `i:ra` and `i:dec`
+    qid: str, optional
+        Query ID of the search results (see `apps.results`). Default
+        is a new random ID.
+    config: dict, optional
+        User configuration (see `apps.utils.extract_configuration`).
+
+    Returns
+    -------
+    key: str
+        Key of the sources, to read them back with `load_skymap_sources`
+    """
+    if config is None:
+        config = {}
+
+    if qid is None:
+        qid = uuid.uuid4().hex
+    key = f"{qid}:skymap"
+
+    ipix = healpix_index(
+        pdf["i:ra"].to_numpy(dtype=float), pdf["i:dec"].to_numpy(dtype=float)
+    )
+    pdf = pdf.assign(**{"v:ipix": ipix}).sort_values("v:ipix", kind="stable")
+
+    get_results_cache(config).set(
+        key,
+        encode_frame(
+            pdf.reset_index(drop=True), compression=config.get("BUNDLE_COMPRESSION")
+        ),
+        expire=float(config.get("RESULTS_TTL", DEFAULT_RESULTS_TTL)),
+    )
+
+    return key
+
+
+def load_skymap_sources(key, columns=None, config=None):
+    """Sources stored by `store_skymap_sources`, sorted by HEALPix cell
+
+    Returns
+    -------
+    pdf: pd.DataFrame or None
+        None if the sources have left the cache.
+    """
+    payload = get_results_cache(config).get(key)
+    if payload is None:
+        return None
+
+    return decode_frame(payload, columns=columns)
+
+
+def density_layers(ipix, nmax):
+    """MOCs of the density of sources, one per density level
+
+    The order of the cells is lowered until there are at most
+    `nmax` cells with sources, so that the size of the MOCs is
+    bounded whatever the number of sources.
+
+    Parameters
+    ----------
+    ipix: np.array
+        HEALPix cells of the sources, at `INDEX_ORDER`
+    nmax: int
+        Maximum number of cells
+
+    Returns
+    -------
+    layers: list of dict
+        `name`, `color`, `opacity` and `moc` (MOC in the JSON
+        format of Aladin Lite) of each level with sources
+    """
+    order = INDEX_ORDER
+    cells, counts = np.unique(ipix, return_counts=True)
+    while order > 0 and len(cells) > nmax:
+        order -= 1
+        cells, counts = np.unique(
+            ipix >> (2 * (INDEX_ORDER - order)), return_counts=True
+        )
+
+    levels = DENSITY_LEVELS + [np.inf]
+    layers = []
+    for index, (low, high) in enumerate(zip(levels[:-1], levels[1:])):
+        mask = (counts >= low) & (counts < high)
+        if not mask.any():
+            continue
+        moc = MOC.from_healpix_cells(
+            cells[mask].astype(np.uint64),
+            np.full(mask.sum(), order, dtype=np.uint8),
+            order,
+        )
+        layers.append(
+            {
+                "name": "{}{} alerts per cell ({:.1f} deg)".format(
+                    low,
+                    f"-{high - 1}" if np.isfinite(high) else "+",
+                    hp.nside2resol(2**order, arcmin=True) / 60,
+                ),
+                "color": DENSITY_COLOR,
+                "opacity": round(0.2 + 0.6 * index / (len(DENSITY_LEVELS) - 1), 2),
+                "moc": json.loads(moc.to_string(format="json")),
+            }
+        )
+
+    return layers
+
+
+def aladin_density(aladin, key, nmax, fov=DEFAULT_SKYMAP_SOURCES_FOV, config=None):
+    """JavaScript overlaying the density of stored sources on an Aladin Lite view
+
+    Parameters
+    ----------
+    aladin: str
+        Name of the JavaScript variable holding the Aladin Lite view
+    key: str
+        Key of the sources (see `store_skymap_sources`)
+    nmax: int
+        Maximum number of cells of the density maps
+    fov: float, optional
+        Field of view, in degrees, below which sources are shown
+    config: dict, optional
+        User configuration (see `apps.utils.extract_configuration`).
+
+    Returns
+    -------
+    js: str or None
+        A single line, calling `finkAddDensity`. None if the
+        sources have left the cache.
+    """
+    pdf = load_skymap_sources(key, columns=["v:ipix"], config=config)
+    if pdf is None:
+        return None
+
+    layers = density_layers(pdf["v:ipix"].to_numpy(dtype=np.int64), nmax)
+    return "finkAddDensity({}, {}, {});".format(
+        aladin,
+        json.dumps(layers, separators=(",", ":")),
+        json.dumps({"key": key, "fov": fov}),
+    )
+
+
+def sources_in_view(pdf, ra, dec, radius, nmax):
+    """Sources within a cone, from sources sorted by HEALPix cell
+
+    Parameters
+    ----------
+    pdf: pd.DataFrame
+        Sources, from `load_skymap_sources`
+    ra, dec: float
+        Centre of the view, in degrees
+    radius: float
+        Radius of the view, in degrees
+    nmax: int
+        Maximum number of sources
+
+    Returns
+    -------
+    out: pd.DataFrame
+        At most `nmax` sources, closest to the centre first
+    """
+    cells = hp.query_disc(
+        2**INDEX_ORDER,
+        hp.ang2vec(ra, dec, lonlat=True),
+        np.radians(radius),
+        inclusive=True,
+        nest=True,
+    )
+    # Rows of the cells, read from the sorted index
+    ipix = pdf["v:ipix"].to_numpy()
+    starts = np.searchsorted(ipix, cells, side="left")
+    stops = np.searchsorted(ipix, cells, side="right")
+    rows = np.concatenate(
+        [np.arange(start, stop) for start, stop in zip(starts, stops)] + [[]]
+    ).astype(int)
+    candidates = pdf.iloc[rows]
+
+    # Great-circle distances to the centre
+    ra1 = np.radians(candidates["i:ra"].to_numpy(dtype=float))
+    dec1 = np.radians(candidates["i:dec"].to_numpy(dtype=float))
+    ra0, dec0 = np.radians(ra), np.radians(dec)
+    separation = 2 * np.arcsin(
+        np.sqrt(
+            np.sin((dec1 - dec0) / 2) ** 2
+            + np.cos(dec0) * np.cos(dec1) * np.sin((ra1 - ra0) / 2) ** 2
+        )
+    )
+    order = np.argsort(separation, kind="stable")
+    order = order[separation[order] <= np.radians(radius)][:nmax]
+
+    return candidates.iloc[order]
@@ -21,6 +21,7 @@ from dash import Input, Output, dcc, html
 from dash_iconify import DashIconify
 
 from app import app
+from apps.upstream import UpstreamError, call_upstream
 from apps.utils import convert_mpc_type, help_popover, query_mpc
 from astropy.time import Time
 
@@ -34,11 +35,19 @@ AU_TO_M = 149597870700
 
 def get_sso_data(ssnamenr):
     """Extract SSO data from various providers (SSODNET, MPC)"""
-    data = rocks.Rock(
-        ssnamenr,
-        skip_id_check=False,
-    )
-    if data.id_ == "":
+    try:
+        data = call_upstream(
+            "ssodnet",
+            lambda timeout: rocks.Rock(ssnamenr, skip_id_check=False),
+            key=ssnamenr,
+            config=args,
+        )
+    except UpstreamError as e:
+        # Fall back on MPC
+        print(e)
+        data = None
+
+    if data is None or data.id_ == "":
         if ssnamenr.startswith("C/"):
             kind = "comet"
             ssnamenr = ssnamenr[0:6] + " " + ssnamenr[6:]
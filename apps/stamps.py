@@ -0,0 +1,342 @@
+# Copyright 2026 AstroLab Software
+# Author: Julien Peloton
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Cutouts of alerts, fetched concurrently and kept decoded
+
+The cutouts of an alert never change, so their decoded arrays are kept
+in the disk cache under the `candid` of the alert and the kind of stamp,
+and shared by all workers. Missing stamps are fetched concurrently, one
+request per kind, and the stamps of a page of search results in bulk.
+Least-recently-used stamps are evicted first, once the cache grows above
+`STAMP_CACHE_SIZE` bytes.
+
+Stamps are rendered on the server as small PNG images, with the stretch
+and colours of the interactive heatmaps (see `apps.plotting.draw_cutout`).
+Images are cached by content, so that each stamp is rendered once.
+"""
+
+import base64
+import hashlib
+import io
+
+import numpy as np
+import pandas as pd
+from PIL import Image
+
+from apps.cache import get_cache
+from apps.utils import (
+    _data_stretch,
+    extract_configuration,
+    readstamp,
+    request_api,
+    request_many,
+)
+
+# Default value, that can be overwritten in config.yml
+DEFAULT_STAMP_CACHE_SIZE = 2**28  # bytes
+
+CUTOUT_KINDS = ["science", "template", "difference"]
+
+# Plotly `Blues_r` colorscale, used by the heatmaps of stamps
+STAMP_COLORSCALE = [
+    (8, 48, 107),
+    (8, 81, 156),
+    (33, 113, 181),
+    (66, 146, 198),
+    (107, 174, 214),
+    (158, 202, 225),
+    (198, 219, 239),
+    (222, 235, 247),
+    (247, 251, 255),
+]
+
+# 256 colours, interpolated as Plotly does between the colorscale stops
+STAMP_PALETTE = (
+    np.stack(
+        [
+            np.interp(
+                np.linspace(0, 1, 256),
+                np.linspace(0, 1, len(STAMP_COLORSCALE)),
+                channel,
+            )
+            for channel in zip(*STAMP_COLORSCALE)
+        ],
+        axis=-1,
+    )
+    .round()
+    .astype(np.uint8)
+)
+
+
+def get_stamp_cache(config=None):
+    """Return the cache of decoded cutouts"""
+    if config is None:
+        config = {}
+
+    return get_cache(
+        "stamps",
+        config,
+        size_limit=int(config.get("STAMP_CACHE_SIZE", DEFAULT_STAMP_CACHE_SIZE)),
+        eviction_policy="least-recently-used",
+    )
+
+
+def _cutout_call(oid, candid, kind):
+    """Arguments of `request_api` for one cutout"""
+    payload = {
+        "objectId": oid,
+        "kind": kind.capitalize(),
+        "output-format": "FITS",
+    }
+    if candid is not None:
+        payload["candid"] = str(candid)
+
+    return {"endpoint": "/api/v1/cutouts", "json": payload, "output": "raw"}
+
+
+def _decode(raw):
+    """Array of a FITS cutout, or None if the request failed"""
+    try:
+        return readstamp(raw, gzipped=False)
+    except OSError:
+        return None
+
+
+def fetch_stamps(alerts, kinds=None):
+    """Cutouts of several alerts, from the cache or fetched concurrently
+
+    Parameters
+    ----------
+    alerts: list of tuple
+        (objectId, candid) of each alert. If candid is None, the
+        last alert of the object is fetched, and not cached.
+    kinds: list of str, optional
+        Kinds of stamps among `CUTOUT_KINDS`. Default is all kinds.
+
+    Returns
+    -------
+    stamps: dict
+        2D array for each (objectId, candid, kind), None
+        if the cutout could not be fetched.
+    """
+    if kinds is None:
+        kinds = CUTOUT_KINDS
+
+    cache = get_stamp_cache(extract_configuration("config.yml"))
+
+    stamps = {}
+    missing = []
+    for oid, candid in alerts:
+        for kind in kinds:
+            # Without candid, the API returns the cutouts of the last alert
+            stamp = None if candid is None else cache.get(f"{candid}:{kind}")
+            if stamp is None:
+                missing.append((oid, candid, kind))
+            stamps[(oid, candid, kind)] = stamp
+
+    raws = request_many([_cutout_call(*key) for key in missing])
+    for key, raw in zip(missing, raws):
+        stamp = _decode(raw)
+        if stamp is not None and key[1] is not None:
+            cache.set(f"{key[1]}:{key[2]}", stamp)
+        stamps[key] = stamp
+
+    return stamps
+
+
+def fetch_alert_stamps(oid, candid, kinds=None):
+    """Cutouts of an alert
+
+    Parameters
+    ----------
+    oid: str
+        ZTF objectId
+    candid: int or None
+        Alert ID. None for the last alert of the object.
+    kinds: list of str, optional
+        Kinds of stamps among `CUTOUT_KINDS`. Default is all kinds.
+
+    Returns
+    -------
+    stamps: dict
+        2D array for each kind, None if the cutout could not be fetched
+    """
+    if kinds is None:
+        kinds = CUTOUT_KINDS
+
+    stamps = fetch_stamps([(oid, candid)], kinds)
+    return {kind: stamps[(oid, candid, kind)] for kind in kinds}
+
+
+def fetch_latest_stamps(oids, kinds=None):
+    """Cutouts of the last alert of several objects, in bulk
+
+    The last alert of all objects is found with a single request,
+    then missing stamps are fetched concurrently.
+
+    Parameters
+    ----------
+    oids: list of str
+        ZTF objectIds, e.g. the objects of a page of search results
+    kinds: list of str, optional
+        Kinds of stamps among `CUTOUT_KINDS`. Default is all kinds.
+
+    Returns
+    -------
+    stamps: dict
+        For each objectId, 2D array for each kind. Arrays are None
+        if the cutout could not be fetched.
+    """
+    if kinds is None:
+        kinds = CUTOUT_KINDS
+
+    pdf = request_api(
+        "/api/v1/objects",
+        json={"objectId": ",".join(oids)},
+        columns=["i:objectId", "i:candid", "i:jd"],
+    )
+    if pdf.empty:
+        pdf = pd.DataFrame(columns=["i:objectId", "i:candid", "i:jd"])
+
+    last = pdf.sort_values("i:jd").groupby("i:objectId")["i:candid"].last()
+    alerts = [(oid, last[oid]) for oid in oids if oid in last.index]
+    stamps = fetch_stamps(alerts, kinds)
+
+    return {
+        oid: {
+            kind: stamps[(oid, last[oid], kind)] if oid in last.index else None
+            for kind in kinds
+        }
+        for oid in oids
+    }
+
+
+def orient_stamp(stamp, kind, isdiffpos):
+    """Invert the difference stamp of a negative event
+
+    Returns
+    -------
+    stamp: np.array or None
+        A copy, so that the cached stamp is not changed
+    """
+    if stamp is not None and kind == "difference" and isdiffpos == "f":
+        return np.negative(stamp)
+
+    return stamp
+
+
+def plain_normalizer(
+    img: list, vmin: float, vmax: float, stretch="linear", pmin=0.5, pmax=99.5
+) -> list:
+    """Image normalisation between vmin and vmax
+
+    Parameters
+    ----------
+    img: float array
+        a float array representing a non-normalized image
+
+    Returns
+    -------
+    out: float array where data are bounded between vmin and vmax
+    """
+    limits = np.percentile(img, [pmin, pmax])
+    data = _data_stretch(
+        img, vmin=limits[0], vmax=limits[1], stretch=stretch, vmid=0.1, exponent=2
+    )
+    data = (vmax - vmin) * data + vmin
+
+    return data
+
+
+def stamp_stretch(kind):
+    """Stretch of the stamps of a kind"""
+    return "linear" if kind == "difference" else "asinh"
+
+
+def normalize_stamp(stamp, kind, lower_bound=0, upper_bound=1):
+    """Stamp data normalised for display, between the bounds"""
+    data = np.nan_to_num(stamp)
+
+    # data = sigmoid_normalizer(data, lower_bound, upper_bound)
+    return plain_normalizer(
+        data,
+        lower_bound,
+        upper_bound,
+        stretch=stamp_stretch(kind),
+        pmin=0.5,
+        pmax=99.95,
+    )
+
+
+def render_stamp(stamp, kind):
+    """PNG image of a stamp
+
+    Parameters
+    ----------
+    stamp: np.array
+        2D array of the cutout
+    kind: str
+        science, template, or difference
+
+    Returns
+    -------
+    png: bytes
+        Image with a pixel per pixel of the stamp, coloured
+        over the range of the normalised data, as heatmaps are.
+    """
+    data = normalize_stamp(stamp, kind)
+    low, high = np.min(data), np.max(data)
+    if high > low:
+        data = (data - low) / (high - low)
+    else:
+        data = np.zeros_like(data)
+
+    img = Image.fromarray(np.round(data * 255).astype(np.uint8), mode="P")
+    img.putpalette(STAMP_PALETTE.tobytes())
+
+    buff = io.BytesIO()
+    img.save(buff, format="png", optimize=True)
+    return buff.getvalue()
+
+
+def stamp_thumbnail(stamp, kind):
+    """Stamp as a PNG data URI, rendered once for all workers
+
+    Parameters
+    ----------
+    stamp: np.array
+        2D array of the cutout
+    kind: str
+        science, template, or difference
+
+    Returns
+    -------
+    src: str
+        Data URI of the image, for `html.Img`
+    """
+    stamp = np.ascontiguousarray(stamp)
+    digest = hashlib.blake2b(
+        "{}{}".format(stamp.dtype.str, stamp.shape).encode() + stamp.tobytes(),
+        digest_size=16,
+    ).hexdigest()
+    key = f"png:{digest}:{stamp_stretch(kind)}"
+
+    cache = get_stamp_cache(extract_configuration("config.yml"))
+    src = cache.get(key)
+    if src is None:
+        encoded = base64.b64encode(render_stamp(stamp, kind)).decode("utf-8")
+        src = "data:image/png;base64," + encoded
+        cache.set(key, src)
+
+    return src
@@ -12,7 +12,6 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-import io
 import requests
 import dash_bootstrap_components as dbc
 import dash_mantine_components as dmc
@@ -27,7 +26,14 @@ from dash.exceptions import PreventUpdate
 from dash_iconify import DashIconify
 
 from app import app
+from apps.bundle import (
+    BUNDLE_FRAMES,
+    get_object_bundle,
+    load_object_frame,
+    resolve_object_name,
+)
 from apps.cards import card_id, card_lightcurve_summary
+from apps.prefetch import record_object_page
 from apps.plotting import (
     draw_sso_astrometry,
     draw_sso_lightcurve,
@@ -36,12 +42,12 @@ from apps.plotting import (
 )
 from apps.sso.cards import card_sso_left
 from apps.supernovae.cards import card_sn_scores
+from apps.upstream import UpstreamError, call_upstream
 from apps.utils import (
+    extract_configuration,
     generate_qr,
     loading,
     pil_to_b64,
-    request_api,
-    retrieve_oid_from_metaname,
 )
 from apps.varstars.cards import card_explanation_variable
 from apps.blazars.cards import card_explanation_blazar
@@ -218,13 +224,22 @@ def tab3_content():
 @app.callback(
     Output("tab_sso", "children"),
     [
+        Input("summary_tabs", "value"),
         Input("object-sso", "data"),
     ],
+    State("tab_sso", "children"),
     prevent_initial_call=True,
 )
-def tab5_content(object_soo):
-    """SSO tab"""
-    pdf = pd.read_json(io.StringIO(object_soo))
+def tab5_content(summary_tab, object_soo, children):
+    """SSO tab
+
+    Ephemerides are fetched when the tab is opened for the first time,
+    and the tab is kept as is afterwards.
+    """
+    if summary_tab != "Solar System" or children or not object_soo:
+        raise PreventUpdate
+
+    pdf = load_object_frame(object_soo, "sso")
     if pdf.empty:
         ssnamenr = "null"
         sso_name = "null"
@@ -428,13 +443,22 @@ def tab5_content(object_soo):
 @app.callback(
     Output("tab_tracklet", "children"),
     [
+        Input("summary_tabs", "value"),
         Input("object-tracklet", "data"),
     ],
+    State("tab_tracklet", "children"),
     prevent_initial_call=True,
 )
-def tab6_content(object_tracklet):
-    """Tracklet tab"""
-    pdf = pd.read_json(io.StringIO(object_tracklet))
+def tab6_content(summary_tab, object_tracklet, children):
+    """Tracklet tab
+
+    Tracklet members are fetched when the tab is opened for the first
+    time, and the tab is kept as is afterwards.
+    """
+    if summary_tab != "Tracklets" or children or not object_tracklet:
+        raise PreventUpdate
+
+    pdf = load_object_frame(object_tracklet, "tracklet")
     tab6_content_ = html.Div(
         [
             dmc.Space(h=10),
@@ -831,67 +855,19 @@ def is_blazar(pdfs):
     ],
 )
 def store_query(name):
-    """Cache query results (data and upper limits) for easy re-use
+    """Share query results (data and upper limits) between callbacks
+
+    Data stays on the server: stores only hold the key of the object
+    bundle, and callbacks read their frames with `load_object_frame`.
 
     https://dash.plotly.com/sharing-data-between-callbacks
     """
-    if not name[1:].startswith("ZTF"):
-        # check this is not a name generated by a user
-        oid = retrieve_oid_from_metaname(name[1:])
-        if oid is None:
-            raise PreventUpdate
-    else:
-        oid = name[1:]
-
-    pdf = request_api(
-        "/api/v1/objects",
-        json={
-            "objectId": oid,
-            "withupperlim": True,
-            "withcutouts": False,
-        },
-        dtype={"i:ssnamenr": str},  # Force reading this field as string
-    )
-
-    pdf["i:ssnamenr"] = pdf["i:ssnamenr"].replace(
-        "None", "null"
-    )  # For backwards compatibility
-
-    pdfs = pdf[pdf["d:tag"] == "valid"]
-    pdfsU = pdf[pdf["d:tag"] == "upperlim"]
-    pdfsUV = pdf[pdf["d:tag"] == "badquality"]
-
-    payload = pdfs["i:ssnamenr"].to_numpy()[0]
-    is_sso = np.all([i == payload for i in pdfs["i:ssnamenr"].to_numpy()])
-    if str(payload) != "null" and is_sso:
-        pdfsso = request_api(
-            "/api/v1/sso",
-            json={"n_or_d": payload, "withEphem": True, "withResiduals": False},
-        )
-
-    else:
-        pdfsso = pd.DataFrame()
-
-    payload = pdfs["d:tracklet"].to_numpy()[0]
-
-    if str(payload).startswith("TRCK"):
-        pdftracklet = request_api(
-            "/api/v1/tracklet",
-            json={
-                "id": payload,
-            },
-        )
+    # The layout of the page is built from the same bundle
+    oid = resolve_object_name(name[1:])
+    if oid is None:
+        raise PreventUpdate
 
-    else:
-        pdftracklet = pd.DataFrame()
-
-    return (
-        pdfs.to_json(),
-        pdfsU.to_json(),
-        pdfsUV.to_json(),
-        pdfsso.to_json(),
-        pdftracklet.to_json(),
-    )
+    return (oid,) * len(BUNDLE_FRAMES)
 
 
 @app.callback(
@@ -923,16 +899,33 @@ def store_release_photometry(n_clicks, object_data):
     if (not np.any(n_clicks)) or not object_data:
         raise PreventUpdate
 
-    pdf = pd.read_json(io.StringIO(object_data))
+    pdf = load_object_frame(object_data, "data", columns=["i:ra", "i:dec"])
 
     mean_ra = np.mean(pdf["i:ra"])
     mean_dec = np.mean(pdf["i:dec"])
     sr_arcsec = 2.0
 
-    r = requests.get(
-        "https://db.ztf.snad.space/api/v3/data/latest/circle/full/json",
-        params={"ra": mean_ra, "dec": mean_dec, "radius_arcsec": sr_arcsec},
-    )
+    def query_snad(timeout):
+        r = requests.get(
+            "https://db.ztf.snad.space/api/v3/data/latest/circle/full/json",
+            params={"ra": mean_ra, "dec": mean_dec, "radius_arcsec": sr_arcsec},
+            timeout=timeout,
+        )
+        # Server errors count as failures of the service, and are not cached
+        if r.status_code >= 500:
+            r.raise_for_status()
+        return r
+
+    try:
+        r = call_upstream(
+            "snad",
+            query_snad,
+            key=f"{mean_ra:.6f},{mean_dec:.6f},{sr_arcsec}",
+            config=extract_configuration("config.yml"),
+        )
+    except UpstreamError as e:
+        print(e)
+        return no_update, ["DR photometry unavailable"] * len(n_clicks), no_update
 
     if r.status_code != 200:
         return no_update, "No DR photometry (error {})".format(r.status_code), no_update
@@ -969,12 +962,10 @@ def make_qrcode(path):
 
 def layout(name):
     # even if there is one object ID, this returns  several alerts
-    pdf = request_api(
-        "/api/v1/objects",
-        json={
-            "objectId": name[1:],
-        },
-    )
+    bundle = get_object_bundle(name[1:])
+    pdf = bundle["data"] if bundle is not None else pd.DataFrame()
+    if not pdf.empty:
+        record_object_page(bundle["oid"], extract_configuration("config.yml"))
 
     if pdf.empty:
         inner = html.Div(
@@ -12,15 +12,14 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-import io
 import dash_mantine_components as dmc
 import numpy as np
-import pandas as pd
 from astropy.time import Time
 from dash import Input, Output, callback_context, dcc, html
 from fink_utils.xmatch.simbad import get_simbad_labels
 
 from app import app
+from apps.bundle import load_object_frame
 from apps.utils import class_colors, get_first_finite_value, help_popover
 
 
@@ -165,7 +164,7 @@ def card_sn_properties(clickData1, clickData2, clickData3, clickData4, object_da
         """,
     )
 
-    pdf = pd.read_json(io.StringIO(object_data))
+    pdf = load_object_frame(object_data, "data")
     pdf = pdf.sort_values("i:jd", ascending=False)
 
     # Which graph was clicked, if any?
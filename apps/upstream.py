@@ -0,0 +1,333 @@
+# Copyright 2026 AstroLab Software
+# Author: Julien Peloton
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Calls to third-party services (SNAD, GraceDB, MPC, SsODNet, Livy)
+
+Each call runs with a latency budget, behind a circuit breaker shared by
+all gunicorn workers: after `failures` consecutive errors, calls to the
+service fail fast for `cooldown` seconds, then a single call probes the
+service again. Successful results are kept in the cache, and served
+while they are being revalidated, or when the service is down.
+
+Counters and latencies per service can be printed with:
+
+    python -m apps.upstream --stats
+"""
+
+import argparse
+import itertools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from apps.cache import get_cache
+
+# Default settings per service, that can be overwritten in config.yml.
+# timeout: latency budget of a call, in seconds
+# failures: consecutive errors before the circuit opens
+# cooldown: time before probing the service again, in seconds
+# ttl: age after which a cached result is revalidated, in seconds
+# stale: maximum age of a cached result served as a fallback, in seconds
+#        (None to disable caching)
+UPSTREAM_SERVICES = {
+    "snad": {
+        "timeout": 10,
+        "failures": 5,
+        "cooldown": 60,
+        "ttl": 86400,
+        "stale": 30 * 86400,
+    },
+    "gracedb": {
+        "timeout": 30,
+        "failures": 5,
+        "cooldown": 60,
+        "ttl": 3600,
+        "stale": 7 * 86400,
+    },
+    "mpc": {
+        "timeout": 20,
+        "failures": 5,
+        "cooldown": 60,
+        "ttl": 86400,
+        "stale": 30 * 86400,
+    },
+    "ssodnet": {
+        "timeout": 20,
+        "failures": 5,
+        "cooldown": 60,
+        "ttl": 86400,
+        "stale": 30 * 86400,
+    },
+    "livy": {"timeout": 5, "failures": 5, "cooldown": 30, "ttl": 0, "stale": None},
+}
+
+DEFAULT_MAX_WORKERS = 8
+
+# Upper bounds of the latency histogram, in milliseconds
+LATENCY_BUCKETS = [50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, float("inf")]
+
+# ok, error, timeout: calls to the service
+# rejected: calls not made, as the circuit was open
+# cached, stale: results served from the cache
+OUTCOMES = ["ok", "error", "timeout", "rejected", "cached", "stale"]
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+
+class UpstreamError(Exception):
+    """A third-party service failed, timed out, or its circuit is open"""
+
+
+def get_settings(service, config=None):
+    """Settings of a service, with the overwrites of `UPSTREAM` in config.yml"""
+    if config is None:
+        config = {}
+
+    return {
+        **UPSTREAM_SERVICES[service],
+        **config.get("UPSTREAM", {}).get(service, {}),
+    }
+
+
+def get_upstream_executor(config=None):
+    """Thread pool running the upstream calls of the current process
+
+    Calls run in their own pool, so that a service that hangs
+    does not use up the threads of the API client.
+    """
+    global _executor, _executor_pid
+
+    if config is None:
+        config = {}
+
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ThreadPoolExecutor(
+                max_workers=int(
+                    config.get("UPSTREAM_MAX_WORKERS", DEFAULT_MAX_WORKERS)
+                ),
+                thread_name_prefix="fink-upstream",
+            )
+            _executor_pid = os.getpid()
+
+    return _executor
+
+
+def _allow(cache, service, settings):
+    """Check the circuit breaker before calling a service"""
+    state = cache.get(f"breaker:{service}")
+    if state is None or state["opened"] is None:
+        return True
+
+    if time.time() - state["opened"] < settings["cooldown"]:
+        return False
+
+    # Half-open: a single probe at a time, for all processes
+    return cache.add(f"probe:{service}", os.getpid(), expire=settings["timeout"])
+
+
+def _record(cache, service, outcome, elapsed=None, settings=None):
+    """Update the circuit breaker and the metrics after a call"""
+    cache.incr(f"metrics:{service}:{outcome}")
+    if elapsed is not None:
+        ms = elapsed * 1000
+        bucket = next(b for b in LATENCY_BUCKETS if ms <= b)
+        cache.incr(f"metrics:{service}:latency:{bucket}")
+        cache.incr(f"metrics:{service}:latency_ms", int(ms))
+
+    if outcome == "ok":
+        cache.delete(f"breaker:{service}")
+        cache.delete(f"probe:{service}")
+    elif outcome in ["error", "timeout"]:
+        with cache.transact():
+            state = cache.get(f"breaker:{service}") or {"failures": 0, "opened": None}
+            state["failures"] += 1
+            # A failed probe opens the circuit again
+            if state["failures"] >= settings["failures"] or state["opened"]:
+                state["opened"] = time.time()
+            cache.set(f"breaker:{service}", state)
+        cache.delete(f"probe:{service}")
+
+
+def _call(cache, service, func, settings, config, client_error=None):
+    """Call a service within its latency budget"""
+    timeout = settings["timeout"]
+    if not _allow(cache, service, settings):
+        _record(cache, service, "rejected")
+        raise UpstreamError(f"{service}: circuit open")
+
+    t0 = time.perf_counter()
+    future = get_upstream_executor(config).submit(func, timeout)
+    try:
+        value = future.result(timeout=timeout)
+    except FutureTimeoutError as e:
+        # The thread keeps running, but the worker is released
+        _record(cache, service, "timeout", time.perf_counter() - t0, settings)
+        raise UpstreamError(f"{service}: no answer after {timeout} seconds") from e
+    except Exception as e:
+        if client_error is not None and client_error(e):
+            # The service answered, the request was wrong
+            _record(cache, service, "ok", time.perf_counter() - t0, settings)
+            raise
+        _record(cache, service, "error", time.perf_counter() - t0, settings)
+        raise UpstreamError(f"{service}: {e}") from e
+
+    _record(cache, service, "ok", time.perf_counter() - t0, settings)
+    return value
+
+
+def _refresh(cache, service, key, func, settings, config, client_error=None):
+    """Revalidate a cached result in the background"""
+    try:
+        value = _call(cache, service, func, settings, config, client_error)
+        cache.set(key, (time.time(), value), expire=settings["stale"])
+    except Exception as e:
+        print(e)
+    finally:
+        cache.delete(f"refresh:{key}")
+
+
+def call_upstream(service, func, key=None, config=None, client_error=None):
+    """Call a third-party service
+
+    Parameters
+    ----------
+    service: str
+        Name of the service, in `UPSTREAM_SERVICES`
+    func: callable
+        Function calling the service. It takes the latency budget
+        in seconds as argument, to be used as network timeout.
+    key: str, optional
+        Identifier of the request, to cache the result. Default is
+        not to cache it.
+    config: dict, optional
+        User configuration (see `apps.utils.extract_configuration`).
+    client_error: callable, optional
+        Predicate on the exceptions raised by `func`. If True (e.g. HTTP
+        404), the exception is raised as is, and does not count as a
+        failure of the service.
+
+    Returns
+    -------
+    out: object
+        Output of `func`, possibly from the cache
+
+    Raises
+    ------
+    UpstreamError
+        If the service failed, timed out, or its circuit is open,
+        and there is no cached result to fall back on.
+    """
+    settings = get_settings(service, config)
+    cache = get_cache("upstream", config)
+
+    if key is None or settings["stale"] is None:
+        return _call(cache, service, func, settings, config, client_error)
+
+    key = f"value:{service}:{key}"
+    cached = cache.get(key)
+    if cached is not None:
+        timestamp, value = cached
+        if time.time() - timestamp <= settings["ttl"]:
+            _record(cache, service, "cached")
+            return value
+
+        # Stale: serve it, and revalidate once for all processes
+        _record(cache, service, "stale")
+        if cache.add(f"refresh:{key}", os.getpid(), expire=settings["timeout"]):
+            get_upstream_executor(config).submit(
+                _refresh, cache, service, key, func, settings, config, client_error
+            )
+        return value
+
+    value = _call(cache, service, func, settings, config, client_error)
+    cache.set(key, (time.time(), value), expire=settings["stale"])
+    return value
+
+
+def upstream_stats(config=None):
+    """Counters, latency percentiles and circuit state per service
+
+    Percentiles are upper bounds, from the latency histogram.
+
+    Parameters
+    ----------
+    config: dict, optional
+        User configuration (see `apps.utils.extract_configuration`).
+
+    Returns
+    -------
+    out: dict
+    """
+    cache = get_cache("upstream", config)
+    out = {}
+    for service in UPSTREAM_SERVICES:
+        settings = get_settings(service, config)
+        stats = {i: cache.get(f"metrics:{service}:{i}", 0) for i in OUTCOMES}
+        counts = [
+            cache.get(f"metrics:{service}:latency:{b}", 0) for b in LATENCY_BUCKETS
+        ]
+        total = sum(counts)
+        if total:
+            stats["mean_ms"] = cache.get(f"metrics:{service}:latency_ms", 0) / total
+            cumulative = list(itertools.accumulate(counts))
+            for q in [50, 95, 99]:
+                index = next(
+                    i for i, c in enumerate(cumulative) if c >= total * q / 100
+                )
+                stats[f"p{q}_ms"] = LATENCY_BUCKETS[index]
+
+        state = cache.get(f"breaker:{service}")
+        if state is None or state["opened"] is None:
+            stats["circuit"] = "closed"
+        elif time.time() - state["opened"] < settings["cooldown"]:
+            stats["circuit"] = "open"
+        else:
+            stats["circuit"] = "half-open"
+
+        out[service] = stats
+
+    return out
+
+
+if __name__ == "__main__":
+    import yaml
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--stats", action="store_true", help="Print the counters per service"
+    )
+    parser.add_argument(
+        "--close",
+        nargs="+",
+        metavar="SERVICE",
+        help="Close the circuit of services, e.g. after a fix upstream",
+    )
+    args = parser.parse_args()
+
+    with open("config.yml") as f:
+        config = yaml.load(f, yaml.Loader)
+
+    if args.close:
+        cache = get_cache("upstream", config)
+        for service in args.close:
+            cache.delete(f"breaker:{service}")
+
+    if args.stats:
+        for service, stats in upstream_stats(config).items():
+            print(service, stats)
@@ -13,6 +13,9 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import urllib.parse
+import concurrent.futures
+import functools
+import os
 import importlib
 import pkgutil
 import base64
@@ -24,7 +27,6 @@ import numpy as np
 import pandas as pd
 
 import qrcode
-import requests
 from astropy.convolution import Box2DKernel, Gaussian2DKernel
 from astropy.convolution import convolve as astropy_convolve
 from astropy.io import fits
@@ -42,6 +44,25 @@ from dash import html
 
 import fink_filters.ztf.livestream as ffz
 
+from apps.cache import (
+    DEFAULT_LOCK_TIMEOUT,
+    api_cache_ttl,
+    get_api_cache,
+    get_or_compute,
+    make_api_key,
+)
+from apps.client import (
+    get_executor,
+    get_session,
+    get_timeout,
+    is_parquet,
+    negotiate_wire_format,
+    reject_wire_format,
+    single_flight,
+)
+from apps.dates import UNIX_EPOCH, convert_jd_fast
+from apps.upstream import UpstreamError, call_upstream
+
 # Access local or remove API endpoint
 
 
@@ -158,7 +179,13 @@ def readstamp(stamp: str, return_type="array", gzipped=True) -> np.array:
 
 
 def convert_jd(jd, to="iso", format="jd"):
-    """Convert Julian Date into ISO date (UTC)."""
+    """Convert Julian Date into ISO date (UTC).
+
+    ISO dates from Julian or Modified Julian Dates are computed without
+    astropy when possible, and cached for scalars (see `apps.dates`).
+    """
+    if to == "iso" and format in UNIX_EPOCH:
+        return convert_jd_fast(jd, format=format)
     return Time(jd, format=format).to_value(to)
 
 
@@ -310,16 +337,28 @@ def query_mpc(number, kind="asteroid"):
     pd.Series
         Series containing orbit and select physical information.
     """
-    try:
-        mpc = MPC.query_object(target_type=kind, number=number)
-        mpc = mpc[0]
-    except IndexError:
+
+    def query(timeout):
         try:
-            mpc = MPC.query_object(target_type=kind, designation=number)
-            mpc = mpc[0]
+            return MPC.query_object(target_type=kind, number=number)[0]
         except IndexError:
-            return pd.Series({})
-    except RuntimeError:
+            try:
+                return MPC.query_object(target_type=kind, designation=number)[0]
+            except IndexError:
+                return None
+
+    try:
+        mpc = call_upstream(
+            "mpc",
+            query,
+            key=f"{kind}:{number}",
+            config=extract_configuration("config.yml"),
+        )
+    except UpstreamError as e:
+        print(e)
+        return pd.Series({})
+
+    if mpc is None:
         return pd.Series({})
     orbit = pd.Series(mpc)
     return orbit
@@ -553,14 +592,144 @@ def get_multi_labels(pdf, colname, default=None, to_avoid=None):
         return default
 
 
-def request_api(endpoint, json=None, output="pandas", method="POST", **kwargs):
-    """Output is one of 'pandas' (default), 'raw' or 'json'"""
+def request_api(
+    endpoint,
+    json=None,
+    output="pandas",
+    method="POST",
+    timeout=None,
+    columns=None,
+    **kwargs,
+):
+    """Query the Fink API
+
+    Connections are pooled and kept alive across calls (see `apps.client`),
+    and successful responses are cached for all workers (see `apps.cache`).
+    For tabular outputs, data is transferred in Parquet rather than JSON
+    when the endpoint supports it.
+
+    Parameters
+    ----------
+    endpoint: str
+        API route, e.g. `/api/v1/objects`
+    json: dict, optional
+        Payload of the request. Sent as JSON body for POST,
+        and as URL parameters for GET.
+    output: str, optional
+        Output is one of 'pandas' (default), 'raw' or 'json'
+    method: str, optional
+        POST (default) or GET
+    timeout: float or tuple, optional
+        (connect, read) timeouts in seconds. Default is
+        taken from the configuration.
+    columns: list of str, optional
+        Columns to transfer (e.g. `["i:jd", "i:magpsf"]`).
+        Default is all columns.
+    **kwargs
+        Extra arguments passed to `pd.read_json`. For Parquet
+        transfers, only `dtype` is used.
+
+    Returns
+    -------
+    out: pd.DataFrame, io.BytesIO, or dict/list
+        Empty output if the request failed.
+    """
     args = extract_configuration("config.yml")
+
+    if columns is not None and isinstance(json, dict):
+        json = {**json, "columns": ",".join(columns)}
+
+    if output == "pandas":
+        payload, columnar = negotiate_wire_format(endpoint, json, method, args)
+    else:
+        payload, columnar = json, False
+
+    r = _fetch_cached(endpoint, payload, method, timeout, args)
+    if columnar and 400 <= r.status_code < 500:
+        # Retry in JSON, and stick to it if the endpoint
+        # does not know about the columnar format. Server
+        # errors go through the normal error path.
+        r = _fetch_cached(endpoint, json, method, timeout, args)
+        if r.status_code == 200:
+            reject_wire_format(endpoint)
+
+    if r.status_code != 200:
+        return empty_output(output)
+
+    if output == "json":
+        return r.json()
+    elif output == "raw":
+        return io.BytesIO(r.content)
+
+    if is_parquet(r.content):
+        try:
+            pdf = pd.read_parquet(io.BytesIO(r.content))
+        except (ValueError, OSError) as e:
+            # Unreadable Parquet: stick to JSON for this endpoint
+            print(e)
+            reject_wire_format(endpoint)
+            return request_api(
+                endpoint,
+                json=json,
+                output=output,
+                method=method,
+                timeout=timeout,
+                columns=columns,
+                **kwargs,
+            )
+        dtype = kwargs.get("dtype")
+        if dtype:
+            pdf = pdf.astype({k: v for k, v in dtype.items() if k in pdf.columns})
+    else:
+        pdf = pd.read_json(io.BytesIO(r.content), **kwargs)
+
+    if columns is not None:
+        pdf = pdf[[c for c in columns if c in pdf.columns]]
+
+    return pdf
+
+
+def _fetch_cached(endpoint, json, method, timeout, args):
+    """Send the HTTP request, or get the response from the cache
+
+    Identical concurrent calls are coalesced: within a process they
+    share one upstream call, and across processes they wait on a lock
+    in the shared cache.
+    """
+    key = make_api_key(args["APIURL"], endpoint, method, json)
+
+    # Successful responses are shared between workers for a while
+    ttl = api_cache_ttl(endpoint, args, payload=json)
+    if ttl is None:
+        return single_flight(key, lambda: _fetch(endpoint, json, method, timeout, args))
+
+    cache = get_api_cache(args)
+    return single_flight(
+        key,
+        lambda: get_or_compute(
+            cache,
+            key,
+            lambda: _fetch(endpoint, json, method, timeout, args),
+            expire=ttl,
+            tag=endpoint,
+            should_cache=lambda r: r.status_code == 200,
+            lock_timeout=float(args.get("API_LOCK_TIMEOUT", DEFAULT_LOCK_TIMEOUT)),
+        ),
+    )
+
+
+def _fetch(endpoint, json, method, timeout, args):
+    """Send the HTTP request to the API (see `request_api`)"""
     APIURL = args["APIURL"]
+    session = get_session(args)
+    if timeout is None:
+        timeout = get_timeout(args)
+
     if method == "POST":
-        r = requests.post(
+        r = session.post(
             f"{APIURL}{endpoint}",
             json=json,
+            timeout=timeout,
         )
     elif method == "GET":
         URL = f"{APIURL}{endpoint}"
@@ -572,20 +741,64 @@ def request_api(endpoint, json=None, output="pandas", method="POST", **kwargs):
                 ARGS += "{}={}&".format(
                     urllib.parse.quote_plus(k), urllib.parse.quote_plus(v)
                 )
-        r = requests.get(URL + ARGS)
+        r = session.get(URL + ARGS, timeout=timeout)
+
+    return r
 
+
+def empty_output(output="pandas"):
+    """Empty result of `request_api` for a given output kind"""
     if output == "json":
-        if r.status_code != 200:
-            return []
-        return r.json()
+        return []
     elif output == "raw":
-        if r.status_code != 200:
-            return io.BytesIO()
-        return io.BytesIO(r.content)
+        return io.BytesIO()
     else:
-        if r.status_code != 200:
-            return pd.DataFrame()
-        return pd.read_json(io.BytesIO(r.content), **kwargs)
+        return pd.DataFrame()
+
+
+def request_many(calls, timeout=None):
+    """Run independent API calls concurrently
+
+    Parameters
+    ----------
+    calls: list of dict
+        Arguments of `request_api` for each call, e.g.
+        [{"endpoint": "/api/v1/sso", "json": {"n_or_d": "8467"}}, ...]
+    timeout: float, optional
+        Maximum time to wait for all the calls, in seconds.
+        Default is to wait for the HTTP timeouts.
+
+    Returns
+    -------
+    out: list
+        Results in the same order as `calls`. Calls that failed
+        or timed out are replaced by an empty output (see `empty_output`),
+        so that one slow or broken endpoint does not break the others.
+
+    Examples
+    --------
+    >>> pdf_sso, pdf_tracklet = request_many([
+    ...     {"endpoint": "/api/v1/sso", "json": {"n_or_d": "8467"}},
+    ...     {"endpoint": "/api/v1/tracklet", "json": {"id": "TRCK_20231213_133612_00"}},
+    ... ]) # doctest: +SKIP
+    """
+    executor = get_executor(extract_configuration("config.yml"))
+    futures = [executor.submit(request_api, **call) for call in calls]
+
+    # One budget for all the calls, not one per call
+    done, _ = concurrent.futures.wait(futures, timeout=timeout)
+
+    results = []
+    for call, future in zip(calls, futures):
+        try:
+            if future not in done:
+                raise concurrent.futures.TimeoutError()
+            results.append(future.result())
+        except Exception as e:  # noqa: PERF203
+            print("Request to {} failed: {!r}".format(call["endpoint"], e))
+            results.append(empty_output(call.get("output", "pandas")))
+
+    return results
 
 
 def loading(item):
@@ -823,20 +1036,26 @@ def create_button_for_external_conesearch(
     return button
 
 
+@functools.lru_cache(maxsize=None)
 def extract_configuration(filename):
     """Extract user defined configuration
 
+    The file is read only once per process. The returned
+    dictionary is shared, and must not be modified.
+
     Parameters
     ----------
     filename: str
-        Full path to the `config.yml` file.
+        Full path to the `config.yml` file. It can be overwritten
+        with the `FINK_PORTAL_CONFIG` environment variable.
 
     Returns
     -------
     out: dict
         Dictionary with user defined values.
     """
-    config = yaml.load(open("config.yml"), yaml.Loader)
+    with open(os.environ.get("FINK_PORTAL_CONFIG", filename)) as f:
+        config = yaml.load(f, yaml.Loader)
     if config["HOST"].endswith(".org"):
         config["SITEURL"] = "https://" + config["HOST"]
     else:
@@ -52,6 +52,7 @@ from apps.mining.utils import (
     submit_spark_job,
     upload_file_hdfs,
 )
+from apps.upstream import UpstreamError, call_upstream
 from apps.utils import extract_configuration
 from apps.utils import format_field_for_data_transfer
 from apps.utils import create_datatransfer_schema_table
@@ -403,7 +404,18 @@ def submit_job(
 def update_log(batchid, interval):
     """Update log from the Spark cluster"""
     if batchid != "":
-        response = requests.get(f"http://vdmaster1:21111/batches/{batchid}/log")
+        try:
+            response = call_upstream(
+                "livy",
+                lambda timeout: requests.get(
+                    f"http://vdmaster1:21111/batches/{batchid}/log", timeout=timeout
+                ),
+                config=args,
+            )
+        except UpstreamError as e:
+            # Try again at the next interval
+            print(e)
+            return no_update
 
         if "log" in response.json():
             bad_words = ["Error", "Traceback"]
@@ -0,0 +1,88 @@
+/*
+ * Build Aladin Lite catalogs from the compact JSON of `apps/skymap.py`
+ *
+ * Each catalog holds the positions of its sources, and for each field
+ * of the popup either an array of values or a value shared by all
+ * sources. Sources are added to a catalog in one call.
+ */
+function finkMakeCatalogs(catalogs) {
+    const cats = [];
+    for (const catalog of catalogs) {
+        const cat = A.catalog(catalog.options);
+        const sources = new Array(catalog.ra.length);
+        for (let i = 0; i < catalog.ra.length; i++) {
+            const data = {};
+            for (const field of catalog.fields) {
+                const column = catalog.columns[field];
+                data[field] = column === undefined ? catalog.constants[field] : column[i];
+            }
+            sources[i] = A.source(catalog.ra[i], catalog.dec[i], data);
+        }
+        cat.addSources(sources);
+        cats.push(cat);
+    }
+    return cats;
+}
+
+function finkAddCatalogs(aladin, catalogs) {
+    for (const cat of finkMakeCatalogs(catalogs)) {
+        aladin.addCatalog(cat);
+    }
+}
+
+/*
+ * Density maps of large sets of sources
+ *
+ * The density is drawn as MOCs. Once the field of view is smaller than
+ * `view.fov` degrees, the centre and radius of the view are sent to the
+ * `skymap_view` store, and the server answers with `finkSetSources`.
+ */
+const finkDensity = {aladin: null, catalogs: [], timer: null, n: 0};
+
+function finkAddDensity(aladin, layers, view) {
+    finkDensity.aladin = aladin;
+    finkDensity.catalogs = [];
+    for (const layer of layers) {
+        aladin.addMOC(A.MOCFromJSON(layer.moc, {
+            name: layer.name,
+            color: layer.color,
+            opacity: layer.opacity,
+            lineWidth: 1,
+        }));
+    }
+
+    const onViewChanged = function () {
+        clearTimeout(finkDensity.timer);
+        finkDensity.timer = setTimeout(function () {
+            if (finkDensity.aladin !== aladin) {
+                return;
+            }
+            const fov = Math.max(...aladin.getFov());
+            finkDensity.n += 1;
+            if (fov > view.fov) {
+                finkSetSources([], {n: finkDensity.n});
+                return;
+            }
+            const [ra, dec] = aladin.getRaDec();
+            dash_clientside.set_props("skymap_view", {
+                data: {key: view.key, ra: ra, dec: dec, radius: fov / 2, n: finkDensity.n},
+            });
+        }, 300);
+    };
+    aladin.on("positionChanged", onViewChanged);
+    aladin.on("zoomChanged", onViewChanged);
+}
+
+function finkSetSources(catalogs, view) {
+    // Answers to previous views are ignored
+    if (finkDensity.aladin === null || view.n !== finkDensity.n) {
+        return;
+    }
+    for (const cat of finkDensity.catalogs) {
+        finkDensity.aladin.removeLayer(cat);
+    }
+    finkDensity.catalogs = finkMakeCatalogs(catalogs);
+    for (const cat of finkDensity.catalogs) {
+        finkDensity.aladin.addCatalog(cat);
+    }
+}
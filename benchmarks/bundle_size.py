@@ -0,0 +1,123 @@
+# Copyright 2026 AstroLab Software
+# Author: Julien Peloton
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Size of the alert frames of objects, before and after compaction
+
+Frames are the ones of an object bundle (valid alerts, upper limits and
+bad quality measurements), served by the local API from `archive/science`
+and decoded from JSON, as the portal does with `API_WIRE_FORMAT: json`.
+Objects of the archive have short histories: long-lived objects are
+mimicked by repeating the alerts of an object, with jittered measurements.
+
+Frames were cached in the Arrow IPC format as is (`arrow`) before
+compaction: the gain is the ratio of this size to the compact and
+compressed one. Before measuring, frames are checked to be decoded
+back unchanged.
+
+Usage (from the root of the repository):
+
+    python benchmarks/bundle_size.py [--nobjects 10] [--sizes 100 1000]
+"""
+
+import argparse
+import io
+
+import numpy as np
+import pandas as pd
+
+import local_api
+from apps.frames import decode_frame, encode_frame, frame_sizes
+
+TAGS = {"data": "valid", "upper": "upperlim", "uppervalid": "badquality"}
+
+
+def fetch_frames(client, oid):
+    """Alert frames of an object, from the local API"""
+    r = client.post(
+        "/api/v1/objects",
+        json={"objectId": oid, "withupperlim": True, "output-format": "json"},
+    )
+    pdf = pd.read_json(io.BytesIO(r.data))
+    return {frame: pdf[pdf["d:tag"] == tag] for frame, tag in TAGS.items()}
+
+
+def lengthen(frames, nalerts, seed=0):
+    """Repeat the alerts of an object, up to `nalerts` per frame"""
+    rng = np.random.default_rng(seed)
+    out = {}
+    for frame, pdf in frames.items():
+        if pdf.empty:
+            out[frame] = pdf
+            continue
+        pdf = pdf.sample(n=nalerts, replace=True, random_state=seed)
+        pdf = pdf.reset_index(drop=True)
+        floats = pdf.select_dtypes("floating").columns
+        pdf[floats] = pdf[floats] * rng.normal(1, 1e-4, size=(nalerts, len(floats)))
+        out[frame] = pdf
+    return out
+
+
+def measure(frames):
+    """Sizes of the frames of an object, summed over frames"""
+    total = {}
+    for pdf in frames.values():
+        pd.testing.assert_frame_equal(decode_frame(encode_frame(pdf)), pdf)
+        for name, size in frame_sizes(pdf).items():
+            total[name] = total.get(name, 0) + size
+    return total
+
+
+def run(nobjects, sizes):
+    client = local_api.server.test_client()
+    archive = local_api.get_archive()
+    counts = archive.alerts["i:objectId"].value_counts()
+
+    print(
+        "{:>14} {:>6} {:>10} {:>10} {:>10} {:>10} {:>7}".format(
+            "object",
+            "rows",
+            "pandas kB",
+            "arrow kB",
+            "compact kB",
+            "zstd kB",
+            "gain",
+        )
+    )
+    cases = [(oid, None) for oid in counts.index[:nobjects]]
+    cases += [(counts.index[0], n) for n in sizes]
+    for oid, nalerts in cases:
+        frames = fetch_frames(client, oid)
+        if nalerts is not None:
+            frames = lengthen(frames, nalerts)
+        sizes_ = measure(frames)
+        print(
+            "{:>14} {:>6} {:>10.1f} {:>10.1f} {:>10.1f} {:>10.1f} {:>6.1f}x".format(
+                oid if nalerts is None else "(synthetic)",
+                sum(len(pdf) for pdf in frames.values()),
+                sizes_["pandas"] / 1024,
+                sizes_["arrow"] / 1024,
+                sizes_["compact"] / 1024,
+                sizes_["compressed"] / 1024,
+                sizes_["arrow"] / sizes_["compressed"],
+            )
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--nobjects", type=int, default=10)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000])
+    args = parser.parse_args()
+
+    run(args.nobjects, args.sizes)
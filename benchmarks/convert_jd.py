@@ -0,0 +1,116 @@
+# Copyright 2026 AstroLab Software
+# Author: Julien Peloton
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Compare the conversions of Julian Dates into ISO dates, astropy vs NumPy
+
+Dates are drawn uniformly since the last leap second (the range of ZTF
+alerts), and the outputs of `apps.dates` are checked to be the same
+strings as the ones of astropy before timing. Scalars are converted one
+by one, as in the cards, with the LRU cache cleared (cold) or filled by
+a first pass (warm).
+
+Usage (from the root of the repository):
+
+    python benchmarks/convert_jd.py [--sizes 10 1000 100000] [--repeat 5]
+"""
+
+import argparse
+import time
+
+import numpy as np
+from astropy.time import Time
+
+from apps import dates
+
+
+def make_dates(npoints, seed=0):
+    """`npoints` Julian Dates since the last leap second"""
+    rng = np.random.default_rng(seed)
+    return dates.LAST_LEAP_SECOND_JD + rng.random(npoints) * 4000
+
+
+def check(jd):
+    """Check that both implementations give the same strings"""
+    expected = Time(jd, format="jd").iso
+    np.testing.assert_array_equal(dates.jd_to_iso(jd), expected)
+    mjd = jd - 2400000.5
+    np.testing.assert_array_equal(
+        dates.jd_to_iso(mjd, format="mjd"), Time(mjd, format="mjd").iso
+    )
+    assert [dates.convert_jd_fast(i) for i in jd[:100]] == list(expected[:100])
+
+
+def timeit(func, args, repeat, setup=None):
+    """Best time of `repeat` runs, in milliseconds"""
+    timings = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        t0 = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - t0)
+    return min(timings) * 1000
+
+
+def astropy_scalars(jds):
+    """Convert dates one by one with astropy"""
+    return [Time(i, format="jd").iso for i in jds]
+
+
+def fast_scalars(jds):
+    """Convert dates one by one with `apps.dates`"""
+    return [dates.convert_jd_fast(i) for i in jds]
+
+
+def run(sizes, repeat):
+    print(
+        "{:>8} {:>10} {:>12} {:>12} {:>9}".format(
+            "dates", "mode", "astropy (ms)", "numpy (ms)", "speed-up"
+        )
+    )
+    for npoints in sizes:
+        jd = make_dates(npoints)
+        check(jd)
+
+        astropy = timeit(lambda a: Time(a, format="jd").iso, [jd], repeat)
+        fast = timeit(dates.jd_to_iso, [jd], repeat)
+        rows = [("array", npoints, astropy, fast)]
+
+        # Scalars: astropy is too slow to convert 100k dates one by one
+        scalars = jd[:1000].tolist()
+        astropy = timeit(astropy_scalars, [scalars], max(1, repeat // 5))
+        cold = timeit(
+            fast_scalars, [scalars], repeat, setup=dates._scalar_jd_to_iso.cache_clear
+        )
+        warm = timeit(fast_scalars, [scalars], repeat)
+        rows += [
+            ("scalar", len(scalars), astropy, cold),
+            ("cached", len(scalars), astropy, warm),
+        ]
+
+        for mode, n, t_astropy, t_fast in rows:
+            print(
+                "{:>8} {:>10} {:>12.2f} {:>12.3f} {:>8.0f}x".format(
+                    n, mode, t_astropy, t_fast, t_astropy / t_fast
+                )
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    run(args.sizes, args.repeat)
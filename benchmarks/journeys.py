@@ -0,0 +1,595 @@
+# Copyright 2026 AstroLab Software
+# Author: Julien Peloton
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Replay user journeys through the Dash callbacks of the portal
+
+Each journey sends the same `/_dash-update-component` requests as the
+browser would, to the Flask server of the portal, in the same order:
+
+- search: `results`, `on_paginate` for each page, then
+  `on_load_lightcurve` and `on_load_cutouts` for all the cards of
+  the page at once;
+- object page: `display_page`, `store_query`, then the callbacks of
+  each tab of the object page.
+
+The API is served by `local_api.py` (in a separate process) from the
+alerts in `archive/`, and the API cache is disabled unless `--cache`
+is given. Latency percentiles, request/response sizes and the peak
+memory of each callback are printed and written to a JSON report.
+With `--baseline`, the run fails if a callback got slower than in a
+previous report.
+
+Usage (from the root of the repository):
+
+    python benchmarks/journeys.py [--repeat 5] [--output journeys.json]
+    python benchmarks/journeys.py --baseline journeys.json
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import re
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import yaml
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Scripted journeys: search bar queries, or object pages
+JOURNEYS = {
+    "class_search": {"query": "class=allclasses last=30"},
+    "conesearch": {"query": "217.7966 23.2192 r=3600"},
+    "objectid_search": {"query": "ZTF18aaqfhlj"},
+    "object_page": {"pathname": "/ZTF18aaqfhlj"},
+}
+
+# Stores filled by `store_query` for the object page
+OBJECT_STORES = [
+    "object-data",
+    "object-upper",
+    "object-uppervalid",
+    "object-sso",
+    "object-tracklet",
+]
+
+
+def _serve_api(archive, queue):
+    """Run the local API in a child process, and report its port"""
+    from werkzeug.serving import make_server
+
+    # Do not log every API request
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    os.environ["FINK_ARCHIVE"] = archive
+
+    import local_api
+
+    local_api.get_archive()
+    httpd = make_server("localhost", 0, local_api.server, threaded=True)
+    queue.put(httpd.server_port)
+    httpd.serve_forever()
+
+
+def start_local_api(archive):
+    """Start the local API, and return its process and URL"""
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_serve_api, args=(archive, queue), daemon=True)
+    proc.start()
+    port = queue.get(timeout=120)
+    return proc, f"http://localhost:{port}"
+
+
+def reset_peak_rss():
+    """Reset the peak RSS of the process (Linux only)"""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss():
+    """Peak RSS of the process, in MiB"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss is in kilobytes on Linux, and is never reset
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def current_rss():
+    """Current RSS of the process, in MiB"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return peak_rss()
+
+
+def stringify_id(id_):
+    """Component ID as in the `prop_id` of Dash (sorted, compact JSON)"""
+    if isinstance(id_, dict):
+        return json.dumps(id_, sort_keys=True, separators=(",", ":"))
+    return id_
+
+
+def is_wildcard(id_):
+    """Check whether a component ID of the callback map is a pattern"""
+    return id_.startswith("{") and '["' in id_
+
+
+def iter_components(tree):
+    """Yield the props of all components of a serialised layout"""
+    if isinstance(tree, dict):
+        if "props" in tree and isinstance(tree["props"], dict):
+            yield tree["props"]
+        for value in tree.values():
+            yield from iter_components(value)
+    elif isinstance(tree, list):
+        for value in tree:
+            yield from iter_components(value)
+
+
+def find_nodes(tree, kind):
+    """Serialised components of a given type, e.g. TabsTab"""
+    if isinstance(tree, dict):
+        if tree.get("type") == kind:
+            yield tree
+        for value in tree.values():
+            yield from find_nodes(value, kind)
+    elif isinstance(tree, list):
+        for value in tree:
+            yield from find_nodes(value, kind)
+
+
+def find_props(tree, id_):
+    """Props of the component with a given ID, or None"""
+    for props in iter_components(tree):
+        if props.get("id") == id_:
+            return props
+    return None
+
+
+def find_matching_ids(tree, pattern):
+    """IDs of a serialised layout matching a pattern with ALL wildcards"""
+    if tree is None:
+        return []
+    return [
+        id_
+        for id_ in find_ids(tree, pattern["type"])
+        if set(id_) == set(pattern)
+        and all(v == ["ALL"] or id_[k] == v for k, v in pattern.items())
+    ]
+
+
+def find_ids(tree, kind):
+    """Pattern-matching IDs of a given type"""
+    return [
+        props["id"]
+        for props in iter_components(tree)
+        if isinstance(props.get("id"), dict) and props["id"].get("type") == kind
+    ]
+
+
+class Recorder:
+    """Send callback requests to the portal, and record their cost"""
+
+    def __init__(self, app, exclude=None):
+        self.app = app
+        self.client = app.server.test_client()
+        self.exclude = re.compile(exclude) if exclude else None
+        self.records = {}
+        self.rss_resettable = reset_peak_rss()
+
+        # Callbacks by name, e.g. index:results
+        self.callbacks = {}
+        for key, spec in app.callback_map.items():
+            func = spec.get("callback")
+            if func is None:
+                # clientside callback
+                continue
+            name = getattr(func, "__name__", key)
+            module = getattr(func, "__module__", "").split(".")[-1]
+            self.callbacks.setdefault(f"{module}:{name}", (key, spec))
+
+    def call(self, label, values, changed, match=None, layout=None):
+        """Trigger a callback
+
+        Parameters
+        ----------
+        label: str
+            Name of the callback, e.g. `index:results`
+        values: dict
+            Values of the inputs and states, by `id.property`.
+            Missing ones are None.
+        changed: list of str
+            Inputs that triggered the callback, as `id.property`
+        match: dict, optional
+            Concrete ID replacing a MATCH pattern
+        layout: dict or list, optional
+            Serialised components where the IDs matching ALL
+            patterns are looked for
+
+        Returns
+        -------
+        out: dict or None
+            Outputs of the callback by ID and property, or None if
+            the callback did not update anything (or failed).
+        """
+        if self.exclude is not None and self.exclude.search(label):
+            return None
+
+        key, spec = self.callbacks[label]
+
+        def resolve(dep, with_value=True):
+            id_ = dep["id"]
+            if is_wildcard(id_):
+                if '["MATCH"]' in id_:
+                    id_ = match
+                else:
+                    # One entry per component matching the ALL pattern
+                    return [
+                        resolve({"id": i, "property": dep["property"]}, with_value)
+                        for i in find_matching_ids(layout, json.loads(id_))
+                    ]
+            out = {"id": id_, "property": dep["property"]}
+            if with_value:
+                name = f"{stringify_id(id_)}.{dep['property']}"
+                out["value"] = values.get(
+                    name, id_ if dep["property"] == "id" else None
+                )
+            return out
+
+        outputs = [
+            resolve(
+                {"id": id_, "property": prop},
+                with_value=False,
+            )
+            for id_, prop in (
+                part.rsplit(".", 1) for part in key.strip(".").split("...")
+            )
+        ]
+        body = {
+            "output": key,
+            "outputs": outputs if key.startswith("..") else outputs[0],
+            "inputs": [resolve(dep) for dep in spec["inputs"]],
+            "state": [resolve(dep) for dep in spec["state"]],
+            "changedPropIds": changed,
+        }
+        payload = json.dumps(body).encode()
+
+        rss0 = current_rss()
+        reset_peak_rss()
+        t0 = time.perf_counter()
+        response = self.client.post(
+            "/_dash-update-component", data=payload, content_type="application/json"
+        )
+        elapsed = time.perf_counter() - t0
+        peak = peak_rss() - rss0
+
+        record = self.records.setdefault(
+            label,
+            {"latency": [], "request": [], "response": [], "peak": [], "errors": 0},
+        )
+        record["latency"].append(elapsed)
+        record["request"].append(len(payload))
+        record["response"].append(len(response.data))
+        record["peak"].append(peak)
+
+        if response.status_code == 204:
+            # PreventUpdate
+            return None
+        if response.status_code != 200:
+            record["errors"] += 1
+            return None
+
+        return response.get_json().get("response")
+
+
+def search_journey(recorder, query):
+    """Search bar query, then every page of results and their previews"""
+    out = recorder.call(
+        "index:results",
+        {
+            "search_bar_input.n_submit": 1,
+            "url.search": "",
+            "search_bar_input.value": query,
+        },
+        ["search_bar_input.n_submit"],
+    )
+    if out is None:
+        return
+
+    store = find_props(out, "results_store")
+    if store is None:
+        # Table view, or no results
+        return
+
+    pagination = find_props(out, "results_pagination")
+    npages = pagination["total"] if pagination else 1
+    for page in range(1, npages + 1):
+        page_out = recorder.call(
+            "index:on_paginate",
+            {
+                "results_pagination.value": page,
+                "results_store.data": store["data"],
+            },
+            ["results_pagination.value"],
+        )
+        if page_out is None:
+            continue
+
+        # Previews of all the cards of the page are loaded at once
+        for kind, label in [
+            ("search_results_lightcurve", "index:on_load_lightcurve"),
+            ("search_results_cutouts", "index:on_load_cutouts"),
+        ]:
+            ids = find_ids(page_out, kind)
+            if ids:
+                recorder.call(
+                    label,
+                    {},
+                    [f"{stringify_id(id_)}.id" for id_ in ids],
+                    layout=page_out,
+                )
+
+
+def object_page_journey(recorder, pathname):
+    """Object page, its data stores, and the callbacks of each tab"""
+    values = {"url.pathname": pathname, "url.search": ""}
+    page = recorder.call("index:display_page", values, ["url.pathname", "url.search"])
+    stores = recorder.call("summary:store_query", values, ["url.pathname"])
+    if page is None or stores is None:
+        return
+
+    for store in OBJECT_STORES:
+        values[f"{store}.data"] = stores.get(store, {}).get("data")
+
+    summary_tabs = find_props(page, "summary_tabs") or {}
+    default_tab = summary_tabs.get("value")
+    tabs = [node["props"]["value"] for node in find_nodes(summary_tabs, "TabsTab")] or [
+        default_tab
+    ]
+    triggers = [f"{store}.data" for store in OBJECT_STORES]
+
+    for label, (_, spec) in sorted(recorder.callbacks.items()):
+        inputs = [f"{dep['id']}.{dep['property']}" for dep in spec["inputs"]]
+        if any(
+            is_wildcard(dep["id"]) and "MATCH" in dep["id"] for dep in spec["inputs"]
+        ):
+            continue
+
+        if "summary_tabs.value" in inputs:
+            # Switch to each tab
+            for tab in tabs:
+                recorder.call(
+                    label, {**values, "summary_tabs.value": tab}, ["summary_tabs.value"]
+                )
+        elif set(inputs) & set(triggers):
+            changed = [i for i in inputs if i in triggers]
+            recorder.call(label, {**values, "summary_tabs.value": default_tab}, changed)
+
+
+def summarize(records):
+    """Percentiles and sizes per callback"""
+    out = {}
+    for label, record in sorted(records.items()):
+        latency = np.array(record["latency"]) * 1000
+        out[label] = {
+            "calls": len(latency),
+            "errors": record["errors"],
+            "p50_ms": float(np.percentile(latency, 50)),
+            "p95_ms": float(np.percentile(latency, 95)),
+            "p99_ms": float(np.percentile(latency, 99)),
+            "mean_ms": float(np.mean(latency)),
+            "request_bytes": int(np.mean(record["request"])),
+            "response_bytes": int(np.mean(record["response"])),
+            "peak_rss_mib": float(np.max(record["peak"])),
+        }
+    return out
+
+
+def compare(report, baseline, tolerance, min_delta):
+    """Callbacks whose p95 latency regressed compared to a baseline report"""
+    regressions = []
+    for label, stats in report["callbacks"].items():
+        old = baseline["callbacks"].get(label)
+        if old is None:
+            continue
+        delta = stats["p95_ms"] - old["p95_ms"]
+        if delta > min_delta and stats["p95_ms"] > old["p95_ms"] * (1 + tolerance):
+            regressions.append((label, old["p95_ms"], stats["p95_ms"]))
+    return regressions
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    proc, apiurl = start_local_api(args.archive)
+
+    workdir = tempfile.mkdtemp(prefix="fink-journeys-")
+    with open(os.path.join(ROOT, "config.yml")) as f:
+        config = yaml.load(f, yaml.Loader)
+    config.update(
+        {
+            "APIURL": apiurl,
+            # The local API honours startdate
+            "API_OBJECTS_STARTDATE": True,
+            "API_CACHE": args.cache,
+            "CACHE_DIR": os.path.join(workdir, "cache"),
+        }
+    )
+    config_file = os.path.join(workdir, "config.yml")
+    with open(config_file, "w") as f:
+        yaml.dump(config, f)
+    os.environ["FINK_PORTAL_CONFIG"] = config_file
+
+    # The portal reads its configuration at import time
+    os.chdir(ROOT)
+    from index import app
+
+    recorder = Recorder(app, exclude=args.exclude)
+
+    journeys = {name: JOURNEYS[name] for name in args.journeys}
+    durations = {name: [] for name in journeys}
+    for iteration in range(args.warmup + args.repeat):
+        if iteration == args.warmup:
+            # Discard the warm-up runs (imports, cold caches)
+            recorder.records.clear()
+        for name, journey in journeys.items():
+            t0 = time.perf_counter()
+            if "query" in journey:
+                search_journey(recorder, journey["query"])
+            else:
+                object_page_journey(recorder, journey["pathname"])
+            if iteration >= args.warmup:
+                durations[name].append((time.perf_counter() - t0) * 1000)
+
+    proc.terminate()
+
+    report = {
+        "meta": {
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "repeat": args.repeat,
+            "warmup": args.warmup,
+            "cache": args.cache,
+            "peak_rss_reset": recorder.rss_resettable,
+        },
+        "journeys": {
+            name: {
+                "p50_ms": float(np.percentile(values, 50)),
+                "p95_ms": float(np.percentile(values, 95)),
+                "p99_ms": float(np.percentile(values, 99)),
+            }
+            for name, values in durations.items()
+        },
+        "callbacks": summarize(recorder.records),
+    }
+
+    return report
+
+
+def print_report(report):
+    print(
+        "{:<40} {:>6} {:>6} {:>9} {:>9} {:>9} {:>10} {:>10}".format(
+            "callback",
+            "calls",
+            "errors",
+            "p50 (ms)",
+            "p95 (ms)",
+            "p99 (ms)",
+            "resp (kB)",
+            "RSS (MiB)",
+        )
+    )
+    for label, stats in report["callbacks"].items():
+        print(
+            "{:<40} {:>6} {:>6} {:>9.1f} {:>9.1f} {:>9.1f} {:>10.1f} {:>10.1f}".format(
+                label,
+                stats["calls"],
+                stats["errors"],
+                stats["p50_ms"],
+                stats["p95_ms"],
+                stats["p99_ms"],
+                stats["response_bytes"] / 1024,
+                stats["peak_rss_mib"],
+            )
+        )
+    print()
+    for name, stats in report["journeys"].items():
+        print(
+            "{:<40} p50 {:.0f} ms, p95 {:.0f} ms, p99 {:.0f} ms".format(
+                name, stats["p50_ms"], stats["p95_ms"], stats["p99_ms"]
+            )
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--journeys", nargs="+", choices=list(JOURNEYS), default=list(JOURNEYS)
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--archive", default="archive/science")
+    parser.add_argument(
+        "--cache", action="store_true", help="Enable the API cache of the portal"
+    )
+    parser.add_argument(
+        "--exclude", help="Regex of callbacks to skip, e.g. 'gw:|xmatch:'"
+    )
+    parser.add_argument("--output", default="journeys.json", help="JSON report")
+    parser.add_argument("--baseline", help="Previous JSON report to compare with")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="Maximum relative increase of the p95 latency",
+    )
+    parser.add_argument(
+        "--min-delta",
+        type=float,
+        default=5.0,
+        help="Ignore p95 increases smaller than this, in milliseconds",
+    )
+    args = parser.parse_args()
+    args.archive = os.path.abspath(args.archive)
+    output = os.path.abspath(args.output)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    report = run(args)
+    print_report(report)
+
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nReport written to {output}")
+
+    if baseline is not None:
+        regressions = compare(report, baseline, args.tolerance, args.min_delta)
+        for label, old, new in regressions:
+            print(f"REGRESSION {label}: p95 {old:.1f} ms -> {new:.1f} ms")
+        if regressions:
+            sys.exit(1)
@@ -0,0 +1,138 @@
+# Copyright 2026 AstroLab Software
+# Author: Julien Peloton
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Compare the DC magnitude and flux conversions, per alert and vectorised
+
+Measurements are taken from the alerts in `archive/science`, completed
+with edge cases (negative subtractions, missing or negative reference
+magnitudes). Before timing, the outputs of `apps.photometry` are checked
+against the ones of `fink_utils`, element-wise: NaN must be at the same
+places, and values equal up to rounding (NumPy computes powers of arrays
+with SIMD instructions, that may differ from libm by one ulp).
+
+Usage (from the root of the repository):
+
+    python benchmarks/photometry.py [--sizes 100 1000 10000] [--repeat 5]
+"""
+
+import argparse
+import glob
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+from fink_utils.photometry import conversion
+
+from apps import photometry
+
+COLUMNS = ["magpsf", "sigmapsf", "magnr", "sigmagnr", "isdiffpos"]
+
+
+def make_measurements(nalerts):
+    """Build `nalerts` measurements from the archive
+
+    Parameters
+    ----------
+    nalerts: int
+        Number of measurements
+
+    Returns
+    -------
+    args: list
+        `magpsf`, `sigmapsf`, `magnr`, `sigmagnr` and `isdiffpos` arrays
+    """
+    fns = sorted(glob.glob("archive/science/**/*.parquet", recursive=True))
+    pdf = pd.concat(
+        [pd.read_parquet(fn, columns=["candidate"]) for fn in fns], ignore_index=True
+    )
+    pdf = pd.DataFrame(pdf["candidate"].tolist())[COLUMNS]
+
+    # Edge cases
+    edges = pd.DataFrame(
+        {
+            "magpsf": [18.0, 18.0, 18.0, 15.0, np.nan, 18.0],
+            "sigmapsf": [0.1, 0.1, 0.1, 0.1, 0.1, np.nan],
+            "magnr": [17.0, -999.0, np.nan, 17.0, 17.0, 17.0],
+            "sigmagnr": [0.02, 0.02, 0.02, 0.02, 0.02, 0.02],
+            "isdiffpos": ["0", "1", "t", "f", "t", "f"],
+        }
+    )
+
+    pdf = pdf.sample(n=nalerts, replace=True, random_state=0)
+    pdf = pd.concat([edges, pdf], ignore_index=True).iloc[:nalerts]
+
+    return [
+        *(pdf[c].astype(float).to_numpy() for c in COLUMNS[:-1]),
+        pdf["isdiffpos"].to_numpy(),
+    ]
+
+
+def per_alert(func, args):
+    """Call a `fink_utils` conversion once per alert, as the callbacks did"""
+    return np.transpose([func(*row) for row in zip(*args)])
+
+
+def check(args, rtol=1e-9):
+    """Check that both implementations give the same values"""
+    for name in ["apparent_flux", "dc_mag"]:
+        expected = per_alert(getattr(conversion, name), args)
+        actual = getattr(photometry, name)(*args)
+        for e, a in zip(expected, actual):
+            np.testing.assert_allclose(a, e, rtol=rtol, atol=0, err_msg=name)
+
+
+def timeit(func, args, repeat):
+    """Best time of `repeat` runs, in milliseconds"""
+    timings = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - t0)
+    return min(timings) * 1000
+
+
+def run(sizes, repeat):
+    print(
+        "{:>8} {:>14} {:>14} {:>14} {:>9}".format(
+            "alerts", "function", "per alert (ms)", "vector (ms)", "speed-up"
+        )
+    )
+    for nalerts in sizes:
+        args = make_measurements(nalerts)
+        check(args)
+        for name in ["apparent_flux", "dc_mag"]:
+            scalar = timeit(
+                lambda *a, name=name: per_alert(getattr(conversion, name), a),
+                args,
+                repeat,
+            )
+            vector = timeit(getattr(photometry, name), args, repeat)
+            print(
+                "{:>8} {:>14} {:>14.2f} {:>14.3f} {:>8.0f}x".format(
+                    nalerts, name, scalar, vector, scalar / vector
+                )
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    # Edge cases (e.g. log of negative fluxes) warn in fink_utils
+    warnings.simplefilter("ignore", RuntimeWarning)
+
+    run(args.sizes, args.repeat)
@@ -0,0 +1,156 @@
+# Copyright 2026 AstroLab Software
+# Author: Julien Peloton
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Catalogs of Aladin Lite sky maps: one JavaScript call per source vs compact JSON
+
+Sources are alerts drawn from the local archive, repeated up to the
+number of sources. The JavaScript sent to the browser is built as the
+search sky map did before (one `A.source` per alert, see `legacy_catalogs`)
+and with `apps.skymap`. Only the time spent in Python and the size of
+the payload are measured: building the sources in the browser is not.
+
+Usage (from the root of the repository):
+
+    python benchmarks/skymap.py [--sizes 1000 10000 100000] [--repeat 3]
+"""
+
+import argparse
+import time
+
+import local_api
+from apps.skymap import (
+    aladin_catalogs,
+    alert_catalog_options,
+    classification_color,
+    objectid_links,
+)
+from apps.utils import markdownify_objectid
+
+SITEURL = "https://fink-portal.org"
+
+FIELDS = {
+    "objectId": "v:link",
+    "mag": "v:mag",
+    "filter": "v:filter",
+    "time": "v:lastdate",
+    "Classification": "v:classification",
+}
+
+
+def make_sources(nsources, seed=0):
+    """Alerts of the local archive, as shown in search results"""
+    columns = [
+        "i:objectId",
+        "i:ra",
+        "i:dec",
+        "i:fid",
+        "i:magpsf",
+        "v:lastdate",
+        "v:classification",
+    ]
+    pdf = local_api.get_archive().alerts[columns]
+    pdf = pdf.sample(n=nsources, replace=True, random_state=seed)
+    pdf = pdf.reset_index(drop=True)
+    pdf["i:objectId"] = pdf["i:objectId"].apply(markdownify_objectid)
+    return pdf
+
+
+def legacy_catalogs(pdf):
+    """JavaScript of the sources, one `addSources` call per source"""
+    img = ""
+    cats = []
+    counts = pdf.groupby("v:classification").size().to_dict()
+    for ra, dec, fid, time_, oid, mag, class_ in zip(
+        pdf["i:ra"],
+        pdf["i:dec"],
+        pdf["i:fid"],
+        pdf["v:lastdate"],
+        pdf["i:objectId"],
+        pdf["i:magpsf"],
+        pdf["v:classification"],
+    ):
+        oid = oid.split("]")[0].split("[")[1]
+        title = f'<a target="_blank" href="{SITEURL}/{oid}">{oid}</a>'
+        cat = "cat_{}".format(class_.replace(" ", "_"))
+        if cat not in cats:
+            img += """var {} = A.catalog({{name: '{}', sourceSize: 15, shape: 'circle', color: '{}', onClick: 'showPopup', limit: 1000}});""".format(
+                cat, f"{class_} ({counts[class_]})", classification_color(class_)
+            )
+            cats.append(cat)
+        img += """{}.addSources([A.source({}, {}, {{objectId: '{}', mag: {:.2f}, filter: '{}', time: '{}', Classification: '{}'}})]);""".format(
+            cat, ra, dec, title, mag, {1: "g", 2: "r"}[fid], time_, class_
+        )
+    for cat in sorted(cats):
+        img += f"a.addCatalog({cat});"
+    return img
+
+
+def compact_catalogs(pdf):
+    """JavaScript of the sources, with `apps.skymap`"""
+    pdf = pdf.assign(
+        **{
+            "v:link": objectid_links(pdf["i:objectId"], SITEURL),
+            "v:mag": pdf["i:magpsf"].astype(float).round(2),
+            "v:filter": pdf["i:fid"].map({1: "g", 2: "r"}),
+        }
+    )
+    return aladin_catalogs(
+        "a", pdf, "v:classification", FIELDS, options=alert_catalog_options
+    )
+
+
+def timeit(func, args, repeat):
+    """Best time of `repeat` runs, in milliseconds, and the last output"""
+    timings = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = func(*args)
+        timings.append(time.perf_counter() - t0)
+    return min(timings) * 1000, out
+
+
+def run(sizes, repeat):
+    print(
+        "{:>8} {:>12} {:>12} {:>9} {:>12} {:>12}".format(
+            "sources",
+            "legacy (ms)",
+            "compact (ms)",
+            "speed-up",
+            "legacy kB",
+            "compact kB",
+        )
+    )
+    for nsources in sizes:
+        pdf = make_sources(nsources)
+        t_legacy, legacy = timeit(legacy_catalogs, [pdf], repeat)
+        t_compact, compact = timeit(compact_catalogs, [pdf], repeat)
+        print(
+            "{:>8} {:>12.1f} {:>12.1f} {:>8.1f}x {:>12.1f} {:>12.1f}".format(
+                nsources,
+                t_legacy,
+                t_compact,
+                t_legacy / t_compact,
+                len(legacy) / 1024,
+                len(compact) / 1024,
+            )
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    run(args.sizes, args.repeat)
@@ -0,0 +1,150 @@
+# Copyright 2026 AstroLab Software
+# Author: Julien Peloton
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Compare decoding API payloads from JSON and Parquet
+
+Payloads mimic `/api/v1/objects` responses: alert histories with
+~120 columns, built from the alerts in `archive/science`.
+For each size and format, decoding runs in a forked process so that
+the peak memory (max RSS increase) is not polluted by other cases.
+
+Usage (from the root of the repository):
+
+    python benchmarks/wire_format.py [--sizes 100 1000 10000] [--repeat 5]
+"""
+
+import argparse
+import glob
+import io
+import multiprocessing
+import resource
+import time
+
+import numpy as np
+import pandas as pd
+
+# Columns added by Fink, with their API prefix
+FINK_COLUMNS = {
+    "cdsxmatch": "d:cdsxmatch",
+    "rf_snia_vs_nonia": "d:rf_snia_vs_nonia",
+    "snn_snia_vs_nonia": "d:snn_snia_vs_nonia",
+    "snn_sn_vs_all": "d:snn_sn_vs_all",
+    "roid": "d:roid",
+    "nalerthist": "d:nalerthist",
+    "rf_kn_vs_nonkn": "d:rf_kn_vs_nonkn",
+    "mulens": "d:mulens",
+    "tracklet": "d:tracklet",
+}
+
+
+def make_payload(nalerts):
+    """Build an alert history with `nalerts` rows, API-like
+
+    Parameters
+    ----------
+    nalerts: int
+        Number of alerts in the history
+
+    Returns
+    -------
+    pdf: pd.DataFrame
+    """
+    fns = sorted(glob.glob("archive/science/**/*.parquet", recursive=True))
+    pdf = pd.concat([pd.read_parquet(fn) for fn in fns], ignore_index=True)
+
+    candidates = pd.DataFrame(pdf["candidate"].tolist()).add_prefix("i:")
+    fink = pdf[list(FINK_COLUMNS)].rename(columns=FINK_COLUMNS)
+    out = pd.concat([candidates, fink], axis=1)
+    out["i:objectId"] = pdf["objectId"]
+    out["d:tag"] = "valid"
+    out["v:classification"] = "Unknown"
+    out["v:lastdate"] = "2019-01-01 00:00:00.000"
+
+    # Repeat the alerts to reach the requested size, and jitter
+    # measurements so that repeated rows do not compress artificially well
+    out = out.sample(n=nalerts, replace=True, random_state=0).reset_index(drop=True)
+    rng = np.random.default_rng(0)
+    floats = out.select_dtypes("floating").columns
+    out[floats] = out[floats] * rng.normal(1, 1e-4, size=(nalerts, len(floats)))
+
+    return out
+
+
+def encode(pdf, wire_format):
+    """Encode a DataFrame as the API does"""
+    if wire_format == "json":
+        return pdf.to_json(orient="records").encode()
+
+    buf = io.BytesIO()
+    pdf.to_parquet(buf, index=False)
+    return buf.getvalue()
+
+
+def decode(payload, wire_format):
+    """Decode a payload as `apps.utils.request_api` does"""
+    if wire_format == "json":
+        return pd.read_json(io.BytesIO(payload))
+    return pd.read_parquet(io.BytesIO(payload))
+
+
+def _measure(payload, wire_format, repeat, queue):
+    """Decode in a child process, and report time and peak memory"""
+    rss0 = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    timings = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        decode(payload, wire_format)
+        timings.append(time.perf_counter() - t0)
+    rss1 = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # ru_maxrss is in kilobytes on Linux
+    queue.put((min(timings), (rss1 - rss0) / 1024))
+
+
+def run(sizes, repeat):
+    ctx = multiprocessing.get_context("fork")
+    print(
+        "{:>8} {:>8} {:>12} {:>12} {:>14}".format(
+            "alerts", "format", "size (MiB)", "decode (ms)", "peak RSS (MiB)"
+        )
+    )
+    for nalerts in sizes:
+        pdf = make_payload(nalerts)
+        for wire_format in ["json", "parquet"]:
+            payload = encode(pdf, wire_format)
+            queue = ctx.Queue()
+            proc = ctx.Process(
+                target=_measure, args=(payload, wire_format, repeat, queue)
+            )
+            proc.start()
+            elapsed, peak = queue.get()
+            proc.join()
+            print(
+                "{:>8} {:>8} {:>12.2f} {:>12.1f} {:>14.1f}".format(
+                    nalerts,
+                    wire_format,
+                    len(payload) / 1024**2,
+                    elapsed * 1000,
+                    peak,
+                )
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    run(args.sizes, args.repeat)
@@ -12,7 +12,6 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-import io
 
 import dash
 from dash import (
@@ -25,7 +24,6 @@ from dash import (
     no_update,
     clientside_callback,
     ALL,
-    MATCH,
 )
 from dash.exceptions import PreventUpdate
 
@@ -42,15 +40,41 @@ from app import app
 
 from apps import summary, about, statistics, query_cluster, gw, xmatch
 
-from apps.utils import markdownify_objectid, class_colors, simbad_types
+from apps.utils import markdownify_objectid, simbad_types
 from apps.utils import isoify_time
 from apps.utils import convert_jd
-from apps.utils import retrieve_oid_from_metaname
 from apps.utils import help_popover
 from apps.utils import request_api
 from apps.utils import extract_configuration
-from apps.plotting import draw_cutouts_quickview, draw_lightcurve_preview
+from apps.plotting import (
+    draw_cutouts_quickview,
+    draw_lightcurve_preview,
+    fetch_lightcurve_previews,
+)
 from apps.cards import card_search_result
+from apps.bundle import resolve_object_name
+from apps.prefetch import prefetch_bundles
+from apps.stamps import fetch_latest_stamps
+from apps.results import (
+    SKYMAP_COLUMNS,
+    get_results_info,
+    load_results_page,
+    load_skymap_columns,
+    results_view,
+    store_results,
+)
+from apps.skymap import (
+    DEFAULT_SKYMAP_MAX_SOURCES,
+    DEFAULT_SKYMAP_SOURCES_FOV,
+    aladin_catalogs,
+    aladin_density,
+    aladin_view_sources,
+    alert_catalog_options,
+    load_skymap_sources,
+    objectid_links,
+    sources_in_view,
+    store_skymap_sources,
+)
 from apps.parse import parse_query
 
 import pandas as pd
@@ -620,7 +644,7 @@ clientside_callback(
 # )
 
 
-def display_table_results(table, query):
+def display_table_results(table, query, qid):
     """Display explorer results in the form of a table with a dropdown menu on top to insert more data columns.
 
     The dropdown menu options are taken from the client schema (ZTF & Fink). It also
@@ -632,6 +656,8 @@ def display_table_results(table, query):
         Dash DataTable containing the results. Can be empty.
     query: dictionary
         Dictionary containing the parsed parameters from the search url.
+    qid: str
+        Query ID of the results kept on the server (see `apps.results`)
 
     Returns
     -------
@@ -770,6 +796,10 @@ def display_table_results(table, query):
             className="mb-2",
         ),
         table,
+        # Query ID of all the results, and of the results shown
+        # in the table (sorted, filtered, ...) for Aladin
+        dcc.Store(id="results_table_store", storage_type="memory", data=qid),
+        dcc.Store(id="results_store", storage_type="memory", data=qid),
     ]
 
     return [
@@ -781,16 +811,91 @@ def display_table_results(table, query):
     ]
 
 
+# Number of rows per page of the results table
+RESULTS_TABLE_PAGE_SIZE = 100
+
+# Fields of the popups of the alerts shown on sky maps
+SKYMAP_FIELDS = {
+    "objectId": "v:link",
+    "mag": "v:mag",
+    "filter": "v:filter",
+    "time": "v:lastdate",
+    "Classification": "v:classification",
+}
+
+
+def prepare_skymap_sources(pdf):
+    """Date and classification of the alerts shown on sky maps"""
+    if "v:lastdate" not in pdf.columns:
+        # conesearch does not expose v:lastdate
+        pdf["v:lastdate"] = convert_jd(pdf["i:jd"])
+
+    if "v:classification" not in pdf.columns:
+        if "d:classification" in pdf.columns:
+            pdf["v:classification"] = pdf["d:classification"]
+        else:
+            pdf["v:classification"] = "Unknown"
+
+    return pdf[[c for c in SKYMAP_COLUMNS if c in pdf.columns]]
+
+
+def skymap_fields(pdf):
+    """Values of the popups of the alerts shown on sky maps"""
+    return pdf.assign(
+        **{
+            "v:link": objectid_links(pdf["i:objectId"], config_args["SITEURL"]),
+            "v:mag": pdf["i:magpsf"].astype(float).round(2),
+            "v:filter": pdf["i:fid"].map({1: "g", 2: "r"}),
+        }
+    )
+
+
+def skymap_density(qid, nmax):
+    """JavaScript of the density map of search results
+
+    Positions are kept on the server, next to the results of the
+    search, the first time the sky map is opened.
+
+    Parameters
+    ----------
+    qid: str
+        Query ID of the results kept on the server
+    nmax: int
+        Maximum number of cells of the density map
+
+    Returns
+    -------
+    js: str or None
+        None if the results have left the cache.
+    """
+    fov = float(config_args.get("SKYMAP_SOURCES_FOV", DEFAULT_SKYMAP_SOURCES_FOV))
+
+    key = "{}:skymap".format(qid)
+    density = aladin_density("a", key, nmax, fov=fov, config=config_args)
+    if density is not None:
+        return density
+
+    pdf = load_skymap_columns(qid, config=config_args)
+    if pdf is None:
+        return None
+
+    key = store_skymap_sources(prepare_skymap_sources(pdf), qid=qid, config=config_args)
+    return aladin_density("a", key, nmax, fov=fov, config=config_args)
+
+
 @app.callback(
     Output("aladin-lite-div-skymap", "run"),
     [
-        Input("result_table", "data"),
-        Input("result_table", "columns"),
+        Input("results_store", "data"),
         Input("modal_skymap", "is_open"),
     ],
 )
-def display_skymap(data, columns, is_open):
-    """Display explorer result on a sky map (Aladin lite). Limited to 1000 sources total.
+def display_skymap(qid, is_open):
+    """Display explorer result on a sky map (Aladin lite).
+
+    Up to `SKYMAP_MAX_SOURCES` alerts are shown individually. Beyond,
+    the density of alerts is shown, and alerts are shown only once
+    zoomed in (see `display_skymap_sources`).
 
     TODO: image is not displayed correctly the first time
 
@@ -801,19 +906,31 @@ def display_skymap(data, columns, is_open):
 
     Callbacks
     ----------
-    Input: takes the validation flag (0: no results, 1: results) and table data
+    Input: takes the query ID of the results shown (cards or table)
     Output: Display a sky image around the alert position from aladin.
     """
     if not is_open:
         return no_update
 
-    if len(data) > 0:
-        if len(data) > 1000:
-            # Silently limit the size of list we display
-            data = data[:1000]
+    nmax = int(config_args.get("SKYMAP_MAX_SOURCES", DEFAULT_SKYMAP_MAX_SOURCES))
+    info = get_results_info(qid, config_args) if qid else None
+    if info is None:
+        return ""
+
+    density = None
+    nrows = nmax
+    if info["nrows"] > nmax:
+        density = skymap_density(qid, nmax)
+        if density is None:
+            return ""
+        # Only the first alert is needed, to center the view
+        nrows = 1
 
-        pdf = pd.DataFrame(data)
+    pdf = load_skymap_columns(qid, nrows=nrows, config=config_args)
+    if pdf is None:
+        pdf = pd.DataFrame()
 
+    if not pdf.empty:
         # Coordinate of the first alert
         ra0 = pdf["i:ra"].to_numpy()[0]
         dec0 = pdf["i:dec"].to_numpy()[0]
@@ -837,71 +954,76 @@ def display_skymap(data, columns, is_open):
         );
         """.format(ra0, dec0)
 
-        ras = pdf["i:ra"].to_numpy()
-        decs = pdf["i:dec"].to_numpy()
-        filts = pdf["i:fid"].to_numpy()
-        filts_dic = {1: "g", 2: "r"}
-
-        if "v:lastdate" not in pdf.columns:
-            # conesearch does not expose v:lastdate
-            pdf["v:lastdate"] = convert_jd(pdf["i:jd"])
-        times = pdf["v:lastdate"].to_numpy()
-        link = '<a target="_blank" href="{}/{}">{}</a>'
-        titles = [
-            link.format(
-                config_args["SITEURL"],
-                i.split("]")[0].split("[")[1],
-                i.split("]")[0].split("[")[1],
-            )
-            for i in pdf["i:objectId"].to_numpy()
-        ]
-        mags = pdf["i:magpsf"].to_numpy()
-
-        if "v:classification" not in pdf.columns:
-            if "d:classification" in pdf.columns:
-                pdf["v:classification"] = pdf["d:classification"]
-            else:
-                pdf["v:classification"] = "Unknown"
-        classes = pdf["v:classification"].to_numpy()
-        n_alert_per_class = (
-            pdf.groupby("v:classification").count().to_dict()["i:objectId"]
-        )
-        cats = []
-        for ra, dec, fid, time_, title, mag, class_ in zip(
-            ras, decs, filts, times, titles, mags, classes
-        ):
-            if class_ in simbad_types:
-                cat = "cat_{}".format(simbad_types.index(class_))
-                color = class_colors["Simbad"]
-            elif class_ in class_colors.keys():
-                cat = "cat_{}".format(class_.replace(" ", "_"))
-                color = class_colors[class_]
-            else:
-                # Sometimes SIMBAD mess up names :-)
-                cat = "cat_{}".format(class_)
-                color = class_colors["Simbad"]
-
-            if cat not in cats:
-                img += """var {} = A.catalog({{name: '{}', sourceSize: 15, shape: 'circle', color: '{}', onClick: 'showPopup', limit: 1000}});""".format(
-                    cat, class_ + " ({})".format(n_alert_per_class[class_]), color
-                )
-                cats.append(cat)
-            img += """{}.addSources([A.source({}, {}, {{objectId: '{}', mag: {:.2f}, filter: '{}', time: '{}', Classification: '{}'}})]);""".format(
-                cat, ra, dec, title, mag, filts_dic[fid], time_, class_
-            )
-
-        for cat in sorted(cats):
-            img += """a.addCatalog({});""".format(cat)
-
         # img cannot be executed directly because of formatting
         # We split line-by-line and remove comments
         img_to_show = [i for i in img.split("\n") if "// " not in i]
 
+        if density is not None:
+            img_to_show.append(density)
+        else:
+            # One catalog per class, built by the browser
+            img_to_show.append(
+                aladin_catalogs(
+                    "a",
+                    skymap_fields(prepare_skymap_sources(pdf)),
+                    by="v:classification",
+                    fields=SKYMAP_FIELDS,
+                    options=alert_catalog_options,
+                )
+            )
+
         return " ".join(img_to_show)
     else:
         return ""
 
 
+@app.callback(
+    Output("aladin-lite-div-skymap", "run", allow_duplicate=True),
+    Input("skymap_view", "data"),
+    State("results_store", "data"),
+    prevent_initial_call=True,
+)
+def display_skymap_sources(view, qid):
+    """Show the alerts of a zoomed-in view of the density map
+
+    The sources are read from the results of the page, whatever
+    the key sent by the browser.
+
+    Callbacks
+    ----------
+    Input: centre and radius of the view, sent by `finkAddDensity`
+    Output: the alerts of the view, at most `SKYMAP_MAX_SOURCES`
+    """
+    if not view or not qid:
+        raise PreventUpdate
+
+    key = "{}:skymap".format(qid)
+    if view.get("key") != key:
+        # View of another sky map
+        raise PreventUpdate
+
+    try:
+        ra, dec, radius = (float(view[k]) for k in ["ra", "dec", "radius"])
+        view = {"key": key, "n": int(view["n"])}
+    except (KeyError, TypeError, ValueError):
+        raise PreventUpdate
+
+    pdf = load_skymap_sources(key, config=config_args)
+    if pdf is None:
+        raise PreventUpdate
+
+    nmax = int(config_args.get("SKYMAP_MAX_SOURCES", DEFAULT_SKYMAP_MAX_SOURCES))
+    pdf = sources_in_view(pdf, ra, dec, radius, nmax)
+
+    return aladin_view_sources(
+        view,
+        skymap_fields(pdf),
+        by="v:classification",
+        fields=SKYMAP_FIELDS,
+        options=alert_catalog_options,
+    )
+
+
 def modal_skymap():
     import visdcc
 
@@ -929,6 +1051,8 @@ def modal_skymap():
                                     id="aladin-lite-div-skymap",
                                     style={"border": "0"},
                                 ),
+                                # View of the density map, set by the browser
+                                dcc.Store(id="skymap_view", storage_type="memory"),
                             ],
                             style={
                                 "width": "100%",
@@ -978,20 +1102,27 @@ clientside_callback(
 )
 
 
-def populate_result_table(data, columns):
-    """Define options of the results table, and add data and columns"""
-    page_size = 100
+def populate_result_table(data, columns, page_count):
+    """Define options of the results table, and add data and columns
+
+    Results are kept on the server: the table only holds the rows of the
+    current page, and sorting, filtering and paging are done by `update_table`.
+    """
     markdown_options = {"link_target": "_blank"}
 
     table = dash_table.DataTable(
         data=data,
         columns=columns,
         id="result_table",
-        page_size=page_size,
-        # page_action='none',
+        page_size=RESULTS_TABLE_PAGE_SIZE,
+        page_current=0,
+        page_count=page_count,
+        page_action="custom",
         style_as_list_view=True,
-        sort_action="native",
-        filter_action="native",
+        sort_action="custom",
+        sort_by=[],
+        filter_action="custom",
+        filter_query="",
         markdown_options=markdown_options,
         # fixed_columns={'headers': True, 'data': 1},
         style_data={
@@ -1022,26 +1153,64 @@ def populate_result_table(data, columns):
     return table
 
 
+def table_page(qid, page, columns):
+    """Rows of a page of results, restricted to the columns of the table
+
+    Returns
+    -------
+    data: list of dict or None
+        None if the results have left the cache.
+    """
+    pdf = load_results_page(qid, page + 1, config=config_args)
+    if pdf is None:
+        return None
+    pdf = pdf[[c["id"] for c in columns if c["id"] in pdf.columns]]
+    return pdf.to_dict("records")
+
+
 @app.callback(
     [
         Output("result_table", "data"),
         Output("result_table", "columns"),
+        Output("result_table", "page_count"),
+        Output("result_table", "page_current"),
+        Output("results_store", "data"),
     ],
     [
         Input("field-dropdown2", "value"),
         Input("alert-object-switch", "checked"),
         Input("alert-sso-switch", "checked"),
         Input("alert-tracklet-switch", "checked"),
+        Input("result_table", "page_current"),
+        Input("result_table", "sort_by"),
+        Input("result_table", "filter_query"),
     ],
     [
-        State("result_table", "data"),
         State("result_table", "columns"),
+        State("results_table_store", "data"),
     ],
+    prevent_initial_call=True,
 )
-def update_table(field_dropdown, groupby1, groupby2, groupby3, data, columns):
-    """Update table by adding new columns (no server call)"""
+def update_table(
+    field_dropdown,
+    groupby1,
+    groupby2,
+    groupby3,
+    page_current,
+    sort_by,
+    filter_query,
+    columns,
+    qid,
+):
+    """Update the page of the table, from the results kept on the server
+
+    Sorting, filtering and the switches listing each object, SSO or
+    tracklet only once are applied to all the results on the server
+    (see `apps.results.results_view`), and only the rows of the current
+    page are sent back.
+    """
     changed_id = [p["prop_id"] for p in dash.callback_context.triggered][0]
-    # Adding new columns (no client call)
+    # Adding new columns
     if "field-dropdown2" in changed_id:
         if field_dropdown is None or len(columns) == 0:
             raise PreventUpdate
@@ -1064,28 +1233,39 @@ def update_table(field_dropdown, groupby1, groupby2, groupby3, data, columns):
             }
         )
 
-        return data, columns
-    elif groupby1 is True:
-        pdf = pd.DataFrame.from_dict(data)
-        pdf = pdf.drop_duplicates(subset="i:objectId", keep="first")
-        data = pdf.to_dict("records")
-        return data, columns
+    # Only the latest alert of each object, SSO or tracklet
+    if groupby1 is True:
+        unique = "i:objectId"
     elif groupby2 is True:
-        pdf = pd.DataFrame.from_dict(data)
-        if not np.all(pdf["i:ssnamenr"] == "null"):
-            mask = ~pdf.duplicated(subset="i:ssnamenr") | (pdf["i:ssnamenr"] == "null")
-            pdf = pdf[mask]
-            data = pdf.to_dict("records")
-        return data, columns
+        unique = "i:ssnamenr"
     elif groupby3 is True:
-        pdf = pd.DataFrame.from_dict(data)
-        if not np.all(pdf["d:tracklet"] == ""):
-            mask = ~pdf.duplicated(subset="d:tracklet") | (pdf["d:tracklet"] == "")
-            pdf = pdf[mask]
-            data = pdf.to_dict("records")
-        return data, columns
+        unique = "d:tracklet"
     else:
-        raise PreventUpdate
+        unique = None
+
+    vid = results_view(
+        qid,
+        sort_by=sort_by,
+        filter_query=filter_query,
+        unique=unique,
+        config=config_args,
+    )
+    if vid is None:
+        # The results have expired
+        return [], columns, 1, 0, no_update
+
+    # Back to the first page when the rows change
+    if "page_current" not in changed_id and "field-dropdown2" not in changed_id:
+        page_current = 0
+    page_current = page_current or 0
+
+    data = table_page(vid, page_current, columns)
+    if data is None:
+        return [], columns, 1, 0, no_update
+
+    npages = get_results_info(vid, config_args)["npages"]
+
+    return data, columns, max(npages, 1), page_current, vid
 
 
 # Prepare and display the results
@@ -1106,10 +1286,13 @@ def update_table(field_dropdown, groupby1, groupby2, groupby3, data, columns):
     State("search_bar_input", "value"),
     State("search_history_store", "data"),
     State("results_table_switch", "checked"),
+    State("session_id", "data"),
     # prevent_initial_call=True
     prevent_initial_call="initial_duplicate",
 )
-def results(n_submit, n_clicks, s_n_clicks, searchurl, value, history, show_table):
+def results(
+    n_submit, n_clicks, s_n_clicks, searchurl, value, history, show_table, session
+):
     """Parse the search string and query the database"""
     ctx = dash.callback_context
     triggered_id = ctx.triggered[0]["prop_id"].split(".")[0]
@@ -1357,6 +1540,8 @@ def results(n_submit, n_clicks, s_n_clicks, searchurl, value, history, show_tabl
             history,
         )
     else:
+        objectids = pdf["i:objectId"].copy()
+
         # Make clickable objectId
         pdf["i:objectId"] = pdf["i:objectId"].apply(markdownify_objectid)
 
@@ -1367,8 +1552,15 @@ def results(n_submit, n_clicks, s_n_clicks, searchurl, value, history, show_tabl
         else:
             data = pdf.sort_values("i:jd", ascending=False)
 
+        # The first objects displayed are likely to be opened next
+        displayed = data if show_table else pdf
+        prefetch_bundles(objectids[displayed.index], config_args, session=session)
+
         if show_table:
-            data = data.to_dict("records")
+            # Results are kept on the server, and sent page by page
+            qid = store_results(
+                data, page_size=RESULTS_TABLE_PAGE_SIZE, config=config_args
+            )
 
             columns = [
                 {
@@ -1382,8 +1574,11 @@ def results(n_submit, n_clicks, s_n_clicks, searchurl, value, history, show_tabl
                 for c in colnames_to_display.keys()
             ]
 
-            table = populate_result_table(data, columns)
-            results_ = display_table_results(table, query)
+            npages = int(np.ceil(len(data.index) / RESULTS_TABLE_PAGE_SIZE))
+            table = populate_result_table(
+                table_page(qid, 0, columns) or [], columns, npages
+            )
+            results_ = display_table_results(table, query, qid)
         else:
             results_ = display_cards_results(pdf)
 
@@ -1427,23 +1622,15 @@ def results(n_submit, n_clicks, s_n_clicks, searchurl, value, history, show_tabl
 
 
 def display_cards_results(pdf, page_size=10):
+    # Results are kept on the server, and the browser only holds their ID
+    qid = store_results(pdf, page_size=page_size, config=config_args)
+
     results_ = [
-        # Data storage
+        # Data storage, also used by Aladin
         dcc.Store(
             id="results_store",
             storage_type="memory",
-            data=pdf.to_json(),
-        ),
-        dcc.Store(
-            id="results_page_size_store",
-            storage_type="memory",
-            data=str(page_size),
-        ),
-        # For Aladin
-        dcc.Store(
-            id="result_table",
-            storage_type="memory",
-            data=pdf.to_dict("records"),
+            data=qid,
         ),
         # Actual display of results
         html.Div(id="results_paginated"),
@@ -1475,20 +1662,21 @@ def display_cards_results(pdf, page_size=10):
     Output("results_paginated", "children"),
     Input("results_pagination", "value"),
     State("results_store", "data"),
-    State("results_page_size_store", "data"),
 )
-def on_paginate(page, data, page_size):
-    pdf = pd.read_json(io.StringIO(data))
-    page_size = int(page_size)
-
+def on_paginate(page, qid):
     if not page:
         page = 1
 
-    results = []
-
-    # Slice to selected page
-    pdf_ = pdf.iloc[(page - 1) * page_size : min(page * page_size, len(pdf.index))]
+    # Only the rows of the selected page are read
+    pdf_ = load_results_page(qid, page, config=config_args)
+    if pdf_ is None:
+        return dbc.Alert(
+            "These results have expired, please run the search again.",
+            color="warning",
+            className="shadow-sm",
+        )
 
+    results = []
     for i, row in pdf_.iterrows():
         results.append(card_search_result(row, i))
 
@@ -1511,50 +1699,63 @@ clientside_callback(
 
 @app.callback(
     Output(
-        {"type": "search_results_lightcurve", "objectId": MATCH, "index": MATCH},
+        {"type": "search_results_lightcurve", "objectId": ALL, "index": ALL},
         "children",
     ),
-    Input(
-        {"type": "search_results_lightcurve", "objectId": MATCH, "index": MATCH}, "id"
-    ),
+    Input({"type": "search_results_lightcurve", "objectId": ALL, "index": ALL}, "id"),
 )
-def on_load_lightcurve(lc_id):
-    if lc_id:
-        # print(lc_id['objectId'])
-        fig = draw_lightcurve_preview(lc_id["objectId"])
-        return dcc.Graph(
-            figure=fig,
-            config={"displayModeBar": False},
-            style={"width": "100%", "height": "15pc"},
-            responsive=True,
+def on_load_lightcurve(lc_ids):
+    """Lightcurve previews of all the cards of a page, from a single request"""
+    if not lc_ids:
+        raise PreventUpdate
+
+    names = list(dict.fromkeys(lc_id["objectId"] for lc_id in lc_ids))
+    pdfs = fetch_lightcurve_previews(names)
+
+    out = []
+    for lc_id in lc_ids:
+        pdf = pdfs[lc_id["objectId"]]
+        if pdf["i:magpsf"].isna().all():
+            # No measurement to show
+            out.append(no_update)
+            continue
+
+        fig = draw_lightcurve_preview(lc_id["objectId"], pdf)
+        out.append(
+            dcc.Graph(
+                figure=fig,
+                config={"displayModeBar": False},
+                style={"width": "100%", "height": "15pc"},
+                responsive=True,
+            )
         )
 
-    return no_update
+    return out
 
 
 @app.callback(
     Output(
-        {"type": "search_results_cutouts", "objectId": MATCH, "index": MATCH},
+        {"type": "search_results_cutouts", "objectId": ALL, "index": ALL},
         "children",
     ),
-    Input({"type": "search_results_cutouts", "objectId": MATCH, "index": MATCH}, "id"),
+    Input({"type": "search_results_cutouts", "objectId": ALL, "index": ALL}, "id"),
 )
-def on_load_cutouts(lc_id):
-    if lc_id:
-        return html.Div(
-            draw_cutouts_quickview(lc_id["objectId"]),
-            style={"width": "12pc", "height": "12pc"},
-        )
-        # figs = draw_cutouts_quickview(lc_id['objectId'], ['science', 'template', 'difference'])
-        # return dbc.Row(
-        #     [
-        #         dbc.Col(_, xs=4, className='p-0') for _ in figs
-        #     ],
-        #     justify='center',
-        #     className='p-0',
-        # )
+def on_load_cutouts(lc_ids):
+    """Cutouts of all the cards of a page, fetched in bulk"""
+    if lc_ids:
+        names = list(dict.fromkeys(lc_id["objectId"] for lc_id in lc_ids))
+        stamps = fetch_latest_stamps(names, ["science"])
+        return [
+            html.Div(
+                draw_cutouts_quickview(
+                    lc_id["objectId"], stamps=stamps[lc_id["objectId"]]
+                ),
+                style={"width": "12pc", "height": "12pc"},
+            )
+            for lc_id in lc_ids
+        ]
 
-    return no_update
+    raise PreventUpdate
 
 
 clientside_callback(
@@ -1927,10 +2128,25 @@ navbar = dmc.AppShellHeader(
     ],
 )
 
+clientside_callback(
+    """
+    function set_session_id(pathname, session_id) {
+        if (session_id)
+            return dash_clientside.no_update;
+        return Date.now().toString(36) + Math.random().toString(36).slice(2);
+    }
+    """,
+    Output("session_id", "data"),
+    Input("url", "pathname"),
+    State("session_id", "data"),
+)
+
 # embedding the navigation bar
 app.layout = dmc.MantineProvider(
     [
         dcc.Location(id="url", refresh=False),
+        # Random ID of the browser tab, e.g. to cancel its own prefetches
+        dcc.Store(id="session_id", storage_type="session"),
         dmc.AppShell(
             children=[
                 navbar,
@@ -2026,7 +2242,7 @@ def display_page(pathname, searchurl):
     else:
         if pathname[1:]:
             # check this is not a name generated by a user
-            oid = retrieve_oid_from_metaname(pathname[1:])
+            oid = resolve_object_name(pathname[1:])
             if oid is not None:
                 return summary.layout("/" + oid), "home_light"
         return layout, "home"
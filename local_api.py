@@ -0,0 +1,592 @@
+# Copyright 2026 AstroLab Software
+# Author: Julien Peloton
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Local stand-in for the Fink REST API, backed by the alerts in `archive/`
+
+Only the subset of endpoints used by the portal is implemented:
+/objects, /conesearch, /latests, /sso, /tracklet, /cutouts,
+/statistics, /schema, /metadata and /resolver (from the fixture table
+`archive/resolver.json`). Alerts are read once per process, without
+the cutouts, and indexed in memory. Cutouts are read on demand.
+
+Usage (from the root of the repository):
+
+    python local_api.py [--archive archive/science] [--port 24001]
+
+or, with several workers:
+
+    FINK_ARCHIVE=archive/science gunicorn local_api:server -b :24001
+
+and set `APIURL: http://localhost:24001` in config.yml.
+"""
+
+import argparse
+import glob
+import gzip
+import io
+import json
+import os
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from flask import Flask, Response, request
+
+DEFAULT_ARCHIVE = "archive/science"
+DEFAULT_PORT = 24001
+
+# Columns added by Fink, with their API prefix
+FINK_COLUMNS = {
+    "cdsxmatch": "d:cdsxmatch",
+    "rf_snia_vs_nonia": "d:rf_snia_vs_nonia",
+    "snn_snia_vs_nonia": "d:snn_snia_vs_nonia",
+    "snn_sn_vs_all": "d:snn_sn_vs_all",
+    "roid": "d:roid",
+    "nalerthist": "d:nalerthist",
+    "rf_kn_vs_nonkn": "d:rf_kn_vs_nonkn",
+    "mulens": "d:mulens",
+    "tracklet": "d:tracklet",
+}
+
+# Fink fields used by the portal, but not in the archive
+MISSING_COLUMNS = {
+    "d:blazar_stats_m0": -1.0,
+    "d:gcvs": "Unknown",
+    "d:vsx": "Unknown",
+    "d:DR3Name": "nan",
+    "d:anomaly_score": np.nan,
+}
+
+CUTOUT_KINDS = ["Science", "Template", "Difference"]
+
+# Values of `cdsxmatch` that are not a counterpart
+NO_XMATCH = ["Unknown", "Fail", "Fail 504", "Fail 500"]
+
+# Avro type names, as reported by /schema
+AVRO_TYPES = {
+    "float": "float",
+    "double": "double",
+    "int32": "int",
+    "int64": "long",
+    "string": "string",
+    "bool": "boolean",
+    "binary": "array",
+}
+
+server = Flask(__name__)
+
+_archive = None
+_archive_lock = threading.Lock()
+
+
+def jd_to_iso(jd):
+    """Convert Julian dates to ISO strings, as `astropy.time.Time(...).iso`"""
+    dates = pd.to_datetime(np.asarray(jd) - 2440587.5, unit="D", origin="unix")
+    return dates.strftime("%Y-%m-%d %H:%M:%S.%f").str[:-3].to_numpy()
+
+
+def iso_to_jd(date):
+    """Convert an ISO string (or a Julian date) to a Julian date"""
+    try:
+        return float(date)
+    except ValueError:
+        return pd.Timestamp(date).to_julian_date()
+
+
+def to_bool(value):
+    """Parse booleans sent either in JSON or in a query string"""
+    return str(value).lower() in ["true", "1"]
+
+
+def flatten_struct(table, column, prefix):
+    """Flatten a struct column of an arrow table into a prefixed DataFrame"""
+    array = table.column(column).combine_chunks()
+    return pd.DataFrame(
+        {
+            f"{prefix}{field.name}": array.field(i).to_pandas()
+            for i, field in enumerate(array.type)
+        }
+    )
+
+
+def classify(pdf):
+    """Simplified Fink classification of alerts
+
+    This follows the order of `fink_utils` (tracklets, Solar System,
+    microlensing, kilonovae, supernovae, then SIMBAD crossmatch) with
+    the modules available in the archive.
+
+    Parameters
+    ----------
+    pdf: pd.DataFrame
+        Alerts with `i:` and `d:` columns
+
+    Returns
+    -------
+    out: np.array of str
+    """
+    cdsxmatch = pdf["d:cdsxmatch"].fillna("Unknown").to_numpy()
+    no_xmatch = np.isin(cdsxmatch, NO_XMATCH)
+    early = pdf["i:ndethist"].to_numpy() <= 20
+    conditions = [
+        pdf["d:tracklet"].fillna("").to_numpy() != "",
+        pdf["d:roid"].to_numpy() == 3,
+        pdf["d:roid"].to_numpy() == 2,
+        pdf["d:mulens"].to_numpy() > 0.5,
+        (pdf["d:rf_kn_vs_nonkn"].to_numpy() > 0.5) & early & no_xmatch,
+        (pdf["d:rf_snia_vs_nonia"].to_numpy() > 0.5)
+        & (pdf["d:snn_snia_vs_nonia"].to_numpy() > 0.5)
+        & early
+        & no_xmatch,
+        (pdf["d:snn_sn_vs_all"].to_numpy() > 0.9) & early & no_xmatch,
+        ~no_xmatch,
+    ]
+    choices = [
+        "Tracklet",
+        "Solar System MPC",
+        "Solar System candidate",
+        "Microlensing candidate",
+        "Kilonova candidate",
+        "Early SN Ia candidate",
+        "SN candidate",
+        cdsxmatch,
+    ]
+    return np.select(conditions, choices, default="Unknown")
+
+
+class Archive:
+    """Alerts of the archive, indexed in memory
+
+    Parameters
+    ----------
+    path: str
+        Folder with the alert partitions, e.g. `archive/science`
+    """
+
+    def __init__(self, path=DEFAULT_ARCHIVE):
+        self.path = path
+        self.fns = sorted(glob.glob(os.path.join(path, "**/*.parquet"), recursive=True))
+        if not self.fns:
+            raise FileNotFoundError(f"No parquet files found in {path}")
+
+        self.schema = pq.read_schema(self.fns[0])
+
+        alerts, history = [], []
+        self.files = {}
+        for fn in self.fns:
+            # Cutouts are not loaded, see `cutout`
+            table = pq.read_table(
+                fn,
+                columns=["candid", "objectId", "candidate", "prv_candidates"]
+                + list(FINK_COLUMNS),
+            )
+            alerts.append(self._read_alerts(table, fn))
+            history.append(self._read_history(table))
+            self.files.update(dict.fromkeys(table.column("candid").to_pylist(), fn))
+
+        self.alerts = self._finalize(pd.concat(alerts, ignore_index=True))
+        self.alerts["v:classification"] = classify(self.alerts)
+
+        # Keep one measurement per epoch, valid alerts first
+        history = pd.concat(history, ignore_index=True)
+        history = history.drop_duplicates(["i:objectId", "i:jd", "i:fid"])
+        valid = pd.MultiIndex.from_frame(self.alerts[["i:objectId", "i:jd"]])
+        history = history[
+            ~pd.MultiIndex.from_frame(history[["i:objectId", "i:jd"]]).isin(valid)
+        ]
+        self.history = self._finalize(history)
+
+        # Indexes
+        self.by_object = self.alerts.groupby("i:objectId").indices
+        self.history_by_object = self.history.groupby("i:objectId").indices
+
+        # Last alert of each object, for positional queries
+        self.last = (
+            self.alerts.groupby("i:objectId", sort=False).head(1).reset_index(drop=True)
+        )
+        self._ra = np.radians(self.last["i:ra"].to_numpy())
+        self._dec = np.radians(self.last["i:dec"].to_numpy())
+
+        self.nights = self._read_nights()
+
+        # Fixture table of the name resolvers, next to the partitions
+        fixture = os.path.join(os.path.dirname(path.rstrip("/")), "resolver.json")
+        self.resolver = {}
+        if os.path.exists(fixture):
+            with open(fixture) as f:
+                self.resolver = json.load(f)
+
+    @staticmethod
+    def _read_alerts(table, fn):
+        """Flatten valid alerts as in the API (i: and d: columns)"""
+        pdf = flatten_struct(table, "candidate", "i:")
+        pdf["i:objectId"] = table.column("objectId").to_numpy()
+        for name, col in FINK_COLUMNS.items():
+            pdf[col] = table.column(name).to_pandas()
+        pdf["d:tag"] = "valid"
+        pdf["night"] = night_from_path(fn)
+        return pdf
+
+    @staticmethod
+    def _read_history(table):
+        """Flatten the previous candidates of the alerts"""
+        prv = table.column("prv_candidates").combine_chunks()
+        parents = pc.list_parent_indices(prv).to_numpy()
+        pdf = flatten_struct(pa.table({"prv": pc.list_flatten(prv)}), "prv", "i:")
+        pdf["i:objectId"] = table.column("objectId").to_numpy()[parents]
+        # Detections of the history that are not alerts of the archive
+        # cannot be told apart from bad quality ones
+        pdf["d:tag"] = np.where(pdf["i:magpsf"].isna(), "upperlim", "badquality")
+        return pdf
+
+    @staticmethod
+    def _finalize(pdf):
+        """Add the columns computed by the API, and sort by date"""
+        pdf = pdf.copy()
+        if "d:tracklet" in pdf.columns:
+            pdf["d:tracklet"] = pdf["d:tracklet"].fillna("")
+            for col, value in MISSING_COLUMNS.items():
+                pdf[col] = value
+            pdf["v:lastdate"] = jd_to_iso(pdf["i:jd"])
+            pdf["v:firstdate"] = jd_to_iso(pdf["i:jdstarthist"])
+            pdf["v:lapse"] = pdf["i:jdendhist"] - pdf["i:jdstarthist"]
+        return pdf.sort_values("i:jd", ascending=False, ignore_index=True)
+
+    def _read_nights(self):
+        """Per-night statistics, as in the `statistics_class` table"""
+        raw = os.path.join(os.path.dirname(self.path.rstrip("/")), "raw")
+        received = {}
+        for fn in glob.glob(os.path.join(raw, "**/*.parquet"), recursive=True):
+            # Number of rows from the footer, without reading the data
+            night = night_from_path(fn)
+            received[night] = (
+                received.get(night, 0) + pq.ParquetFile(fn).metadata.num_rows
+            )
+
+        rows = []
+        for night, pdf in self.alerts.groupby("night"):
+            row = {
+                "key:key": f"ztf_{night}",
+                "basic:raw": received.get(night, len(pdf)),
+                "basic:sci": len(pdf),
+                "basic:n_g": int(np.sum(pdf["i:fid"] == 1)),
+                "basic:n_r": int(np.sum(pdf["i:fid"] == 2)),
+                "basic:exposures": pdf["i:jd"].nunique(),
+                "basic:fields": pdf["i:field"].nunique(),
+                "class:simbad_tot": int(np.sum(~pdf["d:cdsxmatch"].isin(NO_XMATCH))),
+            }
+            counts = pdf["v:classification"].value_counts()
+            row.update({f"class:{k}": int(v) for k, v in counts.items()})
+            rows.append(row)
+
+        return pd.DataFrame(rows)
+
+    def objects(self, oids, withupperlim=False, startdate=None):
+        """Alerts of objects, most recent first"""
+        frames = [self.alerts.iloc[self.by_object.get(oid, [])] for oid in oids]
+        if withupperlim:
+            frames += [
+                self.history.iloc[self.history_by_object.get(oid, [])] for oid in oids
+            ]
+        pdf = pd.concat(frames)
+        if startdate is not None:
+            pdf = pdf[pdf["i:jd"] >= startdate]
+        return pdf.sort_values("i:jd", ascending=False)
+
+    def conesearch(self, ra, dec, radius, startdate=None, stopdate=None):
+        """Last alert of objects within `radius` degrees"""
+        ra0, dec0 = np.radians(ra), np.radians(dec)
+        # Haversine formula, accurate at small separations
+        hav = (
+            np.sin((self._dec - dec0) / 2) ** 2
+            + np.cos(self._dec) * np.cos(dec0) * np.sin((self._ra - ra0) / 2) ** 2
+        )
+        separation = np.degrees(2 * np.arcsin(np.sqrt(np.clip(hav, 0, 1))))
+
+        mask = separation <= radius
+        jd = self.last["i:jd"].to_numpy()
+        if startdate is not None:
+            mask &= jd >= startdate
+        if stopdate is not None:
+            mask &= jd <= stopdate
+
+        pdf = self.last[mask].copy()
+        pdf["v:separation_degree"] = separation[mask]
+        pdf["d:classification"] = pdf["v:classification"]
+        return pdf.sort_values("v:separation_degree")
+
+    def latests(self, alert_class, n, startdate=None, stopdate=None):
+        """Last `n` alerts of a class"""
+        pdf = self.alerts
+        if alert_class.startswith("(SIMBAD) "):
+            pdf = pdf[pdf["d:cdsxmatch"] == alert_class[len("(SIMBAD) ") :]]
+        elif alert_class != "allclasses":
+            pdf = pdf[pdf["v:classification"] == alert_class]
+
+        if startdate is not None:
+            pdf = pdf[pdf["i:jd"] >= startdate]
+        if stopdate is not None:
+            pdf = pdf[pdf["i:jd"] <= stopdate]
+
+        return pdf.head(n)
+
+    def cutout(self, oid, kind, candid=None):
+        """FITS cutout of an alert (last alert of the object by default)"""
+        if candid is None:
+            index = self.by_object.get(oid)
+            if index is None:
+                return None
+            candid = self.alerts["i:candid"].to_numpy()[index[0]]
+
+        # The API receives candids as strings
+        candid = int(candid)
+        fn = self.files.get(candid)
+        if fn is None:
+            return None
+
+        # Read a single cutout column, for a single alert
+        column = f"cutout{kind}"
+        table = pq.read_table(fn, columns=[column], filters=[("candid", "=", candid)])
+        stamp = table.column(column).combine_chunks().field("stampData")[0].as_py()
+        return gzip.decompress(stamp)
+
+
+def night_from_path(fn):
+    """Night (YYYYMMDD) of a partition, e.g. `.../year=2021/month=11/day=03/...`"""
+    m = re.search(r"year=(\d{4})/month=(\d{2})/day=(\d{2})", fn)
+    return "".join(m.groups()) if m else "00000000"
+
+
+def get_archive():
+    """Return the archive of the current process, loading it if needed"""
+    global _archive
+
+    with _archive_lock:
+        if _archive is None:
+            _archive = Archive(os.environ.get("FINK_ARCHIVE", DEFAULT_ARCHIVE))
+
+    return _archive
+
+
+def get_payload():
+    """Arguments of the request, from the JSON body or the query string"""
+    payload = request.get_json(silent=True)
+    if payload is None:
+        payload = request.args.to_dict()
+    return payload
+
+
+def format_output(pdf, payload):
+    """Serialise a DataFrame in the requested `output-format`"""
+    columns = payload.get("columns", "*")
+    if columns not in ["*", ""]:
+        names = [i for i in columns.split(",") if i in pdf.columns]
+        pdf = pdf[names]
+
+    # internal column, not served by the API
+    pdf = pdf.drop(columns=["night"], errors="ignore").reset_index(drop=True)
+
+    output_format = payload.get("output-format", "json")
+    if output_format == "json":
+        return Response(pdf.to_json(orient="records"), mimetype="application/json")
+    elif output_format == "csv":
+        return Response(pdf.to_csv(index=False), mimetype="text/csv")
+    elif output_format == "parquet":
+        buf = io.BytesIO()
+        pdf.to_parquet(buf, index=False)
+        return Response(buf.getvalue(), mimetype="application/octet-stream")
+
+    return Response(f"Output format {output_format} is not supported", status=400)
+
+
+def date_range(payload):
+    """Start and stop Julian dates from `startdate`, `stopdate` and `window`"""
+    startdate = payload.get("startdate") or payload.get("start_date")
+    stopdate = payload.get("stopdate") or payload.get("stop_date")
+
+    startdate = iso_to_jd(startdate) if startdate else None
+    stopdate = iso_to_jd(stopdate) if stopdate else None
+    if startdate is not None and payload.get("window"):
+        stopdate = startdate + float(payload["window"])
+
+    return startdate, stopdate
+
+
+@server.route("/api/v1/objects", methods=["GET", "POST"])
+def objects():
+    payload = get_payload()
+    oids = [i.strip() for i in str(payload.get("objectId", "")).split(",")]
+    startdate, _ = date_range(payload)
+    pdf = get_archive().objects(
+        oids,
+        withupperlim=to_bool(payload.get("withupperlim", False)),
+        startdate=startdate,
+    )
+    return format_output(pdf, payload)
+
+
+@server.route("/api/v1/conesearch", methods=["GET", "POST"])
+def conesearch():
+    payload = get_payload()
+    startdate, stopdate = date_range(payload)
+    pdf = get_archive().conesearch(
+        float(payload["ra"]),
+        float(payload["dec"]),
+        float(payload["radius"]) / 3600,
+        startdate,
+        stopdate,
+    )
+    return format_output(pdf, payload)
+
+
+@server.route("/api/v1/latests", methods=["GET", "POST"])
+def latests():
+    payload = get_payload()
+    startdate, stopdate = date_range(payload)
+    pdf = get_archive().latests(
+        payload.get("class", "allclasses"),
+        int(payload.get("n", 10)),
+        startdate,
+        stopdate,
+    )
+    return format_output(pdf, payload)
+
+
+@server.route("/api/v1/sso", methods=["GET", "POST"])
+def sso():
+    payload = get_payload()
+    names = [i.strip() for i in str(payload.get("n_or_d", "")).split(",")]
+    alerts = get_archive().alerts
+    pdf = alerts[alerts["i:ssnamenr"].isin(names)]
+    return format_output(pdf, payload)
+
+
+@server.route("/api/v1/tracklet", methods=["GET", "POST"])
+def tracklet():
+    payload = get_payload()
+    alerts = get_archive().alerts
+    tracklet_id = payload.get("id", "")
+    pdf = alerts[
+        (alerts["d:tracklet"] != "") & alerts["d:tracklet"].str.startswith(tracklet_id)
+    ]
+    return format_output(pdf, payload)
+
+
+@server.route("/api/v1/cutouts", methods=["GET", "POST"])
+def cutouts():
+    payload = get_payload()
+    kind = payload.get("kind", "Science")
+    if kind not in CUTOUT_KINDS or payload.get("output-format", "FITS") != "FITS":
+        return Response("Only FITS cutouts of a single kind are supported", status=400)
+
+    data = get_archive().cutout(payload["objectId"], kind, payload.get("candid"))
+    if data is None:
+        return Response("Alert not found", status=404)
+
+    return Response(data, mimetype="application/octet-stream")
+
+
+@server.route("/api/v1/statistics", methods=["GET", "POST"])
+def statistics():
+    payload = get_payload()
+    pdf = get_archive().nights
+    pdf = pdf[pdf["key:key"].str.startswith("ztf_" + str(payload.get("date", "")))]
+
+    if to_bool(payload.get("schema", False)):
+        pdf = pd.DataFrame({"schema": pdf.columns})
+    elif payload.get("columns", "*") not in ["*", ""]:
+        payload = {**payload, "columns": "key:key," + payload["columns"]}
+
+    return format_output(pdf, payload)
+
+
+@server.route("/api/v1/schema", methods=["GET", "POST"])
+def schema():
+    arrow_schema = get_archive().schema
+
+    def describe(field):
+        return {"type": AVRO_TYPES.get(str(field.type), str(field.type)), "doc": ""}
+
+    candidate = arrow_schema.field("candidate").type
+    out = {
+        "ZTF original fields (i:)": {
+            "objectId": {"type": "string", "doc": "Unique identifier for an object"},
+            **{field.name: describe(field) for field in candidate},
+        },
+        "ZTF original cutouts (b:)": {
+            f"cutout{kind}_stampData": {"type": "array", "doc": ""}
+            for kind in CUTOUT_KINDS
+        },
+        "Fink science module outputs (d:)": {
+            **{name: describe(arrow_schema.field(name)) for name in FINK_COLUMNS},
+            **{
+                col[2:]: {"type": "double" if isinstance(v, float) else "string"}
+                for col, v in MISSING_COLUMNS.items()
+            },
+            "tag": {"type": "string", "doc": "valid, badquality or upperlim"},
+        },
+        "Fink additional values (v:)": {
+            "classification": {"type": "string", "doc": "Fink classification"},
+            "lastdate": {"type": "string", "doc": "Date of the alert (ISO)"},
+            "firstdate": {"type": "string", "doc": "Date of the first detection"},
+            "lapse": {"type": "double", "doc": "Days since the first detection"},
+        },
+    }
+    return Response(json.dumps(out), mimetype="application/json")
+
+
+@server.route("/api/v1/metadata", methods=["GET", "POST"])
+def metadata():
+    # No user-defined metadata offline
+    return Response("[]", mimetype="application/json")
+
+
+@server.route("/api/v1/resolver", methods=["GET", "POST"])
+def resolver():
+    payload = get_payload()
+    table = get_archive().resolver.get(payload.get("resolver"), [])
+
+    name = str(payload.get("name", "")).lower().replace(" ", "")
+    if not name:
+        return Response("[]", mimetype="application/json")
+    if to_bool(payload.get("reverse", False)):
+        keys = ["i:objectId"]
+    else:
+        keys = ["d:fullname", "d:internalname", "oname", "i:name", "i:ssnamenr"]
+
+    out = [
+        row
+        for row in table
+        if any(
+            str(row[k]).lower().replace(" ", "").startswith(name)
+            for k in keys
+            if k in row
+        )
+    ]
+    return Response(json.dumps(out), mimetype="application/json")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--archive", default=DEFAULT_ARCHIVE)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+
+    os.environ["FINK_ARCHIVE"] = args.archive
+    get_archive()
+    server.run("localhost", args.port, threaded=True)
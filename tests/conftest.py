@@ -0,0 +1,37 @@
+# Copyright 2026 AstroLab Software
+# Author: Julien Peloton
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Fixtures shared by the unit tests
+
+Run from the root of the repository with:
+
+    python -m pytest tests
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from apps import cache as cache_module  # noqa: E402
+
+
+@pytest.fixture
+def config(tmp_path, monkeypatch):
+    """User configuration with caches in a temporary directory"""
+    # Caches are opened once per process: start from a clean slate
+    monkeypatch.setattr(cache_module, "_caches", {})
+    return {"CACHE_DIR": str(tmp_path)}
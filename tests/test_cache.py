@@ -0,0 +1,133 @@
+# Copyright 2026 AstroLab Software
+# Author: Julien Peloton
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Coalescing of concurrent computations (apps/cache.py, apps/client.py)"""
+
+import threading
+import time
+
+import pytest
+
+from apps import client
+from apps.cache import get_cache, get_or_compute
+from apps.client import single_flight
+
+
+class Boom(Exception):
+    pass
+
+
+def test_single_flight_shares_exception():
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def func():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        raise Boom("upstream failed")
+
+    errors = []
+
+    def call():
+        try:
+            single_flight("key", func)
+        except Boom as e:
+            errors.append(e)
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    started.wait(5)
+
+    waiters = [threading.Thread(target=call) for _ in range(4)]
+    for thread in waiters:
+        thread.start()
+    # let the waiters block on the result of the leader
+    time.sleep(0.2)
+    release.set()
+    for thread in [leader, *waiters]:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert len(errors) == 5
+    assert all(e is errors[0] for e in errors)
+
+    # Failures are not remembered
+    assert "key" not in client._inflight
+    assert single_flight("key", lambda: 42) == 42
+
+
+def test_get_or_compute(config):
+    cache = get_cache("test", config)
+    calls = []
+
+    def func():
+        calls.append(1)
+        return "value"
+
+    assert get_or_compute(cache, "key", func) == "value"
+    assert get_or_compute(cache, "key", func) == "value"
+    assert len(calls) == 1
+    assert "lock:key" not in cache
+
+
+def test_get_or_compute_waits_for_lock_owner(config):
+    cache = get_cache("test", config)
+    # Another process is computing the value
+    cache.add("lock:key", 0, expire=5)
+    threading.Timer(0.2, cache.set, args=("key", "other")).start()
+
+    value = get_or_compute(cache, "key", lambda: "mine", lock_timeout=5)
+    assert value == "other"
+
+
+def test_get_or_compute_stale_lock(config):
+    cache = get_cache("test", config)
+    # The process holding the lock died
+    cache.add("lock:key", 0, expire=60)
+
+    start = time.monotonic()
+    value = get_or_compute(cache, "key", lambda: "value", lock_timeout=0.3)
+    elapsed = time.monotonic() - start
+
+    assert value == "value"
+    assert 0.3 <= elapsed < 5
+    assert cache.get("key") == "value"
+
+
+def test_get_or_compute_failure_releases_lock(config):
+    cache = get_cache("test", config)
+
+    def fail():
+        raise Boom("upstream failed")
+
+    with pytest.raises(Boom):
+        get_or_compute(cache, "key", fail, lock_timeout=60)
+    assert "lock:key" not in cache
+    assert "key" not in cache
+
+    # The next caller does not wait for the lock to expire
+    start = time.monotonic()
+    assert get_or_compute(cache, "key", lambda: "value", lock_timeout=60) == "value"
+    assert time.monotonic() - start < 5
+
+
+def test_get_or_compute_should_cache(config):
+    cache = get_cache("test", config)
+
+    value = get_or_compute(cache, "key", lambda: [], should_cache=bool)
+    assert value == []
+    assert "key" not in cache
+    assert "lock:key" not in cache
@@ -0,0 +1,277 @@
+# Copyright 2026 AstroLab Software
+# Author: Julien Peloton
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Search results kept on the server (apps/results.py)"""
+
+import pandas as pd
+import pytest
+
+from apps.results import (
+    filter_results,
+    get_results_cache,
+    get_results_info,
+    load_results,
+    load_results_page,
+    load_skymap_columns,
+    results_view,
+    split_filter_part,
+    store_results,
+    unique_results,
+)
+
+
+def make_results(nrows=25):
+    """Results of a search, most recent first"""
+    return pd.DataFrame(
+        {
+            "i:objectId": [f"ZTF{i:02d}" for i in range(nrows)],
+            "i:ra": [10.0 + i for i in range(nrows)],
+            "i:dec": [-5.0 + i for i in range(nrows)],
+            "i:jd": [2460000.5 - i for i in range(nrows)],
+            "d:rf_snia_vs_nonia": [0.1 * (i % 10) for i in range(nrows)],
+        }
+    )
+
+
+def test_pages(config):
+    pdf = make_results(25)
+    qid = store_results(pdf, page_size=10, config=config)
+
+    assert get_results_info(qid, config) == {
+        "nrows": 25,
+        "page_size": 10,
+        "npages": 3,
+    }
+
+    # Pages hold consecutive rows, with their index in the results
+    pages = [load_results_page(qid, page, config=config) for page in [1, 2, 3]]
+    assert [len(page) for page in pages] == [10, 10, 5]
+    assert list(pages[1].index) == list(range(10, 20))
+    pd.testing.assert_frame_equal(pd.concat(pages), pdf)
+
+
+def test_out_of_range_pages(config):
+    qid = store_results(make_results(25), page_size=10, config=config)
+
+    for page in [0, 4, -1]:
+        out = load_results_page(qid, page, config=config)
+        assert out is not None
+        assert out.empty
+
+
+def test_load_results(config):
+    pdf = make_results(25)
+    qid = store_results(pdf, page_size=10, config=config)
+
+    pd.testing.assert_frame_equal(load_results(qid, config=config), pdf)
+    pd.testing.assert_frame_equal(load_results(qid, nrows=12, config=config), pdf[:12])
+
+    out = load_results(qid, columns=["i:ra"], config=config)
+    assert list(out.columns) == ["i:ra"]
+
+
+def test_empty_results(config):
+    qid = store_results(make_results(0), page_size=10, config=config)
+
+    assert get_results_info(qid, config)["npages"] == 0
+    assert load_results_page(qid, 1, config=config).empty
+    assert load_results(qid, config=config).empty
+
+
+def test_skymap_columns(config):
+    pdf = make_results(25)
+    qid = store_results(pdf, page_size=10, config=config)
+
+    out = load_skymap_columns(qid, config=config)
+    pd.testing.assert_frame_equal(out, pdf[["i:objectId", "i:ra", "i:dec", "i:jd"]])
+    assert len(load_skymap_columns(qid, nrows=5, config=config)) == 5
+
+
+def test_evicted_results(config):
+    qid = store_results(make_results(25), page_size=10, config=config)
+    get_results_cache(config).clear()
+
+    assert get_results_info(qid, config) is None
+    assert load_results_page(qid, 1, config=config) is None
+    assert load_results(qid, config=config) is None
+    assert load_skymap_columns(qid, config=config) is None
+
+
+def test_evicted_page(config):
+    # A page evicted before the description of the results
+    qid = store_results(make_results(25), page_size=10, config=config)
+    get_results_cache(config).delete(f"{qid}:2")
+
+    assert load_results_page(qid, 1, config=config) is not None
+    assert load_results_page(qid, 2, config=config) is None
+    assert load_results(qid, config=config) is None
+
+
+def make_alerts():
+    """Alerts of a table view, with SSO and tracklet names"""
+    return pd.DataFrame(
+        {
+            "i:objectId": ["ZTF1", "ZTF1", "ZTF2", "ZTF3", "ZTF4", "ZTF5"],
+            "i:ssnamenr": ["null", "null", "8467", "8467", "null", "1922"],
+            "d:tracklet": ["", "", "TRCK_1", "TRCK_1", "", "TRCK_2"],
+            "i:magpsf": [18.5, 19.0, 17.2, 20.1, 18.5, 16.0],
+            "i:ndethist": ["3", "10", "7", "1", "12", "5"],
+            "v:classification": [
+                "SN candidate",
+                "SN candidate",
+                "Solar System MPC",
+                "Solar System MPC",
+                "Unknown",
+                "Solar System MPC",
+            ],
+        }
+    )
+
+
+@pytest.mark.parametrize(
+    "part, expected",
+    [
+        ("{i:magpsf} >= 18", ("i:magpsf", "ge", 18.0)),
+        ("{i:magpsf} <= 18", ("i:magpsf", "le", 18.0)),
+        ("{i:magpsf} < 18", ("i:magpsf", "lt", 18.0)),
+        ("{i:magpsf} > 18", ("i:magpsf", "gt", 18.0)),
+        ("{i:magpsf} != 18", ("i:magpsf", "ne", 18.0)),
+        ("{i:magpsf} = 18", ("i:magpsf", "eq", 18.0)),
+        ("{i:magpsf} gt 18", ("i:magpsf", "gt", 18.0)),
+        ("{i:objectId} contains ZTF1", ("i:objectId", "contains", "ZTF1")),
+        ('{v:classification} = "SN candidate"', ("v:classification", "eq", "SN candidate")),
+        ("{v:classification} = 'SN candidate'", ("v:classification", "eq", "SN candidate")),
+        ('{i:objectId} contains "12"', ("i:objectId", "contains", "12")),
+        ("{v:lastdate} datestartswith 2024", ("v:lastdate", "datestartswith", "2024")),
+        ("{i:magpsf}", (None, None, None)),
+    ],
+)
+def test_split_filter_part(part, expected):
+    assert split_filter_part(part) == expected
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        ("{i:magpsf} >= 18.5", ["ZTF1", "ZTF1", "ZTF3", "ZTF4"]),
+        ("{i:magpsf} <= 17.2", ["ZTF2", "ZTF5"]),
+        ("{i:magpsf} < 17.2", ["ZTF5"]),
+        ("{i:magpsf} > 19", ["ZTF3"]),
+        ("{i:magpsf} != 18.5", ["ZTF1", "ZTF2", "ZTF3", "ZTF5"]),
+        ("{i:magpsf} = 18.5", ["ZTF1", "ZTF4"]),
+        ("{i:objectId} contains 1", ["ZTF1", "ZTF1"]),
+        ('{v:classification} = "SN candidate"', ["ZTF1", "ZTF1"]),
+        ("{v:classification} contains 'Solar'", ["ZTF2", "ZTF3", "ZTF5"]),
+        ("{v:classification} datestartswith Unk", ["ZTF4"]),
+        ("{i:ssnamenr} datestartswith 19", ["ZTF5"]),
+        # Numbers stored as strings are compared as numbers
+        ("{i:ndethist} > 5", ["ZTF1", "ZTF2", "ZTF4"]),
+        ("{i:ndethist} = 5", ["ZTF5"]),
+        # Several conditions
+        ("{i:magpsf} > 17 && {i:ssnamenr} = 8467", ["ZTF2", "ZTF3"]),
+        # Unknown columns are ignored
+        ("{d:unknown} > 1", ["ZTF1", "ZTF1", "ZTF2", "ZTF3", "ZTF4", "ZTF5"]),
+    ],
+)
+def test_filter_results(query, expected):
+    out = filter_results(make_alerts(), query)
+    assert list(out["i:objectId"]) == expected
+
+
+def test_unique_results():
+    pdf = make_alerts()
+
+    out = unique_results(pdf, "i:objectId")
+    assert list(out.index) == [0, 2, 3, 4, 5]
+
+    # Alerts without SSO (resp. tracklet) are always kept
+    out = unique_results(pdf, "i:ssnamenr")
+    assert list(out.index) == [0, 1, 2, 4, 5]
+    out = unique_results(pdf, "d:tracklet")
+    assert list(out.index) == [0, 1, 2, 4, 5]
+
+    # Nothing to deduplicate
+    pdf["i:ssnamenr"] = "null"
+    assert unique_results(pdf, "i:ssnamenr").equals(pdf)
+
+
+def test_view_filters_after_unique(config):
+    qid = store_results(make_alerts(), page_size=2, config=config)
+
+    # The first alert of SSO 8467 (ZTF2) does not match: its
+    # second alert (ZTF3) is not shown in its place
+    vid = results_view(
+        qid, filter_query="{i:magpsf} > 18", unique="i:ssnamenr", config=config
+    )
+    out = load_results(vid, config=config)
+    assert list(out["i:objectId"]) == ["ZTF1", "ZTF1", "ZTF4"]
+
+
+def test_view_sort(config):
+    qid = store_results(make_alerts(), page_size=2, config=config)
+
+    vid = results_view(
+        qid,
+        sort_by=[
+            {"column_id": "i:magpsf", "direction": "asc"},
+            {"column_id": "i:objectId", "direction": "desc"},
+        ],
+        config=config,
+    )
+    out = load_results(vid, config=config)
+    assert list(out["i:objectId"]) == ["ZTF5", "ZTF2", "ZTF4", "ZTF1", "ZTF1", "ZTF3"]
+    assert get_results_info(vid, config)["npages"] == 3
+
+    # Ties keep the order of the results (stable sort)
+    vid = results_view(
+        qid, sort_by=[{"column_id": "i:objectId", "direction": "asc"}], config=config
+    )
+    out = load_results(vid, config=config)
+    assert list(out.index[:2]) == [0, 1]
+
+    # Unknown columns are ignored
+    vid = results_view(
+        qid, sort_by=[{"column_id": "d:unknown", "direction": "asc"}], config=config
+    )
+    assert list(load_results(vid, config=config).index) == list(range(6))
+
+
+def test_view_reuse(config):
+    qid = store_results(make_alerts(), page_size=2, config=config)
+
+    # No view: the results themselves
+    assert results_view(qid, sort_by=[], filter_query="", config=config) == qid
+
+    sort_by = [{"column_id": "i:magpsf", "direction": "desc"}]
+    vid = results_view(qid, sort_by=sort_by, config=config)
+    assert vid != qid
+    assert results_view(qid, sort_by=sort_by, config=config) == vid
+
+    # Another view of the same results
+    other = results_view(qid, sort_by=sort_by, unique="i:objectId", config=config)
+    assert other not in [qid, vid]
+
+    # Computed again once evicted
+    get_results_cache(config).delete(vid)
+    new = results_view(qid, sort_by=sort_by, config=config)
+    assert new != vid
+    assert get_results_info(new, config)["nrows"] == 6
+
+
+def test_view_of_evicted_results(config):
+    qid = store_results(make_alerts(), page_size=2, config=config)
+    get_results_cache(config).clear()
+
+    assert results_view(qid, config=config) is None
+    assert results_view(qid, filter_query="{i:magpsf} > 18", config=config) is None
@@ -0,0 +1,218 @@
+# Copyright 2026 AstroLab Software
+# Author: Julien Peloton
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Circuit breaker and fallback of third-party services (apps/upstream.py)"""
+
+import time
+
+import pytest
+
+from apps import upstream
+from apps.cache import get_cache
+from apps.upstream import UpstreamError, call_upstream, upstream_stats
+
+
+class FakeClock:
+    """Wall clock of apps.upstream, moved forward by the tests"""
+
+    def __init__(self):
+        self.now = 1.7e9
+
+    def time(self):
+        return self.now
+
+    def perf_counter(self):
+        return time.perf_counter()
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(upstream, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def snad(config):
+    """Configuration with a small circuit breaker for SNAD"""
+    config["UPSTREAM"] = {
+        "snad": {"timeout": 1, "failures": 3, "cooldown": 60, "ttl": 10}
+    }
+    return config
+
+
+class Service:
+    """Fake third-party service, counting its calls"""
+
+    def __init__(self, value="ok"):
+        self.value = value
+        self.down = False
+        self.calls = 0
+
+    def __call__(self, timeout):
+        self.calls += 1
+        if self.down:
+            raise ConnectionError("service down")
+        return self.value
+
+
+def circuit(config):
+    return upstream_stats(config)["snad"]["circuit"]
+
+
+def wait_until(predicate, timeout=5):
+    """Wait for a background revalidation"""
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_circuit_opens_after_failures(snad, clock):
+    service = Service()
+    service.down = True
+
+    for _ in range(2):
+        with pytest.raises(UpstreamError, match="service down"):
+            call_upstream("snad", service, config=snad)
+        assert circuit(snad) == "closed"
+
+    with pytest.raises(UpstreamError, match="service down"):
+        call_upstream("snad", service, config=snad)
+    assert circuit(snad) == "open"
+
+    # Fail fast, without calling the service
+    with pytest.raises(UpstreamError, match="circuit open"):
+        call_upstream("snad", service, config=snad)
+    assert service.calls == 3
+    assert upstream_stats(snad)["snad"]["rejected"] == 1
+
+
+def test_success_resets_failures(snad, clock):
+    service = Service()
+    for down in [True, True, False, True, True]:
+        service.down = down
+        try:
+            call_upstream("snad", service, config=snad)
+        except UpstreamError:
+            pass
+    assert circuit(snad) == "closed"
+
+
+def test_client_errors_are_not_failures(snad, clock):
+    service = Service()
+    service.down = True
+
+    for _ in range(5):
+        with pytest.raises(ConnectionError):
+            call_upstream(
+                "snad",
+                service,
+                config=snad,
+                client_error=lambda e: isinstance(e, ConnectionError),
+            )
+    assert circuit(snad) == "closed"
+
+
+def test_half_open_probe(snad, clock):
+    service = Service()
+    service.down = True
+    for _ in range(3):
+        with pytest.raises(UpstreamError):
+            call_upstream("snad", service, config=snad)
+
+    clock.sleep(59)
+    with pytest.raises(UpstreamError, match="circuit open"):
+        call_upstream("snad", service, config=snad)
+
+    clock.sleep(2)
+    assert circuit(snad) == "half-open"
+
+    # A failed probe opens the circuit again for `cooldown`
+    with pytest.raises(UpstreamError, match="service down"):
+        call_upstream("snad", service, config=snad)
+    assert service.calls == 4
+    assert circuit(snad) == "open"
+
+    clock.sleep(61)
+    # Another process is probing the service
+    cache = get_cache("upstream", snad)
+    cache.add("probe:snad", 0, expire=1)
+    with pytest.raises(UpstreamError, match="circuit open"):
+        call_upstream("snad", service, config=snad)
+    cache.delete("probe:snad")
+
+    # A successful probe closes the circuit
+    service.down = False
+    assert call_upstream("snad", service, config=snad) == "ok"
+    assert service.calls == 5
+    assert circuit(snad) == "closed"
+
+
+def test_timeout_is_a_failure(snad, clock):
+    snad["UPSTREAM"]["snad"]["timeout"] = 0.05
+
+    def slow(timeout):
+        time.sleep(0.5)
+
+    for _ in range(3):
+        with pytest.raises(UpstreamError, match="no answer"):
+            call_upstream("snad", slow, config=snad)
+    assert circuit(snad) == "open"
+    assert upstream_stats(snad)["snad"]["timeout"] == 3
+
+
+def test_cached_and_revalidated(snad, clock):
+    service = Service("v1")
+    assert call_upstream("snad", service, key="k", config=snad) == "v1"
+
+    # Fresh
+    service.value = "v2"
+    clock.sleep(5)
+    assert call_upstream("snad", service, key="k", config=snad) == "v1"
+    assert service.calls == 1
+
+    # Stale: served, and revalidated in the background
+    clock.sleep(10)
+    assert call_upstream("snad", service, key="k", config=snad) == "v1"
+    cache = get_cache("upstream", snad)
+    wait_until(lambda: "refresh:value:snad:k" not in cache)
+    assert service.calls == 2
+    assert call_upstream("snad", service, key="k", config=snad) == "v2"
+
+    stats = upstream_stats(snad)["snad"]
+    assert (stats["ok"], stats["cached"], stats["stale"]) == (2, 2, 1)
+
+
+def test_stale_when_service_is_down(snad, clock):
+    service = Service("v1")
+    assert call_upstream("snad", service, key="k", config=snad) == "v1"
+
+    service.down = True
+    cache = get_cache("upstream", snad)
+    for _ in range(5):
+        clock.sleep(20)
+        assert call_upstream("snad", service, key="k", config=snad) == "v1"
+        wait_until(lambda: "refresh:value:snad:k" not in cache)
+
+    # Revalidations stop once the circuit is open
+    assert service.calls == 4
+    assert circuit(snad) == "open"
+
+    # No fallback for other requests
+    with pytest.raises(UpstreamError, match="circuit open"):
+        call_upstream("snad", service, key="other", config=snad)